@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from collections import deque
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import Max
+from .models import AuditLog
+
+# Object types whose object_id is a project id
+PROJECT_OBJECT_TYPES = ['project', 'validation']
+
+# Audit entries read per poll of the audit log
+RELAY_BATCH_SIZE = 200
+
+
+class Subscription:
+    """
+    Queue of events for one connected client, owned by its event loop.
+
+    publish() may run in any thread (sync views run in a thread pool under
+    ASGI), so events are handed to the loop with call_soon_threadsafe. A
+    client that falls `max_pending` events behind is marked overflowed; the
+    stream then ends and the browser reconnects with Last-Event-ID.
+    """
+
+    def __init__(self, max_pending):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_pending)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # Loop already closed: the client is gone
+            pass
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout):
+        """Next event, or None if nothing arrived within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """
+    Publish/subscribe for live project and audit events.
+
+    Events are read from `source`, the audit log table shared by every
+    process: the first subscription in a process starts a relay that polls
+    it for new entries and hands them to that process's clients. A client
+    therefore hears about writes handled by any server process, WSGI or
+    ASGI. Recent events are kept so a reconnecting client can catch up; ids
+    are audit entry ids, so they mean the same in every process.
+    """
+
+    def __init__(self, replay_size, source=None):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._recent = deque(maxlen=replay_size)
+        self._source = source
+        self._relay = None
+
+    def publish(self, event):
+        with self._lock:
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event
+
+    async def subscribe(self, last_event_id=None, max_pending=100):
+        """Register a subscription for the running event loop, replaying events after last_event_id"""
+        await self._start_relay()
+        subscription = Subscription(max_pending)
+        with self._lock:
+            self._subscribers.add(subscription)
+            for event in self._events_after(last_event_id):
+                subscription._put(event)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _events_after(self, last_event_id):
+        if not (last_event_id or '').isdigit():
+            return []
+        return [event for event in self._recent if int(event['id']) > int(last_event_id)]
+
+    async def _start_relay(self):
+        loop = asyncio.get_running_loop()
+        if self._source is None or self._relay_running(loop):
+            return
+        # Entries written before the relay starts are not relayed
+        last_id = await sync_to_async(self._source.latest_id)()
+        if not self._relay_running(loop):
+            self._relay = loop.create_task(self._run_relay(last_id))
+
+    def _relay_running(self, loop):
+        return self._relay is not None and not self._relay.done() and self._relay.get_loop() is loop
+
+    async def _run_relay(self, last_id):
+        # A sync thread of its own for the queries, not the one of the request that started the relay
+        async with ThreadSensitiveContext():
+            read = sync_to_async(self._source.events_after)
+            while True:
+                try:
+                    events = await read(last_id, RELAY_BATCH_SIZE)
+                except DatabaseError:
+                    # Database briefly unavailable or locked; try again on the next poll
+                    events = []
+                for event in events:
+                    self.publish(event)
+                    last_id = int(event['id'])
+                if len(events) < RELAY_BATCH_SIZE:
+                    await asyncio.sleep(settings.EVENT_STREAM_POLL_SECONDS)
+
+
+class AuditLogSource:
+    """
+    New audit entries as events, read by EventBroker's relay.
+
+    Entries are read in id order. SQLite commits writes one at a time, so
+    ids become visible in order and none is skipped.
+    """
+
+    def latest_id(self):
+        return AuditLog.objects.aggregate(latest=Max('id'))['latest'] or 0
+
+    def events_after(self, last_id, limit):
+        entries = AuditLog.objects.select_related('user').filter(id__gt=last_id).order_by('id')[:limit]
+        return [audit_event(entry) for entry in entries]
+
+
+broker = EventBroker(settings.EVENT_STREAM_REPLAY_SIZE, source=AuditLogSource())
+
+
+def audit_event(entry):
+    """Event published for an audit entry; project entries also carry the project status"""
+    project_id = entry.object_id if entry.object_type in PROJECT_OBJECT_TYPES else None
+    details = entry.details or {}
+    return {
+        'id': str(entry.id),
+        'project_id': project_id,
+        'project_status': details.get('new_project_status') or details.get('project_status'),
+        'action': details.get('action', entry.action),
+        'user_id': entry.user_id,
+        'audit': {
+            'id': entry.id,
+            'user': entry.user.username,
+            'action': entry.action,
+            'object_type': entry.object_type,
+            'object_id': entry.object_id,
+            'details': details,
+            'timestamp': entry.timestamp,
+        },
+    }
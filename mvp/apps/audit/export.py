@@ -0,0 +1,75 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+# Rows per keyset query; each batch is a short query, so no read stays open
+# for the whole export
+EXPORT_BATCH_SIZE = 2000
+EXPORT_FIELDS = ['id', 'timestamp', 'user', 'action', 'object_type', 'object_id', 'details']
+
+
+def iter_audit_logs(queryset, batch_size=EXPORT_BATCH_SIZE):
+    """
+    Yield audit entries oldest first, one keyset batch at a time.
+
+    Each batch restarts after the (timestamp, id) of the last entry seen,
+    which stays fast at any depth and is stable while new entries arrive.
+    """
+    queryset = queryset.select_related('user').order_by('timestamp', 'id')
+    last = None
+    while True:
+        batch = queryset
+        if last is not None:
+            batch = batch.filter(
+                Q(timestamp__gt=last.timestamp) | Q(timestamp=last.timestamp, id__gt=last.id)
+            )
+
+        count = 0
+        for entry in batch[:batch_size].iterator(chunk_size=batch_size):
+            yield entry
+            last = entry
+            count += 1
+        if count < batch_size:
+            return
+
+
+def audit_log_row(entry):
+    """Flat representation of an entry shared by the export formats"""
+    return {
+        'id': entry.id,
+        'timestamp': entry.timestamp,
+        'user': entry.user.username,
+        'action': entry.action,
+        'object_type': entry.object_type,
+        'object_id': entry.object_id,
+        'details': entry.details,
+    }
+
+
+class _Echo:
+    """File-like object whose write() returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(entries):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for entry in entries:
+        row = audit_log_row(entry)
+        row['timestamp'] = row['timestamp'].isoformat()
+        row['details'] = json.dumps(row['details'], cls=DjangoJSONEncoder)
+        yield writer.writerow([row[field] for field in EXPORT_FIELDS])
+
+
+def stream_jsonl(entries):
+    for entry in entries:
+        yield json.dumps(audit_log_row(entry), cls=DjangoJSONEncoder) + '\n'
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv', 'csv'),
+    'jsonl': (stream_jsonl, 'application/x-ndjson', 'jsonl'),
+}
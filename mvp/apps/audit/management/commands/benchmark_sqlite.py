@@ -0,0 +1,153 @@
+import multiprocessing
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connection, transaction
+from apps.audit.models import AuditLog
+from apps.audit.utils import AuditLogger, buffered_audit_log
+from apps.projects.models import Project
+
+PROJECTS = 20
+
+
+def profiles():
+    """Database settings compared: Django's bare SQLite defaults and settings.SQLITE_TUNED_SETTINGS"""
+    tuned = settings.SQLITE_TUNED_SETTINGS
+    return {
+        'default': {'OPTIONS': {}, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+        'tuned': {
+            'OPTIONS': dict(tuned.get('OPTIONS', {})),
+            'CONN_MAX_AGE': tuned.get('CONN_MAX_AGE', 0),
+            'CONN_HEALTH_CHECKS': tuned.get('CONN_HEALTH_CHECKS', False),
+        },
+    }
+
+
+def audited_write(user, project_id):
+    """What an audited update view does: read, update, and log in one transaction"""
+    with buffered_audit_log():
+        with transaction.atomic():
+            project = Project.objects.get(id=project_id)
+            project.save(update_fields=['updated_at'])
+            AuditLogger.log_project_action(user, 'update', project, {'action': 'benchmark'})
+
+
+def list_read(project_id):
+    """What a list view does: a page of projects and of the project's audit trail"""
+    list(Project.objects.order_by('-created_at')[:50])
+    list(AuditLog.objects.filter(object_type='project', object_id=project_id).order_by('-timestamp')[:50])
+
+
+def run_worker(role, index, seconds):
+    """
+    One worker process issuing requests back to back for `seconds`.
+
+    Ends each request like Django does (close_old_connections), so the
+    connection is only kept when CONN_MAX_AGE allows it.
+    """
+    user = get_user_model().objects.get(username='benchmark')
+    project_ids = list(Project.objects.values_list('id', flat=True))
+    close_old_connections()
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    request = 0
+    while time.perf_counter() < deadline:
+        project_id = project_ids[(index + request) % len(project_ids)]
+        request += 1
+        start = time.perf_counter()
+        try:
+            if role == 'writer':
+                audited_write(user, project_id)
+            else:
+                list_read(project_id)
+        except OperationalError:
+            # "database is locked"
+            errors += 1
+        else:
+            latencies.append(time.perf_counter() - start)
+        finally:
+            close_old_connections()
+    connection.close()
+    return role, latencies, errors
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent audited writes and reads on SQLite with the default and the tuned settings (SQLITE_TUNED)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help='Writing worker processes')
+        parser.add_argument('--readers', type=int, default=4, help='Reading worker processes')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+
+    def handle(self, *args, **options):
+        runs = profiles()
+        work_dir = tempfile.mkdtemp(prefix='benchmark_sqlite_')
+        settings_dict = connection.settings_dict
+        original = {key: settings_dict[key] for key in ('NAME', 'OPTIONS', 'CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        original['OPTIONS'] = dict(original['OPTIONS'])
+        try:
+            template = os.path.join(work_dir, 'template.sqlite3')
+            self.configure(NAME=template, **runs['default'])
+            call_command('migrate', verbosity=0, interactive=False)
+            self.seed()
+            connection.close()
+
+            self.stdout.write(
+                f'{options["writers"]} writer and {options["readers"]} reader processes, {options["seconds"]:g} s per run'
+            )
+            self.stdout.write(
+                f'{"profile":<8} {"writes/s":>9} {"locked":>7} {"write p95":>10} {"reads/s":>9} {"read p95":>9}'
+            )
+            for name, profile in runs.items():
+                # Each profile gets a fresh copy: WAL mode is stored in the file
+                path = os.path.join(work_dir, f'{name}.sqlite3')
+                shutil.copy(template, path)
+                self.configure(NAME=path, **profile)
+                self.report(name, self.run(options))
+        finally:
+            connection.close()
+            settings_dict.update(original)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def configure(self, **values):
+        connection.close()
+        connection.settings_dict.update(values)
+
+    def seed(self):
+        user = get_user_model().objects.create_user(username='benchmark', password='benchmark', role='analyst')
+        Project.objects.bulk_create([
+            Project(method_name=f'Method {i}', product_name='Benchmark', technique='hplc', created_by=user)
+            for i in range(PROJECTS)
+        ])
+
+    def run(self, options):
+        # Workers are forked with the configured settings and no open connection
+        connection.close()
+        jobs = [('writer', i, options['seconds']) for i in range(options['writers'])]
+        jobs += [('reader', i, options['seconds']) for i in range(options['readers'])]
+        with multiprocessing.get_context('fork').Pool(len(jobs)) as pool:
+            results = pool.starmap(run_worker, jobs)
+        return results, options['seconds']
+
+    def report(self, name, run):
+        results, seconds = run
+        writes = [latency for role, latencies, _ in results if role == 'writer' for latency in latencies]
+        reads = [latency for role, latencies, _ in results if role == 'reader' for latency in latencies]
+        locked = sum(errors for _, _, errors in results)
+        self.stdout.write(
+            f'{name:<8} {len(writes) / seconds:>9.1f} {locked:>7} {self.p95(writes):>8.1f}ms '
+            f'{len(reads) / seconds:>9.1f} {self.p95(reads):>7.1f}ms'
+        )
+
+    def p95(self, latencies):
+        if len(latencies) < 2:
+            return float('nan')
+        return statistics.quantiles(latencies, n=20)[-1] * 1000
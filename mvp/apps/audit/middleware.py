@@ -0,0 +1,32 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from .utils import abuffered_audit_log, buffered_audit_log
+
+
+class AuditBufferMiddleware:
+    """
+    Buffer all audit entries logged while handling a request.
+
+    Entries are written with one bulk insert once the response is ready
+    instead of one INSERT per AuditLogger call. Remove the middleware to
+    fall back to immediate writes.
+
+    Works in both modes, so under ASGI async views are not pushed through
+    a worker thread by this middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with buffered_audit_log():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        async with abuffered_audit_log():
+            return await self.get_response(request)
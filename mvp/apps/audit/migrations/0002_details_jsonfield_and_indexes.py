@@ -0,0 +1,77 @@
+import json
+
+from django.db import migrations, models
+
+
+BATCH_SIZE = 2000
+
+
+def text_to_json(apps, schema_editor):
+    """Parse the stored JSON text; free-form text is kept under a 'message' key"""
+    AuditLog = apps.get_model('audit', 'AuditLog')
+    batch = []
+    for entry in AuditLog.objects.only('id', 'details').iterator(chunk_size=BATCH_SIZE):
+        if not entry.details:
+            entry.details_json = {}
+        else:
+            try:
+                value = json.loads(entry.details)
+            except ValueError:
+                value = entry.details
+            entry.details_json = value if isinstance(value, dict) else {'message': value}
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            AuditLog.objects.bulk_update(batch, ['details_json'])
+            batch = []
+    if batch:
+        AuditLog.objects.bulk_update(batch, ['details_json'])
+
+
+def json_to_text(apps, schema_editor):
+    AuditLog = apps.get_model('audit', 'AuditLog')
+    batch = []
+    for entry in AuditLog.objects.only('id', 'details_json').iterator(chunk_size=BATCH_SIZE):
+        entry.details = json.dumps(entry.details_json) if entry.details_json else ''
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            AuditLog.objects.bulk_update(batch, ['details'])
+            batch = []
+    if batch:
+        AuditLog.objects.bulk_update(batch, ['details'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='details_json',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(text_to_json, json_to_text),
+        migrations.RemoveField(
+            model_name='auditlog',
+            name='details',
+        ),
+        migrations.RenameField(
+            model_name='auditlog',
+            old_name='details_json',
+            new_name='details',
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['object_type', 'object_id', 'timestamp'], name='audit_object_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['user', 'timestamp'], name='audit_user_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp'], name='audit_time_idx'),
+        ),
+    ]
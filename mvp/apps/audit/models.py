@@ -18,7 +18,7 @@ class AuditLog(models.Model):
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
     object_type = models.CharField(max_length=50)  # e.g. 'project', 'user'
     object_id = models.PositiveIntegerField()
-    details = models.TextField(blank=True)  # JSON or text details
+    details = models.JSONField(default=dict, blank=True)
     timestamp = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
@@ -26,3 +26,8 @@ class AuditLog(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['object_type', 'object_id', 'timestamp'], name='audit_object_time_idx'),
+            models.Index(fields=['user', 'timestamp'], name='audit_user_time_idx'),
+            models.Index(fields=['timestamp'], name='audit_time_idx'),
+        ]
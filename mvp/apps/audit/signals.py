@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent with `entries`, a list of saved AuditLog rows, whenever AuditLogger
+# writes to the audit trail. Bulk-created entries bypass post_save, so code
+# reacting to new audit entries listens to this instead.
+audit_logged = Signal()
@@ -1,3 +1,392 @@
-from django.test import TestCase
+import asyncio
+import csv
+import io
+import json
+import threading
+from datetime import timedelta
+from asgiref.sync import async_to_sync, sync_to_async
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, Client, override_settings
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from apps.projects.models import Project
+from .models import AuditLog
+from .events import EventBroker, broker
+from .export import iter_audit_logs
+from .utils import AuditLogger, buffered_audit_log
 
-# Create your tests here.
+User = get_user_model()
+
+
+class BufferedAuditLogTest(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+
+    def test_entries_written_in_one_insert(self):
+        with CaptureQueriesContext(connection) as ctx:
+            with buffered_audit_log():
+                for i in range(5):
+                    entry = AuditLogger.log_action(self.user, 'update', 'user', self.user.id, {'step': i})
+                self.assertIsNone(entry.pk)
+                self.assertEqual(len(ctx.captured_queries), 0)
+
+        inserts = [q for q in ctx.captured_queries if q['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(AuditLog.objects.count(), 5)
+
+    def test_rolled_back_entries_are_dropped(self):
+        with buffered_audit_log():
+            AuditLogger.log_action(self.user, 'create', 'user', self.user.id)
+            try:
+                with transaction.atomic():
+                    AuditLogger.log_action(self.user, 'delete', 'user', self.user.id)
+                    raise RuntimeError('rollback')
+            except RuntimeError:
+                pass
+
+        self.assertEqual(list(AuditLog.objects.values_list('action', flat=True)), ['create'])
+
+    def test_committed_entries_survive_errors(self):
+        with self.assertRaises(RuntimeError):
+            with buffered_audit_log():
+                with transaction.atomic():
+                    AuditLogger.log_action(self.user, 'create', 'user', self.user.id)
+                raise RuntimeError('view failed after commit')
+
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_nested_buffers_share_outer(self):
+        with buffered_audit_log() as outer:
+            with buffered_audit_log() as inner:
+                AuditLogger.log_action(self.user, 'create', 'user', self.user.id)
+            self.assertIs(inner, outer)
+            self.assertEqual(AuditLog.objects.count(), 0)
+        self.assertEqual(AuditLog.objects.count(), 1)
+
+    def test_unbuffered_writes_immediately(self):
+        entry = AuditLogger.log_action(self.user, 'create', 'user', self.user.id)
+        self.assertIsNotNone(entry.pk)
+
+
+class AuditBufferMiddlewareTest(TestCase):
+    def test_request_entries_flushed(self):
+        user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc', created_by=user
+        )
+        client = Client()
+        client.force_login(user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post(f'/api/projects/{project.id}/start-validation/')
+
+        self.assertEqual(response.status_code, 200)
+        entry = AuditLog.objects.get(object_type='project', object_id=project.id)
+        self.assertEqual(entry.details['action'], 'started_validation')
+
+
+class AuditLogFilterTest(TestCase):
+    def setUp(self):
+        self.qa = User.objects.create_user(username='testqa', password='testpass123', role='qa')
+        self.analyst = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client = Client()
+        self.client.force_login(self.qa)
+
+        now = timezone.now()
+        self.entries = [
+            AuditLog.objects.create(user=self.analyst, action='create', object_type='project', object_id=1),
+            AuditLog.objects.create(user=self.analyst, action='submit', object_type='project', object_id=1),
+            AuditLog.objects.create(user=self.qa, action='approve', object_type='project', object_id=2),
+            AuditLog.objects.create(user=self.qa, action='login', object_type='auth', object_id=self.qa.id),
+        ]
+        # Backdate the first entry (auto_now_add ignores values passed to create)
+        AuditLog.objects.filter(id=self.entries[0].id).update(timestamp=now - timedelta(days=10))
+
+    def ids(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(entry['id'] for entry in response.json()['results'])
+
+    def test_details_are_structured(self):
+        entry = AuditLogger.log_action(self.qa, 'update', 'user', self.analyst.id, {'updated_fields': ['email']})
+        entry.refresh_from_db()
+        self.assertEqual(entry.details, {'updated_fields': ['email']})
+
+    def test_filter_by_action_and_user(self):
+        self.assertEqual(self.ids('/api/audit/', action='approve'), [self.entries[2].id])
+        self.assertEqual(
+            self.ids('/api/audit/', user_id=self.analyst.id, action='submit'), [self.entries[1].id]
+        )
+
+    def test_filter_by_object(self):
+        self.assertEqual(
+            self.ids('/api/audit/', object_type='project', object_id=1),
+            [self.entries[0].id, self.entries[1].id]
+        )
+
+    def test_filter_by_date_range(self):
+        today = timezone.localdate().isoformat()
+        self.assertEqual(len(self.ids('/api/audit/', date_from=today)), 3)
+        week_ago = (timezone.localdate() - timedelta(days=7)).isoformat()
+        self.assertEqual(self.ids('/api/audit/', date_to=week_ago), [self.entries[0].id])
+
+    def test_project_audit_log_filters(self):
+        self.assertEqual(self.ids('/api/audit/1/', action='create'), [self.entries[0].id])
+
+    def test_invalid_filters_rejected(self):
+        self.assertEqual(self.client.get('/api/audit/', {'date_from': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/audit/', {'object_id': 'abc'}).status_code, 400)
+
+    def test_user_filter_uses_index(self):
+        plan = AuditLog.objects.filter(user=self.analyst).order_by('-timestamp').explain()
+        self.assertIn('audit_user_time_idx', plan)
+
+
+class AuditLogPaginationTest(TestCase):
+    def setUp(self):
+        self.qa = User.objects.create_user(username='testqa', password='testpass123', role='qa')
+        self.client = Client()
+        self.client.force_login(self.qa)
+        # Identical timestamps exercise the id tie-breaker
+        now = timezone.now()
+        AuditLog.objects.bulk_create([
+            AuditLog(user=self.qa, action='login', object_type='auth', object_id=self.qa.id) for _ in range(7)
+        ])
+        AuditLog.objects.update(timestamp=now)
+
+    def test_cursor_walks_every_entry_once(self):
+        seen = []
+        url = '/api/audit/?page_size=3'
+        pages = 0
+        while url:
+            data = self.client.get(url).json()
+            seen.extend(entry['id'] for entry in data['results'])
+            url = data['next']
+            pages += 1
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(sorted(seen), sorted(AuditLog.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    async def test_pagination_under_asgi(self):
+        await self.async_client.aforce_login(self.qa)
+        response = await self.async_client.get('/api/audit/', {'page_size': 5})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['results']), 5)
+        data = (await self.async_client.get(data['next'])).json()
+        self.assertEqual(len(data['results']), 2)
+        self.assertIsNone(data['next'])
+
+        response = await self.async_client.get('/api/audit/', {'user_id': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'user_id': 'Must be an integer'})
+
+    def test_page_size_capped(self):
+        data = self.client.get('/api/audit/', {'page_size': 10000}).json()
+        self.assertEqual(len(data['results']), 7)
+        self.assertIsNone(data['next'])
+
+
+class AuditLogExportTest(TestCase):
+    def setUp(self):
+        self.qa = User.objects.create_user(username='testqa', password='testpass123', role='qa')
+        self.analyst = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client = Client()
+        self.client.force_login(self.qa)
+
+        AuditLog.objects.create(user=self.analyst, action='create', object_type='project', object_id=1,
+                                details={'project_name': 'Method, "A"'})
+        AuditLog.objects.create(user=self.analyst, action='submit', object_type='validation', object_id=1)
+        AuditLog.objects.create(user=self.qa, action='approve', object_type='project', object_id=2)
+
+    def export(self, **params):
+        response = self.client.get('/api/audit/export/', params)
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_export(self):
+        rows = list(csv.DictReader(io.StringIO(self.export(file_format='csv'))))
+        self.assertEqual([row['action'] for row in rows], ['create', 'submit', 'approve'])
+        self.assertEqual(json.loads(rows[0]['details']), {'project_name': 'Method, "A"'})
+
+    def test_jsonl_export_filtered_by_project(self):
+        lines = self.export(file_format='jsonl', project_id=1).splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['object_type'] for row in rows], ['project', 'validation'])
+        self.assertEqual(rows[0]['user'], 'testanalyst')
+
+    def test_export_filtered_by_user(self):
+        rows = list(csv.DictReader(io.StringIO(self.export(user_id=self.qa.id))))
+        self.assertEqual([row['action'] for row in rows], ['approve'])
+
+    def test_export_streams_asynchronously_under_asgi(self):
+        async def fetch():
+            await self.async_client.aforce_login(self.qa)
+            response = await self.async_client.get('/api/audit/export/', {'file_format': 'jsonl'})
+            self.assertTrue(response.is_async)
+            return b''.join([chunk async for chunk in response.streaming_content]).decode()
+
+        rows = [json.loads(line) for line in async_to_sync(fetch)().splitlines()]
+        self.assertEqual([row['action'] for row in rows], ['create', 'submit', 'approve'])
+
+    def test_export_is_qa_only(self):
+        self.client.force_login(self.analyst)
+        self.assertEqual(self.client.get('/api/audit/export/').status_code, 403)
+
+    def test_unknown_format_rejected(self):
+        self.assertEqual(self.client.get('/api/audit/export/', {'file_format': 'xml'}).status_code, 400)
+
+    def test_keyset_batches_cover_ties(self):
+        AuditLog.objects.update(timestamp=timezone.now())
+        ids = [entry.id for entry in iter_audit_logs(AuditLog.objects.all(), batch_size=2)]
+        self.assertEqual(ids, sorted(AuditLog.objects.values_list('id', flat=True)))
+
+
+class EventBrokerTest(SimpleTestCase):
+    def test_publish_from_another_thread(self):
+        events = EventBroker(replay_size=10)
+
+        async def scenario():
+            subscription = await events.subscribe()
+            thread = threading.Thread(target=events.publish, args=({'id': '1', 'project_id': 1},))
+            thread.start()
+            thread.join()
+            return await subscription.get(timeout=1)
+
+        event = async_to_sync(scenario)()
+        self.assertEqual(event['project_id'], 1)
+
+    def test_replay_after_last_event_id(self):
+        events = EventBroker(replay_size=10)
+        published = [events.publish({'id': str(i), 'project_id': i}) for i in range(1, 4)]
+
+        async def replayed(last_event_id):
+            subscription = await events.subscribe(last_event_id=last_event_id)
+            return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+        self.assertEqual(async_to_sync(replayed)('1'), published[1:])
+        # Malformed ids (or none at all) replay nothing
+        self.assertEqual(async_to_sync(replayed)('1-1'), [])
+        self.assertEqual(async_to_sync(replayed)(None), [])
+
+    def test_slow_client_overflows(self):
+        events = EventBroker(replay_size=10)
+
+        async def scenario():
+            subscription = await events.subscribe(max_pending=2)
+            for i in range(3):
+                events.publish({'id': str(i), 'project_id': i})
+            await asyncio.sleep(0)
+            return subscription
+
+        subscription = async_to_sync(scenario)()
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(subscription.queue.qsize(), 2)
+
+
+@override_settings(EVENT_STREAM_HEARTBEAT_SECONDS=0.05, EVENT_STREAM_POLL_SECONDS=0.01)
+class EventStreamTest(TestCase):
+    def setUp(self):
+        self.analyst = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.qa = User.objects.create_user(username='testqa', password='testpass123', role='qa')
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc',
+            created_by=self.analyst, status='review'
+        )
+
+    def approve_project(self):
+        self.project.status = 'approved'
+        self.project.save()
+        AuditLogger.log_project_action(self.qa, 'approve', self.project, {'previous_status': 'review'})
+
+    async def open_stream(self, user, **params):
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get('/api/audit/events/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        return stream
+
+    async def next_message(self, stream):
+        return (await asyncio.wait_for(anext(stream), timeout=1)).decode()
+
+    async def next_event(self, stream):
+        """Next message that is not a keep-alive; the relay polls, so one may come first"""
+        while True:
+            message = await self.next_message(stream)
+            if message != ': keepalive\n\n':
+                return message
+
+    def parse(self, message):
+        fields = dict(line.split(': ', 1) for line in message.strip().splitlines())
+        return fields['event'], json.loads(fields['data'])
+
+    async def test_qa_receives_status_and_audit_events(self):
+        stream = await self.open_stream(self.qa, project_id=self.project.id)
+        await sync_to_async(self.approve_project)()
+
+        event_name, data = self.parse(await self.next_event(stream))
+        self.assertEqual(event_name, 'project')
+        self.assertEqual(data['project_id'], self.project.id)
+        self.assertEqual(data['status'], 'approved')
+
+        event_name, data = self.parse(await self.next_event(stream))
+        self.assertEqual(event_name, 'audit')
+        self.assertEqual(data['action'], 'approve')
+        self.assertEqual(data['user'], 'testqa')
+
+    async def test_other_users_only_see_project_changes(self):
+        stream = await self.open_stream(self.analyst)
+        await sync_to_async(self.approve_project)()
+
+        event_name, data = self.parse(await self.next_event(stream))
+        self.assertEqual((event_name, data['status']), ('project', 'approved'))
+        # The QA user's audit entry is not relayed; the stream idles
+        self.assertEqual(await self.next_message(stream), ': keepalive\n\n')
+
+    async def test_entries_written_by_other_processes_are_relayed(self):
+        stream = await self.open_stream(self.analyst)
+        # Written straight to the table, as by a WSGI worker: no signal reaches this process
+        await AuditLog.objects.acreate(
+            user=self.qa, action='approve', object_type='project', object_id=self.project.id,
+            details={'new_project_status': 'approved'}
+        )
+        event_name, data = self.parse(await self.next_event(stream))
+        self.assertEqual((event_name, data['project_id'], data['status']), ('project', self.project.id, 'approved'))
+
+    async def test_project_filter(self):
+        stream = await self.open_stream(self.qa, project_id=self.project.id + 1)
+        await sync_to_async(self.approve_project)()
+        self.assertEqual(await self.next_message(stream), ': keepalive\n\n')
+
+    def test_requires_asgi(self):
+        client = Client()
+        client.force_login(self.qa)
+        response = client.get('/api/audit/events/')
+        self.assertEqual(response.status_code, 501)
+        self.assertIn('detail', response.json())
+
+    async def test_requires_login(self):
+        response = await self.async_client.get('/api/audit/events/')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'detail': 'Authentication credentials were not provided.'})
+
+    async def test_requires_analyst_role(self):
+        guest = await User.objects.acreate_user(username='guest', password='testpass123', role='guest')
+        await self.async_client.aforce_login(guest)
+        response = await self.async_client.get('/api/audit/events/')
+        self.assertEqual(response.status_code, 403)
+        self.assertIn('detail', response.json())
+
+    async def test_invalid_project_id(self):
+        await self.async_client.aforce_login(self.qa)
+        response = await self.async_client.get('/api/audit/events/', {'project_id': 'abc'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'project_id': 'Must be an integer'})
+
+    def tearDown(self):
+        # Streams abandoned by the tests above stay subscribed to the shared broker
+        broker._subscribers.clear()
@@ -4,6 +4,8 @@ from . import views
 app_name = 'audit'
 
 urlpatterns = [
-    path('', views.AuditLogListView.as_view(), name='audit-list'),
+    path('', views.audit_log_list, name='audit-list'),
+    path('events/', views.event_stream, name='audit-events'),
+    path('export/', views.export_audit_logs, name='audit-export'),
     path('<int:project_id>/', views.ProjectAuditLogListView.as_view(), name='project-audit-list'),
 ]
@@ -1,6 +1,89 @@
-import json
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from asgiref.sync import sync_to_async
+from django.db import transaction
 from django.utils import timezone
 from .models import AuditLog
+from .signals import audit_logged
+
+_active_buffer = ContextVar('audit_buffer', default=None)
+
+
+class AuditBuffer:
+    """
+    Collects audit entries and writes them with a single bulk_create.
+
+    An entry logged inside a transaction is only accepted once that
+    transaction commits (via transaction.on_commit), so actions that were
+    rolled back leave no audit trail, while committed ones are never lost.
+    Outside a transaction entries are accepted immediately.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.closed = False
+
+    def add(self, entry):
+        transaction.on_commit(lambda: self._accept(entry))
+
+    def _accept(self, entry):
+        if self.closed:
+            # The transaction outlived the buffer: write the entry directly
+            entry.save()
+            audit_logged.send(sender=AuditLog, entries=[entry])
+        else:
+            self.entries.append(entry)
+
+    def flush(self):
+        if self.entries:
+            AuditLog.objects.bulk_create(self.entries)
+            audit_logged.send(sender=AuditLog, entries=self.entries)
+            self.entries = []
+
+
+@contextmanager
+def buffered_audit_log():
+    """
+    Buffer audit entries logged in this context and flush them on exit.
+
+    Nested use shares the outermost buffer. Entries are flushed even if the
+    block raises, since their own transactions have already committed.
+    """
+    buffer = _active_buffer.get()
+    if buffer is not None:
+        yield buffer
+        return
+
+    buffer = AuditBuffer()
+    token = _active_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _active_buffer.reset(token)
+        try:
+            buffer.flush()
+        finally:
+            buffer.closed = True
+
+
+@asynccontextmanager
+async def abuffered_audit_log():
+    """buffered_audit_log() for async code; the flush runs in a worker thread"""
+    buffer = _active_buffer.get()
+    if buffer is not None:
+        yield buffer
+        return
+
+    buffer = AuditBuffer()
+    token = _active_buffer.set(buffer)
+    try:
+        yield buffer
+    finally:
+        _active_buffer.reset(token)
+        try:
+            await sync_to_async(buffer.flush)()
+        finally:
+            buffer.closed = True
 
 
 class AuditLogger:
@@ -8,17 +91,29 @@ class AuditLogger:
     
     @staticmethod
     def log_action(user, action, object_type, object_id, details=None):
-        """Create an audit log entry"""
+        """
+        Create an audit log entry.
+
+        Inside buffered_audit_log() the entry is queued and saved in bulk
+        when the buffer is flushed, so the returned entry has no pk yet.
+        """
         if not user or not user.is_authenticated:
             return None
             
-        audit_entry = AuditLog.objects.create(
+        audit_entry = AuditLog(
             user=user,
             action=action,
             object_type=object_type,
             object_id=object_id,
-            details=json.dumps(details) if details else ''
+            details=details or {}
         )
+
+        buffer = _active_buffer.get()
+        if buffer is not None:
+            buffer.add(audit_entry)
+        else:
+            audit_entry.save()
+            audit_logged.send(sender=AuditLog, entries=[audit_entry])
         return audit_entry
     
     @staticmethod
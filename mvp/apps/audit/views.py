@@ -1,34 +1,258 @@
-from rest_framework import generics
+import json
+from datetime import datetime, time, timedelta
+from rest_framework import generics, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import APIException, ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from .models import AuditLog
 from .serializers import AuditLogSerializer
-from apps.users.permissions import IsQAAdmin
+from .events import broker
+from .export import EXPORT_FORMATS, iter_audit_logs
+from .utils import AuditLogger
+from apps.users.permissions import IsAnalystOrHigher, IsQAAdmin
+from mvp.async_api import async_api_view, is_asgi_request, list_response, streaming_content
+
+
+def parse_timestamp_param(params, name):
+    """
+    Parse a date (YYYY-MM-DD) or ISO datetime query parameter.
+
+    Returns (aware datetime, is_whole_day), or (None, False) when absent.
+    """
+    value = params.get(name)
+    if not value:
+        return None, False
+
+    whole_day = False
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(value)
+            parsed = datetime.combine(day, time.min)
+            whole_day = True
+    except ValueError:
+        raise ValidationError({name: 'Must be a date (YYYY-MM-DD) or ISO 8601 datetime'})
+
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed, whole_day
+
+
+def filter_audit_logs(queryset, params):
+    """
+    Apply the action, object and date range filters shared by the audit endpoints.
+
+    Dates are turned into plain range comparisons on timestamp so the
+    (user, timestamp), (object_type, object_id, timestamp) and timestamp
+    indexes can be used.
+    """
+    action = params.get('action')
+    if action:
+        queryset = queryset.filter(action=action)
+
+    object_type = params.get('object_type')
+    if object_type:
+        queryset = queryset.filter(object_type=object_type)
+
+    object_id = params.get('object_id')
+    if object_id:
+        if not object_id.isdigit():
+            raise ValidationError({'object_id': 'Must be an integer'})
+        queryset = queryset.filter(object_id=object_id)
+
+    date_from, _ = parse_timestamp_param(params, 'date_from')
+    if date_from:
+        queryset = queryset.filter(timestamp__gte=date_from)
+
+    date_to, whole_day = parse_timestamp_param(params, 'date_to')
+    if date_to and whole_day:
+        # A plain end date includes that whole day
+        queryset = queryset.filter(timestamp__lt=date_to + timedelta(days=1))
+    elif date_to:
+        queryset = queryset.filter(timestamp__lte=date_to)
+
+    return queryset
 
 
 class AuditLogListView(generics.ListAPIView):
     serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated]
+    pagination_ordering = ('-timestamp', '-id')
 
     def get_queryset(self):
         user = self.request.user
+        params = self.request.query_params
+        queryset = AuditLog.objects.select_related('user')
         
         # Get query parameters
-        user_id = self.request.query_params.get('user_id')
+        user_id = params.get('user_id')
         
         # QA can see all logs or filter by specific user
         if user.role == 'qa':
             if user_id:
-                return AuditLog.objects.filter(user_id=user_id)
-            return AuditLog.objects.all()
-        
-        # Regular users can only see their own logs
-        return AuditLog.objects.filter(user=user)
+                if not user_id.isdigit():
+                    raise ValidationError({'user_id': 'Must be an integer'})
+                queryset = queryset.filter(user_id=user_id)
+        else:
+            # Regular users can only see their own logs
+            queryset = queryset.filter(user=user)
+
+        return filter_audit_logs(queryset, params)
+
+
+@async_api_view([IsAuthenticated])
+async def audit_log_list(request):
+    """AuditLogListView served without holding a worker thread"""
+    return await list_response(AuditLogListView, request)
 
 
 class ProjectAuditLogListView(generics.ListAPIView):
     serializer_class = AuditLogSerializer
     permission_classes = [IsAuthenticated, IsQAAdmin]
+    pagination_ordering = ('-timestamp', '-id')
 
     def get_queryset(self):
         project_id = self.kwargs['project_id']
-        return AuditLog.objects.filter(object_type='project', object_id=project_id)
+        queryset = AuditLog.objects.select_related('user').filter(object_type='project', object_id=project_id)
+        return filter_audit_logs(queryset, self.request.query_params)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsQAAdmin])
+def export_audit_logs(request):
+    """
+    Stream the audit trail as CSV or JSON Lines for inspectors.
+
+    Accepts file_format (csv or jsonl), project_id and user_id plus the
+    usual audit filters. Rows are read in keyset batches and written as
+    they are produced, so memory use is constant whatever the range.
+    """
+    params = request.query_params
+    file_format = params.get('file_format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        return Response(
+            {'error': f'file_format must be one of: {", ".join(EXPORT_FORMATS)}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    queryset = AuditLog.objects.all()
+    project_id = params.get('project_id')
+    if project_id:
+        if not project_id.isdigit():
+            raise ValidationError({'project_id': 'Must be an integer'})
+        # Validation submissions are logged against the project id as well
+        queryset = queryset.filter(object_type__in=['project', 'validation'], object_id=project_id)
+    user_id = params.get('user_id')
+    if user_id:
+        if not user_id.isdigit():
+            raise ValidationError({'user_id': 'Must be an integer'})
+        queryset = queryset.filter(user_id=user_id)
+    queryset = filter_audit_logs(queryset, params)
+
+    AuditLogger.log_action(
+        request.user,
+        'submit',
+        'audit',
+        0,
+        {'action': 'exported_audit_log', 'file_format': file_format, 'filters': params.dict()}
+    )
+
+    stream, content_type, extension = EXPORT_FORMATS[file_format]
+    response = StreamingHttpResponse(
+        streaming_content(request, stream(iter_audit_logs(queryset))), content_type=content_type
+    )
+    filename = f'audit_log_{timezone.now().strftime("%Y%m%d_%H%M%S")}.{extension}'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def sse_message(event_name, event_id, data):
+    """One server-sent event in text/event-stream framing"""
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f'id: {event_id}\nevent: {event_name}\ndata: {payload}\n\n'
+
+
+def event_messages(event, user, project_id=None):
+    """
+    Messages of a published event the user may receive.
+
+    Everybody who can open a project is told about its changes ('project'
+    events). Full audit entries ('audit' events) follow the audit list
+    rules: QA sees all of them, other users only their own.
+    """
+    if project_id is not None and event['project_id'] != project_id:
+        return []
+    messages = []
+    if event['project_id'] is not None:
+        messages.append(sse_message('project', event['id'], {
+            'project_id': event['project_id'],
+            'status': event['project_status'],
+            'action': event['action'],
+            'user': event['audit']['user'],
+        }))
+    if user.role == 'qa' or event['user_id'] == user.id:
+        messages.append(sse_message('audit', event['id'], event['audit']))
+    return messages
+
+
+async def stream_events(user, subscription, project_id=None):
+    """Relay broker events to one client, with keep-alive comments while idle"""
+    try:
+        yield f'retry: {settings.EVENT_STREAM_RETRY_MS}\n\n'
+        # A client that fell too far behind is dropped and catches up from
+        # the replay buffer when the browser reconnects
+        while not subscription.overflowed:
+            event = await subscription.get(timeout=settings.EVENT_STREAM_HEARTBEAT_SECONDS)
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            for message in event_messages(event, user, project_id):
+                yield message
+    finally:
+        broker.unsubscribe(subscription)
+
+
+class EventStreamUnavailable(APIException):
+    status_code = status.HTTP_501_NOT_IMPLEMENTED
+    default_detail = 'The event stream is only available when served through ASGI (mvp.asgi).'
+    default_code = 'not_implemented'
+
+
+@async_api_view([IsAuthenticated, IsAnalystOrHigher])
+async def event_stream(request):
+    """
+    Server-sent events with project status changes and audit entries.
+
+    Replaces polling: pages subscribe with EventSource, optionally limited
+    to one project with ?project_id=. Each stream holds a connection open,
+    so it is only served by the ASGI application (mvp.asgi), where an idle
+    stream costs no worker thread.
+    """
+    if not is_asgi_request(request):
+        raise EventStreamUnavailable()
+
+    project_id = request.query_params.get('project_id')
+    if project_id:
+        if not project_id.isdigit():
+            raise ValidationError({'project_id': 'Must be an integer'})
+        project_id = int(project_id)
+    else:
+        project_id = None
+
+    subscription = await broker.subscribe(
+        last_event_id=request.headers.get('Last-Event-ID'),
+        max_pending=settings.EVENT_STREAM_MAX_PENDING
+    )
+    response = StreamingHttpResponse(stream_events(request.user, subscription, project_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Keep nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,64 @@
+import hashlib
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from apps.users.serializers import UserSerializer
+from apps.validation.documents import document_list_payload, documents_prefetch
+from apps.validation.serializers import (
+    LinearityDataSerializer, AccuracyDataSerializer, PrecisionDataSerializer, LODLOQDataSerializer
+)
+from apps.validation.summary import (
+    build_validation_summary, get_step_data, get_steps_with_data, reviews_prefetch, steps_with_data_prefetch
+)
+from apps.validation.workflow import request_workflow_state
+from .models import Project
+from .serializers import ProjectSerializer
+
+PARAMETER_SERIALIZERS = {
+    'linearity': LinearityDataSerializer,
+    'accuracy': AccuracyDataSerializer,
+    'precision': PrecisionDataSerializer,
+    'lod_loq': LODLOQDataSerializer,
+}
+
+
+def bootstrap_queryset():
+    """
+    Projects with the whole graph the project detail page shows.
+
+    One query for the project and its users, then one each for the steps
+    (with their data rows), the parameter reviews and the documents. The
+    summary and workflow builders find these prefetches and query nothing.
+    """
+    return Project.objects.select_related('created_by', 'reviewer', 'qa_approver').prefetch_related(
+        steps_with_data_prefetch(),
+        reviews_prefetch(),
+        documents_prefetch(),
+    )
+
+
+def build_project_bootstrap(request, project):
+    """Project, current user, workflow, parameter data, summary and documents in one payload"""
+    steps = {step.step: step for step in get_steps_with_data(project)}
+    parameters = {}
+    for step_name, serializer_class in PARAMETER_SERIALIZERS.items():
+        data = get_step_data(steps[step_name]) if step_name in steps else None
+        parameters[step_name] = serializer_class(data).data if data else None
+
+    return {
+        'project': {
+            **ProjectSerializer(project).data,
+            'reviewer': project.reviewer.username if project.reviewer else None,
+            'qa_approver': project.qa_approver.username if project.qa_approver else None,
+        },
+        'current_user': UserSerializer(request.user).data,
+        'workflow': request_workflow_state(request, project),
+        'parameters': parameters,
+        'summary': build_validation_summary(project),
+        'documents': [document_list_payload(document) for document in project.documents.all()],
+    }
+
+
+def bootstrap_digest(payload):
+    """Hash of the rendered payload, used as its ETag"""
+    encoded = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
@@ -0,0 +1,241 @@
+import asyncio
+import io
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.test import Client, override_settings
+from apps.audit.models import AuditLog
+from apps.projects.models import Project
+from apps.validation.models import AccuracyData, LinearityData, SupportingDocument, ValidationStep
+
+ENDPOINTS = {
+    'projects': '/api/projects/',
+    'summary': '/api/validation/projects/{project_id}/summary/',
+    'audit': '/api/audit/',
+    'download': '/api/validation/projects/{project_id}/documents/{document_id}/download/',
+}
+HOST = 'localhost'
+
+
+def transfer_delay(size, client_mbps):
+    """Seconds a client with `client_mbps` of bandwidth needs to receive `size` bytes"""
+    return size * 8 / (client_mbps * 1_000_000) if client_mbps else 0
+
+
+def wsgi_get(application, path, cookie, client_mbps=None):
+    """Issue a GET through the WSGI application; returns (status, body bytes)"""
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+        'SERVER_NAME': HOST, 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': HOST, 'HTTP_COOKIE': cookie,
+        'wsgi.version': (1, 0), 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+    }
+    started = []
+    body = application(environ, lambda status, headers, exc_info=None: started.append(status))
+    size = 0
+    try:
+        for chunk in body:
+            size += len(chunk)
+            # The worker thread is busy writing to the socket until the client has read the chunk
+            time.sleep(transfer_delay(len(chunk), client_mbps))
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    return int(started[0].split()[0]), size
+
+
+async def asgi_get(application, path, cookie, client_mbps=None):
+    """Issue a GET through the ASGI application; returns (status, body bytes)"""
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+        'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': b'',
+        'headers': [(b'host', HOST.encode()), (b'cookie', cookie.encode())],
+        'client': ('127.0.0.1', 50000), 'server': (HOST, 80),
+    }
+    requested = False
+    response = {'status': None, 'size': 0}
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client stays connected; Django stops listening once the response is sent
+        await asyncio.Future()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        elif message['type'] == 'http.response.body':
+            chunk = message.get('body', b'')
+            response['size'] += len(chunk)
+            await asyncio.sleep(transfer_delay(len(chunk), client_mbps))
+
+    await application(scope, receive, send)
+    return response['status'], response['size']
+
+
+def run_wsgi(path, cookie, requests, concurrency, threads, client_mbps=None):
+    """
+    `requests` GETs from `concurrency` clients to a WSGI server with `threads`
+    worker threads (like gunicorn --threads). Requests wait for a free worker
+    in arrival order, as in the server's accept queue; latency includes that
+    wait.
+    """
+    application = get_wsgi_application()
+
+    with ThreadPoolExecutor(max_workers=threads) as workers:
+        def request(_):
+            start = time.perf_counter()
+            status, _ = workers.submit(wsgi_get, application, path, cookie, client_mbps).result()
+            return status, time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            results = list(clients.map(request, range(requests)))
+        return results, time.perf_counter() - start
+
+
+def run_asgi(path, cookie, requests, concurrency, client_mbps=None):
+    """`requests` GETs from `concurrency` clients to one ASGI event loop (like one uvicorn worker)"""
+    application = get_asgi_application()
+
+    async def client(count):
+        results = []
+        for _ in range(count):
+            start = time.perf_counter()
+            status, _ = await asgi_get(application, path, cookie, client_mbps)
+            results.append((status, time.perf_counter() - start))
+        return results
+
+    async def main():
+        counts = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+        batches = await asyncio.gather(*(client(count) for count in counts if count))
+        return [result for batch in batches for result in batch]
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    return results, time.perf_counter() - start
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent-request throughput of the hot read endpoints under WSGI and ASGI'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoints', nargs='+', choices=list(ENDPOINTS), default=list(ENDPOINTS),
+            help='Endpoints to benchmark'
+        )
+        parser.add_argument('--requests', type=int, default=400, help='Requests per endpoint and server')
+        parser.add_argument('--concurrency', type=int, default=32, help='Concurrent clients')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads')
+        parser.add_argument(
+            '--client-mbps', type=float,
+            help='Bandwidth of each client in Mbit/s (default: unlimited); slow clients hold WSGI threads'
+        )
+        parser.add_argument('--projects', type=int, default=200, help='Projects in the benchmark database')
+        parser.add_argument('--audit-entries', type=int, default=2000, help='Audit entries in the benchmark database')
+        parser.add_argument('--download-kb', type=int, default=1024, help='Size of the downloaded document')
+
+    def handle(self, *args, **options):
+        # Everything runs against a throwaway database and media root
+        work_dir = tempfile.mkdtemp(prefix='benchmark_')
+        old_name = connection.settings_dict['NAME']
+        connection.settings_dict['TEST']['NAME'] = os.path.join(work_dir, 'benchmark.sqlite3')
+        try:
+            with override_settings(MEDIA_ROOT=work_dir, DEBUG=False, ALLOWED_HOSTS=[HOST]):
+                connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+                try:
+                    cookie, paths = self.seed(options)
+                    connections.close_all()
+                    self.benchmark(cookie, paths, options)
+                finally:
+                    connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def seed(self, options):
+        user = get_user_model().objects.create_user(username='benchmark', password='benchmark', role='qa')
+        Project.objects.bulk_create([
+            Project(method_name=f'Method {i}', product_name='Benchmark', technique='hplc', created_by=user)
+            for i in range(options['projects'])
+        ])
+        project = Project.objects.create(
+            method_name='Summary method', product_name='Benchmark', technique='hplc', status='review', created_by=user
+        )
+        step = ValidationStep.objects.create(project=project, step='linearity', completed=True, passed=True)
+        LinearityData.objects.create(
+            validation_step=step, concentrations=[50, 75, 100, 125, 150], responses=[5000, 7500, 10000, 12500, 15000],
+            slope=100.0, intercept=0.0, r_squared=1.0, passed=True
+        )
+        step = ValidationStep.objects.create(project=project, step='accuracy', completed=True, passed=True)
+        AccuracyData.objects.create(
+            validation_step=step, level='100', measured_values=[99.5, 100.2, 100.1], mean_recovery=99.9, rsd=0.4,
+            passed=True
+        )
+        AuditLog.objects.bulk_create([
+            AuditLog(user=user, action='submit', object_type='project', object_id=project.id, details={'n': i})
+            for i in range(options['audit_entries'])
+        ])
+        content = os.urandom(options['download_kb'] * 1024)
+        document = SupportingDocument.objects.create(
+            project=project, file=ContentFile(content, name='benchmark.pdf'), file_type='other',
+            file_name='benchmark.pdf', file_size=len(content), uploaded_by=user
+        )
+
+        client = Client()
+        client.force_login(user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+        paths = {
+            name: ENDPOINTS[name].format(project_id=project.id, document_id=document.id)
+            for name in options['endpoints']
+        }
+        return cookie, paths
+
+    def benchmark(self, cookie, paths, options):
+        requests = options['requests']
+        concurrency = options['concurrency']
+        client_mbps = options['client_mbps']
+        bandwidth = f'{client_mbps:g} Mbit/s' if client_mbps else 'unlimited bandwidth'
+        self.stdout.write(
+            f'{requests} requests per run from {concurrency} clients ({bandwidth}); '
+            f'WSGI with {options["threads"]} threads, ASGI on one event loop'
+        )
+        self.stdout.write(
+            f'{"endpoint":<10} {"WSGI req/s":>11} {"ASGI req/s":>11} {"ratio":>6} '
+            f'{"WSGI mean":>10} {"ASGI mean":>10} {"WSGI p95":>9} {"ASGI p95":>9} {"errors":>7}'
+        )
+        for name, path in paths.items():
+            # Warm up both servers (URL resolution, imports, connections)
+            run_wsgi(path, cookie, options['threads'], options['threads'], options['threads'])
+            run_asgi(path, cookie, options['threads'], options['threads'])
+
+            wsgi_results, wsgi_time = run_wsgi(path, cookie, requests, concurrency, options['threads'], client_mbps)
+            asgi_results, asgi_time = run_asgi(path, cookie, requests, concurrency, client_mbps)
+            errors = sum(1 for status, _ in wsgi_results + asgi_results if status != 200)
+
+            wsgi_rate = requests / wsgi_time
+            asgi_rate = requests / asgi_time
+            self.stdout.write(
+                f'{name:<10} {wsgi_rate:>11.1f} {asgi_rate:>11.1f} {asgi_rate / wsgi_rate:>5.2f}x '
+                f'{self.mean(wsgi_results):>8.1f}ms {self.mean(asgi_results):>8.1f}ms '
+                f'{self.p95(wsgi_results):>7.1f}ms {self.p95(asgi_results):>7.1f}ms {errors:>7}'
+            )
+
+    def mean(self, results):
+        return statistics.mean(elapsed for _, elapsed in results) * 1000
+
+    def p95(self, results):
+        return statistics.quantiles([elapsed for _, elapsed in results], n=20)[-1] * 1000
@@ -44,3 +44,5 @@ class Project(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        # Status-filtered project lists, newest first
+        indexes = [models.Index(fields=['status', '-created_at'], name='project_status_created_idx')]
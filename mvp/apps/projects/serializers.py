@@ -9,9 +9,9 @@ class ProjectSerializer(serializers.ModelSerializer):
         model = Project
         fields = [
             'id', 'created_by', 'method_name', 'method_type', 'technique',
-            'guideline', 'product_name', 'status', 'created_at', 'updated_at'
+            'guideline', 'product_name', 'status', 'report_generated', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_by', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'created_by', 'report_generated', 'created_at', 'updated_at']
 
 
 class ProjectCreateSerializer(serializers.ModelSerializer):
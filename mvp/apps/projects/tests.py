@@ -1,3 +1,176 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from django.core.files.base import ContentFile
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from apps.projects.models import Project
+from apps.validation.models import ValidationStep, LinearityData, ParameterReview, SupportingDocument
 
-# Create your tests here.
+User = get_user_model()
+
+
+class ProjectStatsTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.reviewer = User.objects.create_user(username='testreviewer', password='testpass123', role='reviewer')
+        self.client.force_login(self.user)
+
+        for status, technique, reviewer in [
+            ('draft', 'hplc', None),
+            ('draft', 'uv', None),
+            ('review', 'hplc', self.reviewer),
+            ('approved', 'hplc', self.reviewer),
+        ]:
+            Project.objects.create(
+                method_name=f'{status} method', product_name='Product', technique=technique,
+                status=status, reviewer=reviewer, created_by=self.user,
+                approved_at=timezone.now() if status == 'approved' else None
+            )
+        old = Project.objects.create(method_name='Old method', product_name='Product', technique='uv', created_by=self.user)
+        Project.objects.filter(id=old.id).update(
+            created_at=timezone.now() - timedelta(days=30), updated_at=timezone.now() - timedelta(days=30)
+        )
+
+    def test_stats_from_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.get_stats()
+        # Session and user lookups aside, a single grouped query
+        self.assertEqual(len([q for q in queries if 'projects_project' in q['sql']]), 1)
+        self.assertEqual(stats['total'], 5)
+        self.assertEqual(stats['by_status']['draft'], 3)
+        self.assertEqual(stats['by_status']['review'], 1)
+        self.assertEqual(stats['by_status']['linearity'], 0)
+        self.assertEqual(stats['by_technique'], {'hplc': 3, 'uv': 2})
+        self.assertEqual(stats['by_reviewer'], {'testreviewer': 2})
+        self.assertEqual(stats['unassigned'], 3)
+        self.assertEqual(stats['recent_activity']['created'], 4)
+        self.assertEqual(stats['recent_activity']['approved'], 1)
+
+    def get_stats(self):
+        response = self.client.get('/api/projects/stats/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_status_filter(self):
+        response = self.client.get('/api/projects/', {'status': 'review,approved'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(p['status'] for p in response.json()['results']), ['approved', 'review'])
+
+        response = self.client.get('/api/projects/', {'status': 'finished'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('finished', response.json()['error'])
+
+
+class ProjectListTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client.force_login(self.user)
+        for i in range(3):
+            Project.objects.create(method_name=f'Method {i}', product_name='Product', technique='hplc', created_by=self.user)
+
+    async def test_list_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get('/api/projects/', {'page_size': 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([p['method_name'] for p in data['results']], ['Method 2', 'Method 1'])
+        self.assertEqual(data['results'][0]['created_by'], str(self.user))
+        self.assertIsNotNone(data['next'])
+
+    async def test_requires_login(self):
+        response = await self.async_client.get('/api/projects/')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.json(), {'detail': 'Authentication credentials were not provided.'})
+
+    def test_create_goes_to_drf_view(self):
+        response = self.client.post(
+            '/api/projects/',
+            {'method_name': 'New Method', 'product_name': 'Product', 'technique': 'uv'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Project.objects.filter(method_name='New Method', created_by=self.user).exists())
+        self.assertEqual(self.client.delete('/api/projects/').status_code, 405)
+
+
+class ProjectBootstrapTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.reviewer = User.objects.create_user(username='testreviewer', password='testpass123', role='reviewer')
+        self.client.force_login(self.user)
+
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc',
+            status='accuracy', created_by=self.user, reviewer=self.reviewer
+        )
+        step = ValidationStep.objects.create(project=self.project, step='linearity', completed=True, passed=True)
+        LinearityData.objects.create(
+            validation_step=step, concentrations=[1, 2, 3], responses=[10, 20, 30],
+            slope=10.0, intercept=0.0, r_squared=1.0, passed=True
+        )
+        ParameterReview.objects.create(
+            project=self.project, parameter_name='linearity', decision='approve',
+            comments='Fine', reviewed_by=self.reviewer
+        )
+        self.add_document('notes.txt')
+        self.url = f'/api/projects/{self.project.id}/bootstrap/'
+
+    def add_document(self, file_name):
+        content = file_name.encode()
+        return SupportingDocument.objects.create(
+            project=self.project, file=ContentFile(content, name=file_name), file_type='other',
+            file_name=file_name, file_size=len(content), uploaded_by=self.user
+        )
+
+    def bootstrap(self, **headers):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, **headers)
+        # Session and request.user lookups aside
+        project_queries = [q for q in queries if 'projects_project' in q['sql'] or 'validation_' in q['sql']]
+        return response, len(project_queries)
+
+    def test_payload(self):
+        response, _ = self.bootstrap()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['project']['method_name'], 'Test HPLC Method')
+        self.assertEqual(data['project']['reviewer'], 'testreviewer')
+        self.assertEqual(data['current_user']['username'], 'testanalyst')
+        self.assertEqual(data['workflow']['completed_steps'], ['linearity'])
+        self.assertEqual(data['parameters']['linearity']['concentrations'], [1.0, 2.0, 3.0])
+        self.assertIsNone(data['parameters']['accuracy'])
+        self.assertEqual(data['summary']['parameter_reviews'][0]['reviewed_by'], 'testreviewer')
+        self.assertEqual([d['file_name'] for d in data['documents']], ['notes.txt'])
+
+    def test_query_count_independent_of_document_count(self):
+        _, few = self.bootstrap()
+        for i in range(3):
+            self.add_document(f'extra{i}.txt')
+        _, many = self.bootstrap()
+        self.assertEqual(few, many)
+        # Project with its users, steps with data, reviews, documents
+        self.assertEqual(many, 4)
+
+    def test_etag(self):
+        response, _ = self.bootstrap()
+        etag = response['ETag']
+        response, _ = self.bootstrap(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.add_document('later.txt')
+        response, _ = self.bootstrap(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
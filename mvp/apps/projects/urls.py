@@ -4,8 +4,10 @@ from . import views
 app_name = 'projects'
 
 urlpatterns = [
-    path('', views.ProjectListCreateView.as_view(), name='project-list-create'),
+    path('', views.project_list, name='project-list-create'),
+    path('stats/', views.project_stats, name='project-stats'),
     path('<int:pk>/', views.ProjectDetailView.as_view(), name='project-detail'),
+    path('<int:project_id>/bootstrap/', views.project_bootstrap, name='project-bootstrap'),
     path('<int:project_id>/workflow/', views.project_workflow, name='project-workflow'),
     path('<int:project_id>/start-validation/', views.start_validation, name='start-validation'),
     path('<int:project_id>/review/', views.review_project, name='review-project'),
@@ -1,23 +1,42 @@
+from collections import Counter
+from datetime import timedelta
 from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.db.models import Count, Q
+from django.http import HttpResponseNotModified
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from mvp.async_api import async_api_view, list_response
+from .bootstrap import bootstrap_digest, bootstrap_queryset, build_project_bootstrap
 from .models import Project
 from .serializers import ProjectSerializer, ProjectCreateSerializer
 from apps.users.permissions import IsAnalystOrHigher, IsReviewerOrHigher, IsQAAdmin
 from apps.audit.utils import AuditLogger
+from apps.validation.workflow import STEPS_PREFETCH, request_workflow_state
 
 
 class ProjectListCreateView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated, IsAnalystOrHigher]
+    pagination_ordering = ('-created_at', '-id')
 
     def get_queryset(self):
         # For MVP, users can see projects they created or have access to
         # For simplicity, all projects if analyst or higher
         # Order by most recent first
-        return Project.objects.all().order_by('-created_at')
+        projects = Project.objects.select_related('created_by').order_by('-created_at')
+
+        # ?status=review or ?status=draft,linearity
+        statuses = [value for value in self.request.query_params.get('status', '').split(',') if value]
+        if statuses:
+            unknown = set(statuses) - set(dict(Project.STATUS_CHOICES))
+            if unknown:
+                raise ValidationError({'error': f'Unknown status: {", ".join(sorted(unknown))}'})
+            projects = projects.filter(status__in=statuses)
+        return projects
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -34,6 +53,61 @@ class ProjectListCreateView(generics.ListCreateAPIView):
         )
 
 
+@async_api_view([IsAuthenticated, IsAnalystOrHigher], fallback=ProjectListCreateView.as_view())
+async def project_list(request):
+    """Project list served without holding a worker thread; POST creates through ProjectListCreateView"""
+    return await list_response(ProjectListCreateView, request)
+
+
+# Window for the "recent activity" counts of the stats endpoint
+RECENT_ACTIVITY_DAYS = 7
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAnalystOrHigher])
+def project_stats(request):
+    """
+    Project counts for dashboards.
+
+    One grouped query returns a row per (status, technique, reviewer)
+    combination, with the recent activity counted conditionally in the same
+    rows; the per-field totals are rolled up from those few rows here.
+    """
+    since = timezone.now() - timedelta(days=RECENT_ACTIVITY_DAYS)
+    rows = Project.objects.order_by().values('status', 'technique', 'reviewer__username').annotate(
+        count=Count('id'),
+        created_recently=Count('id', filter=Q(created_at__gte=since)),
+        updated_recently=Count('id', filter=Q(updated_at__gte=since)),
+        approved_recently=Count('id', filter=Q(approved_at__gte=since)),
+    )
+
+    by_status = Counter({value: 0 for value, _ in Project.STATUS_CHOICES})
+    by_technique = Counter({value: 0 for value, _ in Project.TECHNIQUE_CHOICES})
+    by_reviewer = Counter()
+    recent = Counter()
+    for row in rows:
+        by_status[row['status']] += row['count']
+        by_technique[row['technique']] += row['count']
+        by_reviewer[row['reviewer__username']] += row['count']
+        for key in ('created_recently', 'updated_recently', 'approved_recently'):
+            recent[key] += row[key]
+
+    unassigned = by_reviewer.pop(None, 0)
+    return Response({
+        'total': sum(by_status.values()),
+        'by_status': dict(by_status),
+        'by_technique': dict(by_technique),
+        'by_reviewer': dict(by_reviewer),
+        'unassigned': unassigned,
+        'recent_activity': {
+            'days': RECENT_ACTIVITY_DAYS,
+            'created': recent['created_recently'],
+            'updated': recent['updated_recently'],
+            'approved': recent['approved_recently'],
+        },
+    })
+
+
 class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
@@ -43,50 +117,30 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAnalystOrHigher])
 def project_workflow(request, project_id):
-    project = get_object_or_404(Project, id=project_id)
-    
-    # Define workflow steps and their order
-    workflow_steps = ['draft', 'linearity', 'accuracy', 'precision', 'lod_loq', 'review', 'approved']
-    validation_steps = ['linearity', 'accuracy', 'precision', 'lod_loq']
-    
-    current_index = workflow_steps.index(project.status)
-    
-    # Determine allowed actions based on current status and user role
-    allowed_actions = []
-    locked_steps = []
-    
-    if project.status == 'draft':
-        allowed_actions = ['start_validation']
-        locked_steps = validation_steps + ['review', 'approved']
-    elif project.status in validation_steps:
-        allowed_actions = ['submit_validation_data']
-        # Lock steps before current
-        locked_steps = workflow_steps[:current_index]
-        # Lock steps after review
-        locked_steps.extend(['review', 'approved'])
-    elif project.status == 'review':
-        if request.user.role in ['reviewer', 'qa']:
-            allowed_actions = ['review_project']
-        locked_steps = workflow_steps[:current_index] + ['approved']
-    elif project.status == 'approved':
-        if request.user.role == 'qa':
-            allowed_actions = ['generate_report', 'view_audit_log']
-        locked_steps = workflow_steps[:current_index]
-    
-    workflow = {
-        'current_step': project.status,
-        'current_step_index': current_index,
-        'total_steps': len(workflow_steps),
-        'allowed_next_actions': allowed_actions,
-        'locked_steps': locked_steps,
-        'workflow_steps': workflow_steps,
-        'validation_steps': validation_steps,
-        'can_edit': project.status not in ['review', 'approved'],
-        'is_locked': project.status == 'approved',
-        'reviewer_assigned': project.reviewer is not None,
-        'qa_approver_assigned': project.qa_approver is not None,
-    }
-    return Response(workflow)
+    project = get_object_or_404(Project.objects.prefetch_related(STEPS_PREFETCH), id=project_id)
+    return Response(request_workflow_state(request, project))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAnalystOrHigher])
+def project_bootstrap(request, project_id):
+    """Everything the project detail page needs for its first paint, in one response."""
+    project = get_object_or_404(bootstrap_queryset(), id=project_id)
+    payload = build_project_bootstrap(request, project)
+    etag = quote_etag(bootstrap_digest(payload))
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        if '*' in etags or etag in etags:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            return response
+
+    response = Response(payload)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 @api_view(['POST'])
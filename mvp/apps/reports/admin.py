@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import ReportJob
 
-# Register your models here.
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'project', 'requested_by', 'status', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('project__method_name', 'requested_by__username')
+    readonly_fields = ('project', 'requested_by', 'digest', 'error', 'created_at', 'started_at', 'finished_at')
+
+admin.site.register(ReportJob, ReportJobAdmin)
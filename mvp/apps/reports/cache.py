@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import tempfile
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from apps.validation.summary import build_validation_summary
+from .pdf import generate_comprehensive_pdf
+
+# Bump when the PDF layout changes so previously cached reports are re-rendered
+REPORT_LAYOUT_VERSION = 1
+
+
+def get_report_cache_dir(project):
+    """Directory holding the cached report PDFs for a project"""
+    return os.path.join(settings.REPORT_CACHE_ROOT, str(project.id))
+
+
+def display_name(user):
+    """How a user is printed on the report (see pdf.py)"""
+    return user.username if user else None
+
+
+def report_fingerprint(project):
+    """
+    Hash everything the PDF report is rendered from.
+
+    The digest only changes when project metadata, sign-offs or validation
+    data change, so it can be used both as the cache key and as the ETag.
+    """
+    summary = build_validation_summary(project)
+    payload = {
+        'layout_version': REPORT_LAYOUT_VERSION,
+        'project': {
+            'id': project.id,
+            'method_name': project.method_name,
+            'method_type': project.method_type,
+            'technique': project.technique,
+            'guideline': project.guideline,
+            'product_name': project.product_name,
+            'status': project.status,
+            # The names printed on the report, so renaming a user re-renders it
+            'created_by': display_name(project.created_by),
+            'created_at': project.created_at,
+            'reviewer': display_name(project.reviewer),
+            'reviewed_at': project.reviewed_at,
+            'qa_approver': display_name(project.qa_approver),
+            'approved_at': project.approved_at,
+        },
+        'validation_steps': summary['validation_steps'],
+    }
+    encoded = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def get_cached_report_path(project, digest):
+    """Path of the cached PDF for a digest, or None if it has not been rendered yet"""
+    path = os.path.join(get_report_cache_dir(project), f'{digest}.pdf')
+    return path if os.path.exists(path) else None
+
+
+def store_report(project, digest, pdf_content):
+    """
+    Atomically write a rendered report into the cache and drop stale versions.
+
+    The PDF is written to a temporary file and renamed into place, so
+    concurrent readers never see a partially written report.
+    """
+    cache_dir = get_report_cache_dir(project)
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f'{digest}.pdf')
+
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(pdf_content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    for name in os.listdir(cache_dir):
+        if name.endswith('.pdf') and name != f'{digest}.pdf':
+            os.remove(os.path.join(cache_dir, name))
+
+    return path
+
+
+def get_or_render_report(project):
+    """Return (path, digest) of the project's report, rendering it only on a cache miss"""
+    digest = report_fingerprint(project)
+    path = get_cached_report_path(project, digest)
+    if path is None:
+        path = store_report(project, digest, generate_comprehensive_pdf(project))
+    return path, digest
@@ -0,0 +1,131 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.text import slugify
+from apps.projects.models import Project
+from apps.validation.models import SupportingDocument
+from apps.validation.summary import build_validation_summary
+from .cache import get_cached_report_path, get_or_render_report, report_fingerprint
+from .worker import init_worker_process, render_project_report
+from .zipstream import stream_zip, iter_file_chunks
+
+
+def get_export_projects(product_name=None, approved_from=None, approved_to=None):
+    """Approved projects selected for a bulk report export"""
+    projects = Project.objects.filter(status='approved')
+    if product_name:
+        projects = projects.filter(product_name__iexact=product_name)
+    if approved_from:
+        projects = projects.filter(approved_at__date__gte=approved_from)
+    if approved_to:
+        projects = projects.filter(approved_at__date__lte=approved_to)
+    return projects.order_by('approved_at', 'id')
+
+
+def iter_rendered_reports(project_ids, workers):
+    """
+    Yield (project_id, pdf_path) as each report finishes rendering.
+
+    Reports are rendered into the report cache by a spawned process pool, so
+    only file paths travel back to this process. With workers=0 they are
+    rendered inline, one after another.
+    """
+    if workers == 0:
+        for project_id in project_ids:
+            yield render_project_report(project_id)
+        return
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=get_context('spawn'),
+        initializer=init_worker_process
+    )
+    try:
+        futures = [executor.submit(render_project_report, project_id) for project_id in project_ids]
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Also reached when the client disconnects mid-download
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def report_archive_name(project):
+    """File name of a project's report inside the export archive"""
+    return f'validation_report_{project.id}_{slugify(project.method_name)}.pdf'
+
+
+def stream_reports_zip(projects, workers):
+    """Stream a ZIP of the reports of `projects`, adding each PDF as soon as it is rendered"""
+    names = {project.id: report_archive_name(project) for project in projects}
+    entries = (
+        (names[project_id], iter_file_chunks(path))
+        for project_id, path in iter_rendered_reports(list(names), workers)
+    )
+    return stream_zip(entries)
+
+
+def find_cached_reports(projects):
+    """
+    Split projects into (cached, missing).
+
+    `cached` maps project ids to the path of their up-to-date cached report;
+    `missing` lists the projects whose report still has to be rendered.
+    """
+    cached, missing = {}, []
+    for project in projects:
+        path = get_cached_report_path(project, report_fingerprint(project))
+        if path:
+            cached[project.id] = path
+        else:
+            missing.append(project)
+    return cached, missing
+
+
+def stream_cached_reports_zip(projects, cached):
+    """Stream a ZIP of already rendered reports; `cached` comes from find_cached_reports()"""
+    return stream_zip(
+        (report_archive_name(project), iter_file_chunks(cached[project.id]))
+        for project in projects
+    )
+
+
+def document_archive_name(document):
+    """Path of a supporting document inside a dossier; the id keeps equal file names apart"""
+    return f'documents/{document.id}_{os.path.basename(document.file_name)}'
+
+
+def iter_summary_json(project):
+    yield json.dumps(build_validation_summary(project), indent=2, cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def iter_report_chunks(project):
+    """Chunks of the project's PDF report, rendered into the report cache when first read"""
+    path, _ = get_or_render_report(project)
+    yield from iter_file_chunks(path)
+
+
+def dossier_entries(project, documents):
+    """
+    (archive_name, chunks) pairs of a project dossier.
+
+    Each entry's chunks are produced only when the archive reaches it, so the
+    report is rendered and the documents are opened one at a time while the
+    ZIP is being sent.
+    """
+    yield 'validation_summary.json', iter_summary_json(project)
+    if project.report_generated:
+        yield report_archive_name(project), iter_report_chunks(project)
+    for document in documents:
+        yield document_archive_name(document), iter_file_chunks(document.file.path)
+
+
+def get_dossier_documents(project):
+    """Supporting documents included in a project dossier"""
+    return SupportingDocument.objects.filter(project=project).order_by('uploaded_at', 'id')
+
+
+def stream_project_dossier(project, documents):
+    """Stream a ZIP with the validation summary, report and supporting documents of a project"""
+    return stream_zip(dossier_entries(project, documents))
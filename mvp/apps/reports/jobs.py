@@ -0,0 +1,117 @@
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from apps.audit.utils import AuditLogger
+from .models import ReportJob
+from .cache import get_or_render_report
+
+ACTIVE_STATUSES = ['queued', 'running']
+
+# A running job older than this is assumed to belong to a dead worker
+DEFAULT_STALE_AFTER = timedelta(minutes=30)
+
+
+def enqueue_report(project, user):
+    """
+    Queue a report for rendering, reusing an already pending job for the project.
+
+    Two requests can both find no pending job; the one_active_report_job
+    constraint lets only one insert succeed and the other reuses its job.
+    """
+    while True:
+        job = ReportJob.objects.filter(project=project, status__in=ACTIVE_STATUSES).first()
+        if job:
+            return job, False
+        try:
+            with transaction.atomic():
+                job = ReportJob.objects.create(project=project, requested_by=user)
+            break
+        except IntegrityError:
+            # Queued by a concurrent request since the check; look it up again
+            continue
+
+    AuditLogger.log_project_action(
+        user,
+        'submit',
+        project,
+        {'action': 'queued_report', 'job_id': job.id}
+    )
+    return job, True
+
+
+def serialize_job(job):
+    """Status payload returned to the frontend while it polls a job"""
+    return {
+        'job_id': job.id,
+        'project_id': job.project_id,
+        'status': job.status,
+        'error': job.error or None,
+        'created_at': job.created_at,
+        'started_at': job.started_at,
+        'finished_at': job.finished_at,
+        'download_url': f'/api/reports/{job.project_id}/' if job.status == 'done' else None,
+    }
+
+
+def claim_jobs(limit):
+    """
+    Atomically move up to `limit` queued jobs to running.
+
+    The conditional update makes it safe to run several worker commands
+    against the same database: a job is only claimed by one of them.
+    """
+    claimed = []
+    candidates = ReportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True)[:limit]
+    for job_id in list(candidates):
+        updated = ReportJob.objects.filter(id=job_id, status='queued').update(
+            status='running',
+            started_at=timezone.now()
+        )
+        if updated:
+            claimed.append(job_id)
+    return claimed
+
+
+def requeue_stale_jobs(max_age):
+    """Put jobs back in the queue whose worker died while rendering them"""
+    cutoff = timezone.now() - max_age
+    return ReportJob.objects.filter(status='running', started_at__lt=cutoff).update(status='queued', started_at=None)
+
+
+def render_report_job(job_id):
+    """Render the report for a job and return its cache digest"""
+    job = ReportJob.objects.select_related('project').get(id=job_id)
+    _, digest = get_or_render_report(job.project)
+    return digest
+
+
+def complete_job(job_id, digest):
+    """Mark a job as done and flag the project report as generated"""
+    job = ReportJob.objects.select_related('project', 'requested_by').get(id=job_id)
+    job.status = 'done'
+    job.digest = digest
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'digest', 'finished_at'])
+
+    project = job.project
+    if not project.report_generated:
+        project.report_generated = True
+        project.save(update_fields=['report_generated', 'updated_at'])
+
+    AuditLogger.log_project_action(
+        job.requested_by,
+        'submit',
+        project,
+        {'action': 'generated_report', 'generated_by': job.requested_by.username, 'job_id': job.id}
+    )
+    return job
+
+
+def fail_job(job_id, error):
+    """Mark a job as failed, keeping the error for the status endpoint"""
+    ReportJob.objects.filter(id=job_id).update(
+        status='failed',
+        error=str(error),
+        finished_at=timezone.now()
+    )
+
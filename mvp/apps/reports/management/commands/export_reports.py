@@ -0,0 +1,45 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from apps.reports.export import get_export_projects, stream_reports_zip
+
+
+class Command(BaseCommand):
+    help = 'Render the reports of approved projects in parallel into one ZIP archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the ZIP file to write')
+        parser.add_argument('--product', help='Only export projects for this product name')
+        parser.add_argument('--approved-from', help='Only projects approved on or after this date (YYYY-MM-DD)')
+        parser.add_argument('--approved-to', help='Only projects approved on or before this date (YYYY-MM-DD)')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of rendering processes (0 renders inline in this process)'
+        )
+
+    def handle(self, *args, **options):
+        approved_from = self.parse_date_option(options, 'approved_from')
+        approved_to = self.parse_date_option(options, 'approved_to')
+
+        projects = list(get_export_projects(options['product'], approved_from, approved_to))
+        if not projects:
+            raise CommandError('No approved projects match the filters')
+
+        self.stdout.write(f'Exporting {len(projects)} reports...')
+        with open(options['output'], 'wb') as output:
+            for chunk in stream_reports_zip(projects, options['workers']):
+                output.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(projects)} reports to {options["output"]}'))
+
+    def parse_date_option(self, options, name):
+        value = options[name]
+        if not value:
+            return None
+        try:
+            parsed = parse_date(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise CommandError(f'--{name.replace("_", "-")} must be a date in YYYY-MM-DD format')
+        return parsed
@@ -0,0 +1,101 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import get_context
+from django.core.management.base import BaseCommand
+from apps.reports.models import ReportJob
+from apps.reports.jobs import (
+    DEFAULT_STALE_AFTER, claim_jobs, requeue_stale_jobs, render_report_job, complete_job, fail_job
+)
+from apps.reports.worker import init_worker_process, render_report
+
+
+class Command(BaseCommand):
+    help = 'Render queued PDF reports in a pool of worker processes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Number of rendering processes (0 renders inline in this process)'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help='Seconds to wait between queue polls when idle'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once the queue is drained instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        self.poll_interval = options['poll_interval']
+        self.once = options['once']
+
+        if workers == 0:
+            self.run_inline()
+            return
+
+        # Spawned (not forked) children so no database connection is shared with this process
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context('spawn'),
+            initializer=init_worker_process
+        )
+        self.stdout.write(f'Report worker started with {workers} processes')
+        try:
+            self.run_pool(executor, workers)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def run_pool(self, executor, workers):
+        in_flight = {}
+        try:
+            while True:
+                requeue_stale_jobs(DEFAULT_STALE_AFTER)
+                for job_id in claim_jobs(workers - len(in_flight)):
+                    in_flight[executor.submit(render_report, job_id)] = job_id
+
+                if not in_flight:
+                    if self.once:
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+
+                done, _ = wait(in_flight, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = in_flight.pop(future)
+                    try:
+                        self.finish(job_id, future.result())
+                    except Exception as e:
+                        self.fail(job_id, e)
+        except KeyboardInterrupt:
+            # Hand unfinished jobs back to the queue for the next worker
+            ReportJob.objects.filter(id__in=in_flight.values(), status='running').update(status='queued', started_at=None)
+            self.stdout.write('Report worker stopped')
+
+    def run_inline(self):
+        while True:
+            requeue_stale_jobs(DEFAULT_STALE_AFTER)
+            claimed = claim_jobs(1)
+            if not claimed:
+                if self.once:
+                    break
+                time.sleep(self.poll_interval)
+                continue
+
+            job_id = claimed[0]
+            try:
+                digest = render_report_job(job_id)
+            except Exception as e:
+                self.fail(job_id, e)
+            else:
+                self.finish(job_id, digest)
+
+    def finish(self, job_id, digest):
+        complete_job(job_id, digest)
+        self.stdout.write(self.style.SUCCESS(f'Rendered report job {job_id}'))
+
+    def fail(self, job_id, error):
+        fail_job(job_id, error)
+        self.stderr.write(f'Report job {job_id} failed: {error}')
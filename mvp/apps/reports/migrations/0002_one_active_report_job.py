@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_duplicate_active_jobs(apps, schema_editor):
+    # Jobs queued twice by racing requests: keep the oldest active job per project
+    ReportJob = apps.get_model('reports', 'ReportJob')
+    kept = set()
+    for job in ReportJob.objects.filter(status__in=['queued', 'running']).order_by('created_at', 'id'):
+        if job.project_id in kept:
+            ReportJob.objects.filter(id=job.id).update(status='failed', error='Duplicate of an earlier job')
+        kept.add(job.project_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_status_index'),
+        ('reports', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_active_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='reportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('project',), name='one_active_report_job'),
+        ),
+    ]
@@ -1,3 +1,360 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import async_to_sync
+from io import BytesIO, StringIO
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from apps.projects.models import Project
+from apps.validation.models import ValidationStep, LinearityData, PrecisionData, SupportingDocument
+from apps.audit.models import AuditLog
+from apps.reports import cache
+from apps.reports.jobs import enqueue_report
+from apps.reports.models import ReportJob
+from apps.reports.pdf import generate_comprehensive_pdf
+from apps.reports.zipstream import stream_zip
 
-# Create your tests here.
+User = get_user_model()
+
+
+def run_worker():
+    call_command('run_report_worker', workers=0, once=True, stdout=StringIO(), stderr=StringIO())
+
+
+class ReportCacheTest(TestCase):
+    def setUp(self):
+        self.cache_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_root, ignore_errors=True)
+        settings_override = override_settings(REPORT_CACHE_ROOT=self.cache_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testqa', password='testpass123', role='qa')
+        self.client.force_login(self.user)
+
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method',
+            product_name='Test Product',
+            technique='hplc',
+            status='approved',
+            created_by=self.user,
+            reviewer=self.user,
+            reviewed_at=timezone.now(),
+            qa_approver=self.user,
+            approved_at=timezone.now()
+        )
+        step = ValidationStep.objects.create(project=self.project, step='linearity', completed=True, passed=True)
+        LinearityData.objects.create(
+            validation_step=step, concentrations=[1, 2, 3, 4, 5], responses=[10, 20, 30, 40, 50],
+            slope=10.0, intercept=0.0, r_squared=1.0, passed=True
+        )
+        step = ValidationStep.objects.create(project=self.project, step='precision', completed=True, passed=True)
+        self.precision = PrecisionData.objects.create(
+            validation_step=step, replicate_values=[10.0, 10.1, 9.9], mean=10.0, rsd=1.0, passed=True
+        )
+        self.url = f'/api/reports/{self.project.id}/'
+
+    def generate_report(self):
+        response = self.client.post(self.url)
+        if response.status_code == 202:
+            run_worker()
+        return response
+
+    def render_patch(self):
+        return mock.patch.object(cache, 'generate_comprehensive_pdf', wraps=generate_comprehensive_pdf)
+
+    def test_report_rendered_once(self):
+        with self.render_patch() as render:
+            self.assertEqual(self.generate_report().status_code, 202)
+            first = self.client.get(self.url)
+            second = self.client.get(self.url)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(first.streaming_content).startswith(b'%PDF'))
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_conditional_get_returns_304(self):
+        self.generate_report()
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_changed_data_invalidates_report(self):
+        self.generate_report()
+        old_etag = self.client.get(self.url)['ETag']
+
+        self.precision.replicate_values = [10.0, 10.2, 9.8]
+        self.precision.save()
+
+        with self.render_patch() as render:
+            # Stale: the GET queues a re-render instead of rendering in the request
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=old_etag)
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(response.json()['status'], 'queued')
+            self.assertEqual(render.call_count, 0)
+
+            run_worker()
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=old_etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], old_etag)
+        self.assertEqual(render.call_count, 1)
+        # The stale PDF is removed from the cache
+        self.assertEqual(len(os.listdir(cache.get_report_cache_dir(self.project))), 1)
+
+    def test_renamed_user_changes_fingerprint(self):
+        digest = cache.report_fingerprint(self.project)
+        self.user.username = 'renamedqa'
+        self.user.save()
+        self.project.refresh_from_db()
+        self.assertNotEqual(cache.report_fingerprint(self.project), digest)
+
+    def test_post_queues_job_and_worker_completes_it(self):
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['job_id']
+
+        # A second request while the job is pending reuses it
+        self.assertEqual(self.client.post(self.url).json()['job_id'], job_id)
+        self.assertEqual(self.client.get(f'/api/reports/jobs/{job_id}/').json()['status'], 'queued')
+
+        run_worker()
+
+        status_data = self.client.get(f'/api/reports/jobs/{job_id}/').json()
+        self.assertEqual(status_data['status'], 'done')
+        self.assertEqual(status_data['download_url'], self.url)
+        self.project.refresh_from_db()
+        self.assertTrue(self.project.report_generated)
+
+        # Report is cached now, so generating again completes immediately
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.post(self.url).status_code, 200)
+        actions = list(AuditLog.objects.filter(object_id=self.project.id).values_list('details__action', flat=True))
+        self.assertEqual(actions.count('generated_report'), 1)
+        self.assertEqual(actions.count('report_cache_hit'), 1)
+
+    def test_concurrent_requests_queue_one_job(self):
+        job, created = enqueue_report(self.project, self.user)
+        self.assertTrue(created)
+        # The second request checked for a pending job before the first inserted it
+        with mock.patch('django.db.models.query.QuerySet.first', side_effect=[None, job]):
+            self.assertEqual(enqueue_report(self.project, self.user), (job, False))
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+    def test_bulk_queue(self):
+        other = Project.objects.create(
+            method_name='Other Method', product_name='Test Product', technique='uv',
+            status='approved', created_by=self.user
+        )
+        response = self.client.post(
+            '/api/reports/jobs/', {'project_ids': [self.project.id, other.id]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(len(response.json()['jobs']), 2)
+
+        run_worker()
+        self.assertEqual(ReportJob.objects.filter(status='done').count(), 2)
+
+    def test_bulk_queue_rejects_unapproved(self):
+        draft = Project.objects.create(
+            method_name='Draft Method', product_name='Test Product', technique='uv', created_by=self.user
+        )
+        response = self.client.post(
+            '/api/reports/jobs/', {'project_ids': [self.project.id, draft.id]}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['not_approved'], [draft.id])
+        self.assertFalse(ReportJob.objects.exists())
+
+    def test_failed_render_marks_job_failed(self):
+        self.client.post(self.url)
+        with mock.patch.object(cache, 'generate_comprehensive_pdf', side_effect=RuntimeError('boom')):
+            run_worker()
+
+        job = ReportJob.objects.get()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.error, 'boom')
+
+
+class ReportExportTest(TestCase):
+    def setUp(self):
+        self.cache_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_root, ignore_errors=True)
+        settings_override = override_settings(REPORT_CACHE_ROOT=self.cache_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testqa', password='testpass123', role='qa')
+        self.client.force_login(self.user)
+
+        now = timezone.now()
+        self.recent = self.create_project('Recent Method', 'Product A', now)
+        self.old = self.create_project('Old Method', 'Product A', now - timedelta(days=60))
+        self.other = self.create_project('Other Method', 'Product B', now)
+
+    def create_project(self, method_name, product_name, approved_at):
+        return Project.objects.create(
+            method_name=method_name, product_name=product_name, technique='hplc',
+            status='approved', created_by=self.user, qa_approver=self.user, approved_at=approved_at
+        )
+
+    def export(self, **params):
+        response = self.client.get('/api/reports/export/', params)
+        if response.status_code == 202:
+            # Missing reports were queued; render them and export again
+            run_worker()
+            response = self.client.get('/api/reports/export/', params)
+        if response.status_code != 200:
+            return response, None
+        return response, zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+
+    def test_export_filters_by_product(self):
+        response, archive = self.export(product='product a')
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(sorted(archive.namelist()), [
+            f'validation_report_{self.recent.id}_recent-method.pdf',
+            f'validation_report_{self.old.id}_old-method.pdf',
+        ])
+        for name in archive.namelist():
+            self.assertTrue(archive.read(name).startswith(b'%PDF'))
+
+    def test_export_queues_missing_reports(self):
+        with mock.patch.object(cache, 'generate_comprehensive_pdf', wraps=generate_comprehensive_pdf) as render:
+            response = self.client.get('/api/reports/export/', {'product': 'Product A'})
+            self.assertEqual(response.status_code, 202)
+            self.assertEqual(
+                sorted(job['project_id'] for job in response.json()['jobs']), sorted([self.recent.id, self.old.id])
+            )
+            self.assertEqual(render.call_count, 0)
+
+            run_worker()
+            response = self.client.get('/api/reports/export/', {'product': 'Product A'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(zipfile.ZipFile(BytesIO(b''.join(response.streaming_content))).namelist()), 2)
+        # Rendered by the worker only
+        self.assertEqual(render.call_count, 2)
+
+    def test_export_streams_asynchronously_under_asgi(self):
+        self.export(product='product b')
+
+        async def fetch():
+            await self.async_client.aforce_login(self.user)
+            response = await self.async_client.get('/api/reports/export/', {'product': 'product b'})
+            self.assertTrue(response.is_async)
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        archive = zipfile.ZipFile(BytesIO(async_to_sync(fetch)()))
+        self.assertEqual(archive.namelist(), [f'validation_report_{self.other.id}_other-method.pdf'])
+
+    def test_export_filters_by_date_range(self):
+        since = (timezone.now() - timedelta(days=7)).date().isoformat()
+        _, archive = self.export(approved_from=since)
+        self.assertEqual(len(archive.namelist()), 2)
+
+    def test_export_rejects_bad_dates(self):
+        response, _ = self.export(approved_from='last week')
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_with_no_matches(self):
+        response, _ = self.export(product='Unknown')
+        self.assertEqual(response.status_code, 404)
+
+    def test_stream_zip_yields_incrementally(self):
+        entries = ((f'part{i}.bin', (os.urandom(1024) for _ in range(4))) for i in range(3))
+        chunks = list(stream_zip(entries))
+        self.assertGreater(len(chunks), 3)
+        archive = zipfile.ZipFile(BytesIO(b''.join(chunks)))
+        self.assertEqual([info.file_size for info in archive.infolist()], [4096] * 3)
+
+
+class ProjectDossierTest(TestCase):
+    def setUp(self):
+        for setting in ('REPORT_CACHE_ROOT', 'MEDIA_ROOT'):
+            root = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+            settings_override = override_settings(**{setting: root})
+            settings_override.enable()
+            self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client.force_login(self.user)
+
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc',
+            status='approved', created_by=self.user, approved_at=timezone.now(), report_generated=True
+        )
+        step = ValidationStep.objects.create(project=self.project, step='linearity', completed=True, passed=True)
+        LinearityData.objects.create(
+            validation_step=step, concentrations=[1, 2, 3], responses=[10, 20, 30],
+            slope=10.0, intercept=0.0, r_squared=1.0, passed=True
+        )
+        self.documents = [
+            SupportingDocument.objects.create(
+                project=self.project, file=ContentFile(content, name='results.csv'), file_type='raw_data',
+                file_name='results.csv', file_size=len(content), uploaded_by=self.user
+            )
+            for content in (b'conc,area\n1,10\n', os.urandom(200 * 1024))
+        ]
+        self.url = f'/api/reports/{self.project.id}/dossier/'
+
+    def download(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        return zipfile.ZipFile(BytesIO(b''.join(response.streaming_content)))
+
+    def test_dossier_contents(self):
+        archive = self.download()
+        self.assertIsNone(archive.testzip())
+        first, second = self.documents
+        self.assertEqual(archive.namelist(), [
+            'validation_summary.json',
+            f'validation_report_{self.project.id}_test-hplc-method.pdf',
+            f'documents/{first.id}_results.csv',
+            f'documents/{second.id}_results.csv',
+        ])
+
+        summary = json.loads(archive.read('validation_summary.json'))
+        self.assertEqual(summary['validation_steps']['linearity']['data']['concentrations'], [1.0, 2.0, 3.0])
+        self.assertTrue(archive.read(archive.namelist()[1]).startswith(b'%PDF'))
+        for document in self.documents:
+            with document.file.open('rb') as f:
+                self.assertEqual(archive.read(f'documents/{document.id}_results.csv'), f.read())
+
+        log = AuditLog.objects.get(details__action='exported_dossier')
+        self.assertEqual(log.details['document_ids'], [d.id for d in self.documents])
+
+    def test_dossier_streams_asynchronously_under_asgi(self):
+        async def fetch():
+            await self.async_client.aforce_login(self.user)
+            response = await self.async_client.get(self.url)
+            self.assertTrue(response.is_async)
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            archive = zipfile.ZipFile(BytesIO(async_to_sync(fetch)()))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(len(archive.namelist()), 4)
+
+    def test_dossier_without_report(self):
+        self.project.report_generated = False
+        self.project.save()
+        names = self.download().namelist()
+        self.assertNotIn(f'validation_report_{self.project.id}_test-hplc-method.pdf', names)
+        self.assertEqual(len(names), 3)
@@ -5,4 +5,8 @@ app_name = 'reports'
 
 urlpatterns = [
     path('<int:project_id>/', views.report_view, name='report'),
+    path('<int:project_id>/dossier/', views.project_dossier_view, name='report-dossier'),
+    path('export/', views.export_reports_view, name='report-export'),
+    path('jobs/', views.report_jobs_view, name='report-jobs'),
+    path('jobs/<int:job_id>/', views.report_job_status, name='report-job-status'),
 ]
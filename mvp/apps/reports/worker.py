@@ -0,0 +1,28 @@
+"""
+Entry points executed inside report worker processes.
+
+Pool children are spawned fresh, so this module must be importable before
+Django is set up: model imports happen inside the functions.
+"""
+import os
+
+
+def init_worker_process():
+    """Process pool initializer: set Django up in the new interpreter"""
+    import django
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'mvp.settings')
+    django.setup()
+
+
+def render_report(job_id):
+    """Render the PDF for a report job and return its cache digest"""
+    from .jobs import render_report_job
+    return render_report_job(job_id)
+
+
+def render_project_report(project_id):
+    """Render (or reuse) a project's cached PDF and return (project_id, path)"""
+    from apps.projects.models import Project
+    from .cache import get_or_render_report
+    path, _ = get_or_render_report(Project.objects.get(id=project_id))
+    return project_id, path
@@ -0,0 +1,69 @@
+import zipfile
+
+CHUNK_SIZE = 64 * 1024
+
+
+class _ZipSink:
+    """
+    Write-only file object for ZipFile that hands written bytes back to the caller.
+
+    It supports tell() but not seek(), so ZipFile writes entry sizes into data
+    descriptors after each entry instead of seeking back, which is what lets
+    the archive be streamed.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_file_chunks(path, chunk_size=CHUNK_SIZE):
+    """Read a file from disk in fixed-size chunks"""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_zip(entries, compression=zipfile.ZIP_DEFLATED):
+    """
+    Build a ZIP archive incrementally and yield it as byte chunks.
+
+    `entries` is an iterable of (archive_name, iterable_of_bytes) pairs and is
+    consumed lazily, so only one chunk of one entry is held in memory at a
+    time. Suitable as the body of a StreamingHttpResponse.
+    """
+    sink = _ZipSink()
+    with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+        for name, chunks in entries:
+            # Sizes are unknown up front, so always allow entries over 2 GB
+            with archive.open(name, 'w', force_zip64=True) as entry:
+                for chunk in chunks:
+                    entry.write(chunk)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    data = sink.drain()
+    if data:
+        yield data
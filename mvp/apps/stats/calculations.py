@@ -1,25 +1,140 @@
+import itertools
+import math
+from collections import namedtuple
+from functools import lru_cache
+from statistics import NormalDist
 import numpy as np
-import statistics
+
+
+RegressionResult = namedtuple('RegressionResult', [
+    'n', 'slope', 'intercept', 'r_squared',
+    'slope_se', 'intercept_se', 'residual_sd', 'intercept_ci',
+])
 
 
 def linear_regression(concentrations, responses):
     """Perform linear regression and return slope, intercept, r_squared"""
-    if len(concentrations) != len(responses) or len(concentrations) < 2:
+    result = linear_regression_stats(concentrations, responses)
+    return result.slope, result.intercept, result.r_squared
+
+
+def linear_regression_stats(concentrations, responses, confidence=0.95):
+    """
+    Ordinary least-squares fit with its standard errors.
+
+    Closed form from the running sums Σx, Σy, Σxy, Σx², Σy², so no design
+    matrix or predicted values are built. The sums are taken around the
+    first point rather than zero: the fit is unchanged but the
+    Σx² - (Σx)²/n style subtractions no longer cancel catastrophically for
+    large, tightly spaced values.
+
+    Returns a RegressionResult; `intercept_ci` is the two-sided `confidence`
+    interval for the intercept. With exactly two points the line is exact
+    and the standard errors are undefined (nan).
+    """
+    x = np.asarray(concentrations, dtype=np.float64)
+    y = np.asarray(responses, dtype=np.float64)
+    n = len(x)
+    if len(y) != n or n < 2:
         raise ValueError("Invalid data for regression")
 
-    x = np.array(concentrations)
-    y = np.array(responses)
+    x0, y0 = x[0], y[0]
+    dx = x - x0
+    dy = y - y0
+    sum_x = dx.sum()
+    sum_y = dy.sum()
+    sum_xx = np.dot(dx, dx)
+    sum_xy = np.dot(dx, dy)
+    sum_yy = np.dot(dy, dy)
+
+    sxx = sum_xx - sum_x * sum_x / n
+    sxy = sum_xy - sum_x * sum_y / n
+    syy = sum_yy - sum_y * sum_y / n
+    if sxx <= 0:
+        raise ValueError("Concentrations must not all be equal")
+
+    slope = sxy / sxx
+    mean_x = x0 + sum_x / n
+    mean_y = y0 + sum_y / n
+    intercept = mean_y - slope * mean_x
+
+    ss_res = max(syy - slope * sxy, 0.0)
+    r_squared = 1 - (ss_res / syy) if syy > 0 else 0
+
+    if n > 2:
+        residual_sd = math.sqrt(ss_res / (n - 2))
+        slope_se = residual_sd / math.sqrt(sxx)
+        intercept_se = residual_sd * math.sqrt(1 / n + mean_x * mean_x / sxx)
+        margin = t_critical(confidence, n - 2) * intercept_se
+    else:
+        residual_sd = slope_se = intercept_se = margin = math.nan
+
+    return RegressionResult(
+        n=n,
+        slope=float(slope),
+        intercept=float(intercept),
+        r_squared=float(r_squared),
+        slope_se=slope_se,
+        intercept_se=intercept_se,
+        residual_sd=residual_sd,
+        intercept_ci=(float(intercept - margin), float(intercept + margin)),
+    )
+
+
+@lru_cache(maxsize=256)
+def t_critical(confidence, df):
+    """
+    Two-sided critical value of Student's t distribution.
+
+    Small df are solved exactly by bisection on the closed-form CDF for
+    integer degrees of freedom (Abramowitz & Stegun 26.7.3/26.7.4); larger df
+    use the Cornish-Fisher expansion around the normal quantile (26.7.5),
+    which is accurate to better than 1e-6 there. Results are cached since
+    the same few calibration sizes come up over and over.
+    """
+    if not 0 < confidence < 1 or df < 1:
+        raise ValueError("Invalid confidence level or degrees of freedom")
 
-    # Linear regression
-    slope, intercept = np.polyfit(x, y, 1)
+    if df > 30:
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        z2 = z * z
+        g1 = (z2 + 1) * z / 4
+        g2 = ((5 * z2 + 16) * z2 + 3) * z / 96
+        g3 = (((3 * z2 + 19) * z2 + 17) * z2 - 15) * z / 384
+        g4 = ((((79 * z2 + 776) * z2 + 1482) * z2 - 1920) * z2 - 945) * z / 92160
+        return z + g1 / df + g2 / df ** 2 + g3 / df ** 3 + g4 / df ** 4
 
-    # R-squared
-    y_pred = slope * x + intercept
-    ss_res = np.sum((y - y_pred) ** 2)
-    ss_tot = np.sum((y - np.mean(y)) ** 2)
-    r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+    low, high = 0.0, 1.0
+    while _t_central_probability(high, df) < confidence:
+        high *= 2
+    for _ in range(60):
+        mid = (low + high) / 2
+        if _t_central_probability(mid, df) < confidence:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
 
-    return slope, intercept, r_squared
+
+def _t_central_probability(t, df):
+    """P(|T| < t) for Student's t with integer df"""
+    theta = math.atan(t / math.sqrt(df))
+    cos2 = math.cos(theta) ** 2
+    if df % 2 == 1:
+        total, term = 0.0, 1.0
+        if df > 1:
+            total = term
+            for k in range(3, df - 1, 2):
+                term *= (k - 1) / k * cos2
+                total += term
+            total *= math.sin(theta) * math.cos(theta)
+        return 2 / math.pi * (theta + total)
+
+    total = term = 1.0
+    for k in range(2, df - 1, 2):
+        term *= (k - 1) / k * cos2
+        total += term
+    return math.sin(theta) * total
 
 
 def calculate_recovery(theoretical, measured):
@@ -29,20 +144,212 @@ def calculate_recovery(theoretical, measured):
 
 def calculate_rsd(values):
     """Calculate %RSD"""
-    if len(values) < 2:
-        return 0
-    mean_val = statistics.mean(values)
-    std_dev = statistics.stdev(values)
-    return (std_dev / mean_val) * 100 if mean_val != 0 else 0
+    return RunningStats.of(values).rsd
 
 
 def calculate_lod_lod(blank_responses, slope):
     """Calculate LOD and LOQ"""
-    if not blank_responses:
+    stats = RunningStats.of(blank_responses)
+    if stats.count == 0:
         raise ValueError("Blank responses required")
+    if stats.count < 2:
+        raise ValueError("At least two blank responses required")
 
-    sigma = statistics.stdev(blank_responses)
+    sigma = stats.std
     lod = 3.3 * sigma / slope if slope != 0 else 0
     loq = 10 * sigma / slope if slope != 0 else 0
 
     return lod, loq
+
+
+class RunningStats:
+    """
+    Single-pass mean, variance, min and max of a stream of values.
+
+    Scalars are folded in with Welford's update; NumPy arrays and lists are
+    reduced as a block and combined with Chan et al.'s pairwise formula, so
+    long instrument runs can be fed chunk by chunk. Accumulators built over
+    separate partitions can be merged, and the result is the same (up to
+    rounding) as one pass over all of the data.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    @classmethod
+    def of(cls, values):
+        """Accumulator over a list or array of values"""
+        return cls().update(values)
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Accumulator over an iterable of chunks (lists, arrays or single values)"""
+        stats = cls()
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats
+
+    def add(self, value):
+        """Fold in one value"""
+        value = float(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        return self
+
+    def update(self, values):
+        """Fold in a chunk of values (or a single value)"""
+        chunk = np.asarray(values, dtype=np.float64)
+        if chunk.ndim == 0:
+            return self.add(chunk)
+        chunk = chunk.ravel()
+        if chunk.size == 0:
+            return self
+
+        chunk_mean = chunk.mean()
+        deviations = chunk - chunk_mean
+        return self._combine(
+            chunk.size, float(chunk_mean), float(np.dot(deviations, deviations)),
+            float(chunk.min()), float(chunk.max())
+        )
+
+    def merge(self, other):
+        """Fold in the values summarized by another accumulator"""
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+        return self
+
+    @property
+    def variance(self):
+        """Sample variance (ddof=1); 0 with fewer than two values"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """Sample standard deviation"""
+        return math.sqrt(self.variance)
+
+    @property
+    def rsd(self):
+        """%RSD, following calculate_rsd: 0 with fewer than two values or a zero mean"""
+        if self.count < 2 or self.mean == 0:
+            return 0
+        return self.std / self.mean * 100
+
+
+# Batch (vectorized) helpers.
+#
+# Many datasets of different lengths are packed into one flat float64 array
+# plus an `offsets` array of length n + 1 (CSR style): dataset i is
+# values[offsets[i]:offsets[i + 1]]. Each helper returns one value per
+# dataset, computed with NumPy segment reductions instead of a Python loop.
+
+def pack_ragged(datasets):
+    """Pack a sequence of variable-length datasets into (values, offsets)"""
+    lengths = np.fromiter((len(d) for d in datasets), dtype=np.intp, count=len(datasets))
+    offsets = np.zeros(len(lengths) + 1, dtype=np.intp)
+    np.cumsum(lengths, out=offsets[1:])
+    values = np.fromiter(itertools.chain.from_iterable(datasets), dtype=np.float64, count=offsets[-1])
+    return values, offsets
+
+
+def segment_lengths(offsets):
+    """Number of values in each packed dataset"""
+    return np.diff(np.asarray(offsets, dtype=np.intp))
+
+
+def _segment_reduce(ufunc, values, offsets, empty_value):
+    offsets = np.asarray(offsets, dtype=np.intp)
+    lengths = np.diff(offsets)
+    result = np.full(len(lengths), empty_value, dtype=np.float64)
+    nonempty = lengths > 0
+    if nonempty.any():
+        # reduceat runs from each start to the next start, so empty datasets
+        # are dropped from the index list rather than reduced
+        result[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return result
+
+
+def segment_sum(values, offsets):
+    """Sum of each packed dataset (0 for empty ones)"""
+    return _segment_reduce(np.add, values, offsets, 0.0)
+
+
+def segment_max(values, offsets):
+    """Maximum of each packed dataset (nan for empty ones)"""
+    return _segment_reduce(np.maximum, values, offsets, np.nan)
+
+
+def segment_mean_std(values, offsets):
+    """
+    Mean and sample standard deviation (ddof=1) of each packed dataset.
+
+    Two-pass: deviations are taken from each dataset's own mean, which keeps
+    the variance accurate for large, tightly clustered values. Datasets with
+    fewer than two values get a nan standard deviation.
+    """
+    lengths = segment_lengths(offsets)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = segment_sum(values, offsets) / lengths
+        deviations = values - np.repeat(means, lengths)
+        squares = segment_sum(deviations * deviations, offsets)
+        stds = np.sqrt(squares / (lengths - 1))
+    stds[lengths < 2] = np.nan
+    return means, stds
+
+
+def batch_rsd(values, offsets):
+    """Mean and %RSD per dataset, following calculate_rsd's edge cases"""
+    lengths = segment_lengths(offsets)
+    means, stds = segment_mean_std(values, offsets)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rsd = stds / means * 100
+    rsd[(lengths < 2) | (means == 0)] = 0.0
+    return means, rsd
+
+
+def batch_linear_regression(concentrations, responses, offsets):
+    """
+    Slope, intercept and r_squared per dataset, as linear_regression computes them.
+
+    Uses the centred least-squares solution, so datasets whose
+    concentrations are all equal produce nan slopes; callers handle those.
+    """
+    x = np.asarray(concentrations, dtype=np.float64)
+    y = np.asarray(responses, dtype=np.float64)
+    lengths = segment_lengths(offsets)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = segment_sum(x, offsets) / lengths
+        mean_y = segment_sum(y, offsets) / lengths
+        dx = x - np.repeat(mean_x, lengths)
+        dy = y - np.repeat(mean_y, lengths)
+
+        sxx = segment_sum(dx * dx, offsets)
+        sxy = segment_sum(dx * dy, offsets)
+        slopes = sxy / sxx
+        intercepts = mean_y - slopes * mean_x
+
+        residuals = dy - np.repeat(slopes, lengths) * dx
+        ss_res = segment_sum(residuals * residuals, offsets)
+        ss_tot = segment_sum(dy * dy, offsets)
+        r_squared = np.where(ss_tot != 0, 1 - ss_res / ss_tot, 0.0)
+
+    return slopes, intercepts, r_squared
@@ -0,0 +1,59 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from apps.stats.calculations import linear_regression_stats
+
+DEFAULT_SIZES = [5, 100, 10_000, 1_000_000]
+
+
+def polyfit_regression(concentrations, responses):
+    """The previous implementation: SVD least squares plus explicit residuals"""
+    x = np.array(concentrations)
+    y = np.array(responses)
+    slope, intercept = np.polyfit(x, y, 1)
+    y_pred = slope * x + intercept
+    ss_res = np.sum((y - y_pred) ** 2)
+    ss_tot = np.sum((y - np.mean(y)) ** 2)
+    r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+    return slope, intercept, r_squared
+
+
+def best_time(func, args, repeat):
+    """Fastest wall time of `repeat` calls, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class Command(BaseCommand):
+    help = 'Compare the closed-form linear regression against the np.polyfit implementation'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+            help='Number of calibration points per benchmark run'
+        )
+        parser.add_argument('--repeat', type=int, default=20, help='Timed calls per size (best is reported)')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        self.stdout.write(f'{"points":>10} {"polyfit":>12} {"closed form":>12} {"speedup":>8} {"max |Δslope|":>14}')
+
+        for size in options['sizes']:
+            x = np.linspace(50, 150, size)
+            y = 100 * x + 5 + rng.normal(0, 25, size)
+            # Small inputs arrive from the API as lists, large ones from instrument files as arrays
+            data = (x.tolist(), y.tolist()) if size <= 1000 else (x, y)
+            repeat = max(1, options['repeat'] if size <= 100_000 else options['repeat'] // 4)
+
+            old = best_time(polyfit_regression, data, repeat)
+            new = best_time(linear_regression_stats, data, repeat)
+            diff = abs(polyfit_regression(*data)[0] - linear_regression_stats(*data).slope)
+
+            self.stdout.write(
+                f'{size:>10} {old * 1e6:>10.1f}µs {new * 1e6:>10.1f}µs {old / new:>7.1f}x {diff:>14.2e}'
+            )
@@ -1,3 +1,107 @@
-from django.test import TestCase
+import math
+import statistics
+import numpy as np
+from django.test import SimpleTestCase
+from apps.stats.calculations import (
+    RunningStats, calculate_lod_lod, calculate_rsd, linear_regression, linear_regression_stats, t_critical
+)
 
-# Create your tests here.
+
+class LinearRegressionTest(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.x = np.linspace(50, 150, 12)
+        self.y = 98.5 * self.x + 40 + rng.normal(0, 30, 12)
+
+    def test_matches_polyfit(self):
+        slope, intercept = np.polyfit(self.x, self.y, 1)
+        result = linear_regression_stats(self.x.tolist(), self.y.tolist())
+        self.assertAlmostEqual(result.slope, slope, places=9)
+        self.assertAlmostEqual(result.intercept, intercept, places=6)
+        self.assertEqual(linear_regression(self.x, self.y)[:2], (result.slope, result.intercept))
+
+    def test_standard_errors(self):
+        result = linear_regression_stats(self.x, self.y)
+        # Textbook covariance of the least-squares estimates
+        design = np.column_stack([self.x, np.ones_like(self.x)])
+        residuals = self.y - design @ np.array([result.slope, result.intercept])
+        variance = residuals @ residuals / (len(self.x) - 2)
+        covariance = variance * np.linalg.inv(design.T @ design)
+
+        self.assertAlmostEqual(result.residual_sd, math.sqrt(variance), places=9)
+        self.assertAlmostEqual(result.slope_se, math.sqrt(covariance[0, 0]), places=9)
+        self.assertAlmostEqual(result.intercept_se, math.sqrt(covariance[1, 1]), places=6)
+
+        low, high = result.intercept_ci
+        self.assertAlmostEqual(high - result.intercept, t_critical(0.95, 10) * result.intercept_se, places=9)
+        self.assertAlmostEqual(result.intercept - low, high - result.intercept, places=9)
+
+    def test_large_offset_is_stable(self):
+        x = np.arange(10, dtype=np.float64) + 1e9
+        result = linear_regression_stats(x, 2 * x + 1)
+        self.assertAlmostEqual(result.slope, 2.0, places=9)
+        self.assertAlmostEqual(result.r_squared, 1.0, places=9)
+
+    def test_two_points_have_no_standard_errors(self):
+        result = linear_regression_stats([1, 2], [3, 5])
+        self.assertEqual((result.slope, result.intercept, result.r_squared), (2.0, 1.0, 1.0))
+        self.assertTrue(math.isnan(result.intercept_se))
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            linear_regression([1], [1])
+        with self.assertRaises(ValueError):
+            linear_regression([1, 2, 3], [1, 2])
+        with self.assertRaises(ValueError):
+            linear_regression([2, 2, 2], [1, 2, 3])
+
+    def test_t_critical(self):
+        # Reference values from standard t tables
+        for df, expected in [(1, 12.7062), (3, 3.1824), (10, 2.2281), (30, 2.0423), (120, 1.9799)]:
+            self.assertAlmostEqual(t_critical(0.95, df), expected, places=4)
+        self.assertAlmostEqual(t_critical(0.99, 5), 4.0321, places=4)
+
+
+class RunningStatsTest(SimpleTestCase):
+    def setUp(self):
+        self.values = np.random.default_rng(2).normal(100, 0.5, 1000)
+
+    def assertMatchesStatistics(self, stats, values):
+        self.assertEqual(stats.count, len(values))
+        self.assertAlmostEqual(stats.mean, statistics.mean(values), places=9)
+        self.assertAlmostEqual(stats.variance, statistics.variance(values), places=9)
+        self.assertEqual((stats.min, stats.max), (min(values), max(values)))
+
+    def test_single_values_and_chunks_agree(self):
+        values = self.values.tolist()
+        one_by_one = RunningStats()
+        for value in values:
+            one_by_one.add(value)
+        chunked = RunningStats.from_chunks(np.array_split(self.values, 7))
+
+        self.assertMatchesStatistics(one_by_one, values)
+        self.assertMatchesStatistics(chunked, values)
+
+    def test_merge_partitions(self):
+        left, right = RunningStats.of(self.values[:300]), RunningStats.of(self.values[300:])
+        self.assertMatchesStatistics(left.merge(right), self.values.tolist())
+        self.assertMatchesStatistics(RunningStats().merge(RunningStats.of(self.values)), self.values.tolist())
+
+    def test_stable_for_large_offsets(self):
+        values = [1e9 + 4, 1e9 + 7, 1e9 + 13, 1e9 + 16]
+        self.assertAlmostEqual(RunningStats.of(values).variance, 30.0, places=6)
+
+    def test_rsd_edge_cases(self):
+        self.assertEqual(calculate_rsd([5.0]), 0)
+        self.assertEqual(calculate_rsd([-1.0, 1.0]), 0)
+        self.assertAlmostEqual(calculate_rsd([10.0, 10.1, 9.9]), 1.0, places=9)
+
+    def test_lod_loq(self):
+        lod, loq = calculate_lod_lod(np.array([0.1, 0.2, 0.15, 0.12]), 10.0)
+        sigma = statistics.stdev([0.1, 0.2, 0.15, 0.12])
+        self.assertAlmostEqual(lod, 3.3 * sigma / 10, places=12)
+        self.assertAlmostEqual(loq, sigma, places=12)
+        with self.assertRaises(ValueError):
+            calculate_lod_lod([], 10.0)
+        with self.assertRaises(ValueError):
+            calculate_lod_lod([0.1], 10.0)
@@ -246,35 +246,35 @@ class Command(BaseCommand):
                 'action': 'create',
                 'object_type': 'project',
                 'object_id': projects.first().id,
-                'details': 'Created new validation project'
+                'details': {'message': 'Created new validation project'}
             },
             {
                 'user': users.filter(role='analyst').first(),
                 'action': 'submit',
                 'object_type': 'project',
                 'object_id': projects.first().id,
-                'details': 'Submitted linearity validation data'
+                'details': {'message': 'Submitted linearity validation data'}
             },
             {
                 'user': users.filter(role='reviewer').first(),
                 'action': 'review',
                 'object_type': 'project',
                 'object_id': projects.filter(status='review').first().id,
-                'details': 'Completed parameter review and approved'
+                'details': {'message': 'Completed parameter review and approved'}
             },
             {
                 'user': users.filter(role='qa').first(),
                 'action': 'approve',
                 'object_type': 'project',
                 'object_id': projects.filter(status='approved').first().id,
-                'details': 'Final QA approval granted'
+                'details': {'message': 'Final QA approval granted'}
             },
             {
                 'user': users.filter(role='qa').first(),
                 'action': 'login',
                 'object_type': 'system',
                 'object_id': 0,
-                'details': 'User login to QA dashboard'
+                'details': {'message': 'User login to QA dashboard'}
             }
         ]
 
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.audit.models import AuditLog
+from apps.audit.signals import audit_logged
+from apps.projects.models import Project
+from .stats import invalidate_user_stats
+
+
+@receiver(audit_logged, sender=AuditLog)
+def audit_entries_logged(sender, entries, **kwargs):
+    """New audit entries change the activity counts of the users who made them"""
+    invalidate_user_stats({entry.user_id for entry in entries})
+
+
+@receiver(pre_save, sender=Project)
+def remember_previous_reviewer(sender, instance, update_fields=None, **kwargs):
+    """Keep the reviewer stored before this save, whose counts change when they are replaced"""
+    instance._previous_reviewer_id = None
+    if instance.pk is None or (update_fields is not None and 'reviewer' not in update_fields):
+        return
+    instance._previous_reviewer_id = (
+        Project.objects.filter(pk=instance.pk).values_list('reviewer_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_changed(sender, instance, **kwargs):
+    """A saved or deleted project changes its creator's, its reviewer's and any replaced reviewer's counts"""
+    invalidate_user_stats({
+        instance.created_by_id, instance.reviewer_id, getattr(instance, '_previous_reviewer_id', None)
+    })
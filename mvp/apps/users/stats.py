@@ -0,0 +1,108 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from apps.audit.models import AuditLog
+from apps.projects.models import Project
+
+# Audit actions counted as validation submissions
+VALIDATION_ACTIONS = ['submit', 'update']
+RECENT_ACTIVITY_DAYS = 30
+
+
+def stats_cache_key(user_id):
+    return f'user-stats:{user_id}'
+
+
+def compute_user_stats(user_ids):
+    """
+    Activity counts for several users from two grouped queries.
+
+    Audit counts come from one conditional aggregation grouped by user. The
+    project query groups by (creator, reviewer) pair so both "created" and
+    "reviewed" can be rolled up from the same few rows.
+    """
+    user_ids = list(user_ids)
+    since = timezone.now() - timedelta(days=RECENT_ACTIVITY_DAYS)
+    stats = {
+        user_id: {
+            'projects_created': 0,
+            'validations_submitted': 0,
+            'projects_reviewed': 0,
+            'total_activity': 0,
+            'recent_activity': 0,
+        }
+        for user_id in user_ids
+    }
+
+    audit_rows = AuditLog.objects.filter(user_id__in=user_ids).order_by().values('user_id').annotate(
+        total=Count('id'),
+        validations=Count('id', filter=Q(object_type='validation', action__in=VALIDATION_ACTIONS)),
+        recent=Count('id', filter=Q(timestamp__gte=since)),
+    )
+    for row in audit_rows:
+        entry = stats[row['user_id']]
+        entry['total_activity'] = row['total']
+        entry['validations_submitted'] = row['validations']
+        entry['recent_activity'] = row['recent']
+
+    created = Counter()
+    reviewed = Counter()
+    project_rows = Project.objects.filter(
+        Q(created_by_id__in=user_ids) | Q(reviewer_id__in=user_ids)
+    ).order_by().values('created_by_id', 'reviewer_id').annotate(count=Count('id'))
+    for row in project_rows:
+        created[row['created_by_id']] += row['count']
+        reviewed[row['reviewer_id']] += row['count']
+    for user_id, entry in stats.items():
+        entry['projects_created'] = created[user_id]
+        entry['projects_reviewed'] = reviewed[user_id]
+
+    return stats
+
+
+def with_user_fields(user, counts):
+    """Add the fields derived from the user itself; days_active changes daily, so it is never cached"""
+    days_since_joined = (timezone.now().date() - user.date_joined.date()).days
+    return {
+        'user_id': user.id,
+        'username': user.username,
+        **counts,
+        'days_active': max(1, days_since_joined),
+    }
+
+
+def get_users_stats(users):
+    """
+    Stats for a list of users, served from the cache where possible.
+
+    Cached counts are dropped when the user's audit entries or projects
+    change (see signals.py). The cache is shared by all server processes
+    (settings.CACHES), so a write in one worker invalidates the counts the
+    others serve. USER_STATS_CACHE_TIMEOUT bounds how stale they get
+    through writes that bypass signals, such as QuerySet.update().
+    """
+    keys = {user.id: stats_cache_key(user.id) for user in users}
+    cached = cache.get_many(keys.values())
+    counts = {user_id: cached[key] for user_id, key in keys.items() if key in cached}
+
+    missing = [user_id for user_id in keys if user_id not in counts]
+    if missing:
+        computed = compute_user_stats(missing)
+        cache.set_many(
+            {keys[user_id]: entry for user_id, entry in computed.items()},
+            settings.USER_STATS_CACHE_TIMEOUT
+        )
+        counts.update(computed)
+
+    return [with_user_fields(user, counts[user.id]) for user in users]
+
+
+def get_user_stats(user):
+    return get_users_stats([user])[0]
+
+
+def invalidate_user_stats(user_ids):
+    cache.delete_many([stats_cache_key(user_id) for user_id in user_ids if user_id])
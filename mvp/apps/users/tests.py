@@ -1,3 +1,105 @@
-from django.test import TestCase
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from apps.audit.utils import AuditLogger
+from apps.projects.models import Project
+from apps.users.stats import stats_cache_key
 
-# Create your tests here.
+User = get_user_model()
+
+
+def stats_queries(queries):
+    """Queries against the tables user stats are computed from"""
+    return [q for q in queries if 'audit_auditlog' in q['sql'] or 'projects_project' in q['sql']]
+
+
+class UserStatsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = Client()
+        self.analyst = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.reviewer = User.objects.create_user(username='testreviewer', password='testpass123', role='reviewer')
+        self.qa = User.objects.create_user(username='testqa', password='testpass123', role='qa')
+
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc',
+            created_by=self.analyst, reviewer=self.reviewer
+        )
+        Project.objects.create(method_name='Second Method', product_name='Test Product', technique='uv', created_by=self.analyst)
+        AuditLogger.log_validation_action(self.analyst, 'submit', self.project, 'linearity')
+        AuditLogger.log_project_action(self.analyst, 'create', self.project)
+
+    def get_stats(self, url='/api/users/me/stats/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_stats_cached_per_user(self):
+        self.client.force_login(self.analyst)
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.get_stats()
+        self.assertEqual(len(stats_queries(queries)), 2)
+        self.assertEqual(stats['projects_created'], 2)
+        self.assertEqual(stats['validations_submitted'], 1)
+        self.assertEqual(stats['projects_reviewed'], 0)
+        self.assertEqual(stats['total_activity'], 2)
+        self.assertEqual(stats['recent_activity'], 2)
+        self.assertEqual(stats['days_active'], 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_stats(), stats)
+        self.assertEqual(stats_queries(queries), [])
+
+    def test_cache_invalidated_by_new_activity(self):
+        self.client.force_login(self.analyst)
+        self.get_stats()
+
+        AuditLogger.log_validation_action(self.analyst, 'submit', self.project, 'accuracy')
+        Project.objects.create(method_name='Third Method', product_name='Test Product', technique='uv', created_by=self.analyst)
+        stats = self.get_stats()
+        self.assertEqual(stats['validations_submitted'], 2)
+        self.assertEqual(stats['projects_created'], 3)
+
+        reviewer_stats = self.get_stats(f'/api/users/{self.reviewer.id}/stats/')
+        # Only QA can look at other users
+        self.assertEqual(reviewer_stats['user_id'], self.analyst.id)
+
+    def test_cache_invalidated_for_replaced_reviewer(self):
+        self.client.force_login(self.qa)
+        self.assertEqual(self.get_stats(f'/api/users/{self.reviewer.id}/stats/')['projects_reviewed'], 1)
+
+        other = User.objects.create_user(username='otherreviewer', password='testpass123', role='reviewer')
+        self.project.reviewer = other
+        self.project.save()
+        self.assertEqual(self.get_stats(f'/api/users/{self.reviewer.id}/stats/')['projects_reviewed'], 0)
+        self.assertEqual(self.get_stats(f'/api/users/{other.id}/stats/')['projects_reviewed'], 1)
+
+    def test_cache_shared_between_processes(self):
+        self.client.force_login(self.analyst)
+        self.get_stats()
+        # A cache client of its own, like another server process would have
+        other_worker = caches.create_connection('default')
+        key = stats_cache_key(self.analyst.id)
+        self.assertIsNotNone(other_worker.get(key))
+
+        AuditLogger.log_validation_action(self.analyst, 'submit', self.project, 'accuracy')
+        self.assertIsNone(other_worker.get(key))
+
+    def test_bulk_stats(self):
+        self.client.force_login(self.qa)
+        for i in range(5):
+            User.objects.create_user(username=f'extra{i}', password='testpass123', role='analyst')
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = self.get_stats('/api/users/stats/')
+        self.assertEqual(len(stats_queries(queries)), 2)
+        by_username = {entry['username']: entry for entry in stats}
+        self.assertEqual(len(by_username), 8)
+        self.assertEqual(by_username['testreviewer']['projects_reviewed'], 1)
+        self.assertEqual(by_username['extra0']['total_activity'], 0)
+
+        self.client.force_login(self.analyst)
+        self.assertEqual(self.client.get('/api/users/stats/').status_code, 403)
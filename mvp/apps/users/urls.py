@@ -3,6 +3,7 @@ from . import views
 
 urlpatterns = [
     path('', views.UserListCreateView.as_view(), name='user-list-create'),
+    path('stats/', views.all_user_stats, name='user-stats-all'),
     path('<int:pk>/', views.UserDetailView.as_view(), name='user-detail'),
     path('me/', views.current_user, name='current-user'),
     path('me/profile/', views.update_profile, name='update-profile'),
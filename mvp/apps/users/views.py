@@ -4,19 +4,17 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.contrib.auth import authenticate, login, logout, update_session_auth_hash
 from django.contrib.auth.hashers import check_password
-from django.utils import timezone
-from datetime import timedelta
 from .models import User
 from .serializers import UserSerializer, UserCreateSerializer
 from .permissions import IsQAAdmin, IsAnalystOrHigher, IsSelfOrQAAdmin
 from apps.audit.utils import AuditLogger
-from apps.audit.models import AuditLog
-from apps.projects.models import Project
+from . import stats as user_stats
 
 
 class UserListCreateView(generics.ListCreateAPIView):
     queryset = User.objects.all()
     permission_classes = [IsAuthenticated, IsQAAdmin]
+    pagination_ordering = ('username',)
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -198,39 +196,13 @@ def get_user_stats(request, pk=None):
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
     else:
         user = request.user
-    
-    # Calculate statistics
-    stats = {
-        'user_id': user.id,
-        'username': user.username,
-    }
-    
-    # Projects created by user
-    stats['projects_created'] = Project.objects.filter(created_by=user).count()
-    
-    # Validations submitted (count audit log entries for validation actions)
-    validation_actions = ['submit', 'update']
-    stats['validations_submitted'] = AuditLog.objects.filter(
-        user=user,
-        object_type='validation',
-        action__in=validation_actions
-    ).count()
-    
-    # Projects reviewed (for reviewers)
-    stats['projects_reviewed'] = Project.objects.filter(reviewer=user).count()
-    
-    # Total activity count
-    stats['total_activity'] = AuditLog.objects.filter(user=user).count()
-    
-    # Days active (from date joined to today)
-    days_since_joined = (timezone.now().date() - user.date_joined.date()).days
-    stats['days_active'] = max(1, days_since_joined)
-    
-    # Recent activity count (last 30 days)
-    thirty_days_ago = timezone.now() - timedelta(days=30)
-    stats['recent_activity'] = AuditLog.objects.filter(
-        user=user,
-        timestamp__gte=thirty_days_ago
-    ).count()
-    
-    return Response(stats)
+
+    return Response(user_stats.get_user_stats(user))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsQAAdmin])
+def all_user_stats(request):
+    """Statistics of every user for the admin panel, without per-user queries"""
+    users = list(User.objects.order_by('username'))
+    return Response(user_stats.get_users_stats(users))
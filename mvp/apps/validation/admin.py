@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import ValidationStep, LinearityData, AccuracyData, PrecisionData, LODLOQData
+from .models import ValidationStep, LinearityData, AccuracyData, PrecisionData, LODLOQData, UploadSession
 
 class ValidationStepAdmin(admin.ModelAdmin):
     list_display = ('project', 'step', 'completed', 'passed', 'created_at')
@@ -31,8 +31,15 @@ class LODLOQDataAdmin(admin.ModelAdmin):
     search_fields = ('validation_step__project__method_name',)
     readonly_fields = ('validation_step',)
 
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'project', 'uploaded_by', 'status', 'received', 'total_size', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('file_name', 'project__method_name')
+    readonly_fields = ('id', 'created_at', 'updated_at')
+
 admin.site.register(ValidationStep, ValidationStepAdmin)
 admin.site.register(LinearityData, LinearityDataAdmin)
 admin.site.register(AccuracyData, AccuracyDataAdmin)
 admin.site.register(PrecisionData, PrecisionDataAdmin)
 admin.site.register(LODLOQData, LODLOQDataAdmin)
+admin.site.register(UploadSession, UploadSessionAdmin)
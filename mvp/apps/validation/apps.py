@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ValidationConfig(AppConfig):
     name = 'apps.validation'
+
+    def ready(self):
+        from . import signals  # noqa: F401
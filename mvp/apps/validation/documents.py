@@ -0,0 +1,44 @@
+from django.db.models import Prefetch
+from .models import SupportingDocument
+
+
+def preview_payload(document):
+    """Preview status and thumbnail/preview URLs of a document, once they are rendered"""
+    base_url = f'/api/validation/projects/{document.project_id}/documents/{document.id}/preview/'
+    ready = document.preview_status == 'ready'
+    return {
+        'preview_status': document.preview_status,
+        'thumbnail_url': f'{base_url}?size=thumb' if ready else None,
+        'preview_url': f'{base_url}?size=preview' if ready else None,
+    }
+
+
+def document_payload(document):
+    """Response body for a newly uploaded document"""
+    return {
+        'id': document.id,
+        'file_name': document.file_name,
+        'file_type': document.file_type,
+        'file_size': document.file_size,
+        'description': document.description,
+        'uploaded_at': document.uploaded_at,
+        'uploaded_by': document.uploaded_by.username,
+        'file_url': f'/api/validation/projects/{document.project_id}/documents/{document.id}/download/',
+        **preview_payload(document)
+    }
+
+
+def document_list_payload(document):
+    """Document entry of project document listings"""
+    return {
+        **document_payload(document),
+        'validation_step': document.validation_step.step if document.validation_step else None,
+    }
+
+
+def documents_prefetch():
+    """Prefetch of a project's documents with what document_list_payload() reads joined in"""
+    return Prefetch(
+        'documents',
+        queryset=SupportingDocument.objects.select_related('uploaded_by', 'validation_step')
+    )
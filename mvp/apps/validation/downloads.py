@@ -0,0 +1,167 @@
+import mimetypes
+import re
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+
+RANGE_CHUNK_SIZE = 64 * 1024
+# Larger reads under ASGI, where each one is a hop to a worker thread
+ASYNC_CHUNK_SIZE = 512 * 1024
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def document_etag(document):
+    """Strong ETag from the content hash; None for files stored before deduplication"""
+    return quote_etag(document.sha256) if document.sha256 else None
+
+
+def parse_range(header, size):
+    """
+    Parse a Range header into an inclusive (start, end) byte range.
+
+    Returns None when the whole file should be sent: no header, syntax this
+    view does not handle (several ranges, other units) or an invalid range,
+    all of which RFC 9110 allows a server to ignore. Raises
+    RangeNotSatisfiable when the range lies entirely past the end of the file.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+
+    if not first:
+        # Suffix range: the last N bytes
+        if not last:
+            return None
+        length = int(last)
+        if length == 0:
+            raise RangeNotSatisfiable
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    end = int(last) if last else size - 1
+    return start, min(end, size - 1)
+
+
+def iter_file_range(file, start, length, chunk_size=RANGE_CHUNK_SIZE):
+    """Yield `length` bytes of an open file starting at `start`, then close it"""
+    try:
+        file.seek(start)
+        remaining = length
+        while remaining > 0:
+            data = file.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        file.close()
+
+
+async def aiter_file_range(file, start, length, chunk_size=ASYNC_CHUNK_SIZE):
+    """
+    iter_file_range() for the ASGI server.
+
+    The ASGI handler would read a sync iterator into memory before sending
+    it; this streams chunk by chunk, with the reads done in worker threads
+    so a slow disk never blocks the event loop.
+    """
+    read = sync_to_async(file.read, thread_sensitive=False)
+    try:
+        await sync_to_async(file.seek, thread_sensitive=False)(start)
+        remaining = length
+        while remaining > 0:
+            data = await read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+    finally:
+        file.close()
+
+
+def sendfile_response(document):
+    """Empty response telling the front web server which file to deliver"""
+    response = HttpResponse()
+    if settings.DOCUMENT_SENDFILE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = settings.DOCUMENT_ACCEL_REDIRECT_PREFIX + document.file.name
+    else:
+        response['X-Sendfile'] = document.file.path
+    # Blobs have no extension for the web server to derive a type from
+    response['Content-Type'] = mimetypes.guess_type(document.file_name)[0] or 'application/octet-stream'
+    return response
+
+
+def document_response(request, document, as_attachment=True, asynchronous=False):
+    """
+    Build the download response for a supporting document.
+
+    Handles If-None-Match/If-Modified-Since (304) and single byte ranges
+    (206/416). With DOCUMENT_SENDFILE set, the body is delivered by the front
+    web server (which then also answers range requests) and Django only
+    sends the headers. `asynchronous` streams the file with an async
+    iterator, for responses sent by the ASGI server.
+    """
+    etag = document_etag(document)
+    # Whole seconds, as sent in Last-Modified, so an echoed If-Modified-Since matches
+    last_modified = int(document.uploaded_at.timestamp())
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if settings.DOCUMENT_SENDFILE:
+            response = sendfile_response(document)
+        else:
+            response = file_response(request, document, etag, asynchronous)
+
+    if etag:
+        response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = 'private, no-cache'
+    if response.status_code in (200, 206):
+        response['Content-Disposition'] = content_disposition_header(as_attachment, document.file_name)
+    return response
+
+
+def file_response(request, document, etag, asynchronous=False):
+    size = document.file.size
+    content_type = mimetypes.guess_type(document.file_name)[0] or 'application/octet-stream'
+
+    byte_range = None
+    # If-Range: only honour the range if the client's copy is still current
+    if_range = request.headers.get('If-Range')
+    if not if_range or (etag and if_range == etag):
+        try:
+            byte_range = parse_range(request.headers.get('Range'), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None and not asynchronous:
+        response = FileResponse(document.file.open('rb'), content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1
+        iterate = aiter_file_range if asynchronous else iter_file_range
+        response = StreamingHttpResponse(
+            iterate(document.file.open('rb'), start, length),
+            status=206 if byte_range else 200,
+            content_type=content_type
+        )
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = length
+
+    response['Accept-Ranges'] = 'bytes'
+    return response
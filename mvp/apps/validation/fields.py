@@ -0,0 +1,101 @@
+import json
+import zlib
+import numpy as np
+from django.core.exceptions import ValidationError
+from django.db import models
+
+# 8-byte header: magic, format version and codec. Keeping it 8 bytes long
+# leaves the float64 payload aligned within the buffer.
+HEADER_MAGIC = b'F8'
+FORMAT_VERSION = 1
+CODEC_RAW = 0
+CODEC_ZLIB = 1
+HEADER_SIZE = 8
+
+FLOAT64_LE = np.dtype('<f8')
+
+
+def pack_float_array(values, compress=False):
+    """Encode a sequence of floats as header + little-endian float64 bytes"""
+    array = np.ascontiguousarray(np.asarray(values, dtype=FLOAT64_LE).ravel())
+    payload = array.tobytes()
+    codec = CODEC_RAW
+    if compress:
+        payload = zlib.compress(payload)
+        codec = CODEC_ZLIB
+    header = HEADER_MAGIC + bytes([FORMAT_VERSION, codec]) + b'\x00' * (HEADER_SIZE - 4)
+    return header + payload
+
+
+def unpack_float_array(data):
+    """
+    Decode bytes written by pack_float_array into a read-only float64 array.
+
+    Uncompressed payloads are not copied: the array is a view onto `data`.
+    """
+    buffer = memoryview(data)
+    if len(buffer) < HEADER_SIZE or bytes(buffer[:2]) != HEADER_MAGIC:
+        raise ValueError('Not a packed float64 array')
+    version, codec = buffer[2], buffer[3]
+    if version != FORMAT_VERSION:
+        raise ValueError(f'Unsupported packed array version {version}')
+
+    payload = buffer[HEADER_SIZE:]
+    if codec == CODEC_ZLIB:
+        payload = zlib.decompress(payload)
+    elif codec != CODEC_RAW:
+        raise ValueError(f'Unknown packed array codec {codec}')
+    return np.frombuffer(payload, dtype=FLOAT64_LE)
+
+
+class FloatArrayField(models.BinaryField):
+    """
+    Stores a 1-d float64 array as packed little-endian bytes.
+
+    Values loaded from the database are read-only NumPy arrays viewing the
+    stored bytes (zero copy unless `compress` is set), so the statistics code
+    can use them without parsing. Lists, tuples and arrays can be assigned;
+    copy the array before modifying it in place.
+    """
+
+    description = 'Packed float64 array'
+
+    def __init__(self, *args, compress=False, **kwargs):
+        self.compress = compress
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.compress:
+            kwargs['compress'] = True
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return unpack_float_array(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, np.ndarray):
+            return value
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return unpack_float_array(value)
+        if isinstance(value, str):
+            # Fixtures store the values as a JSON list (see value_to_string)
+            try:
+                value = json.loads(value)
+            except ValueError:
+                raise ValidationError('Enter a JSON list of numbers.', code='invalid')
+        try:
+            return np.asarray(value, dtype=FLOAT64_LE).ravel()
+        except (TypeError, ValueError):
+            raise ValidationError('Enter a list of numbers.', code='invalid')
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return pack_float_array(self.to_python(value), compress=self.compress)
+
+    def value_to_string(self, obj):
+        value = self.value_from_object(obj)
+        return json.dumps(None if value is None else np.asarray(value, dtype=FLOAT64_LE).tolist())
@@ -0,0 +1,205 @@
+import csv
+import io
+import os
+import numpy as np
+from apps.stats.calculations import RunningStats
+
+INGESTIBLE_FILE_TYPES = ['raw_data', 'instrument_data']
+INGESTIBLE_EXTENSIONS = ['.csv', '.txt']
+
+# Rows parsed into NumPy at a time; bounds the Python objects alive while reading
+CHUNK_ROWS = 10000
+SNIFF_BYTES = 64 * 1024
+DELIMITERS = [',', ';', '\t', '|']
+# Instrument exports often start with a preamble (instrument, sample, date...)
+HEADER_SEARCH_ROWS = 50
+
+# Column headers recognised in instrument exports, compared case-insensitively
+COLUMN_ALIASES = {
+    'concentration': ['concentration', 'conc', 'conc.', 'amount', 'level', 'x'],
+    'response': ['response', 'area', 'peak area', 'peak_area', 'height', 'peak height', 'signal', 'y'],
+    'value': ['value', 'result', 'measured', 'measured value', 'assay', 'response', 'area', 'peak area'],
+    'blank': ['blank', 'blank response', 'response', 'area', 'peak area', 'signal'],
+}
+
+# Submission field and column role read for each validation step
+STEP_COLUMNS = {
+    'linearity': [('concentrations', 'concentration'), ('responses', 'response')],
+    'accuracy': [('measured_values', 'value')],
+    'precision': [('replicate_values', 'value')],
+    'lod_loq': [('blank_responses', 'blank')],
+}
+
+
+class IngestError(ValueError):
+    """The file cannot be turned into values for the step; the message is returned to the client"""
+
+
+def is_ingestible(document):
+    """Only raw data and instrument exports in a text format are parsed"""
+    ext = os.path.splitext(document.file_name)[1].lower()
+    return document.file_type in INGESTIBLE_FILE_TYPES and ext in INGESTIBLE_EXTENSIONS
+
+
+class WhitespaceDialect(csv.excel):
+    delimiter = ' '
+    skipinitialspace = True
+
+
+def detect_dialect(sample):
+    """
+    Pick the delimiter of a CSV or TXT export.
+
+    csv.Sniffer expects every line to look alike and is thrown off by
+    instrument preambles, so the delimiter found on the most lines wins.
+    Exports without any of them are treated as whitespace separated.
+    """
+    lines = [line for line in sample.splitlines() if line.strip()]
+    counts = {delimiter: sum(delimiter in line for line in lines) for delimiter in DELIMITERS}
+    delimiter = max(DELIMITERS, key=lambda d: counts[d])
+    if not counts[delimiter]:
+        return WhitespaceDialect
+
+    return type('ExportDialect', (csv.excel,), {'delimiter': delimiter})
+
+
+def normalize_header(cell):
+    return ' '.join(cell.strip().lower().split())
+
+
+def is_column_index(column):
+    # bool is an int subclass; True/False are not column indices
+    return isinstance(column, int) and not isinstance(column, bool)
+
+
+def find_columns(reader, wanted):
+    """
+    Locate the header row and return {field: column index}.
+
+    `wanted` maps each field to an explicit header name, a 0-based column
+    index, or None to match the role's aliases. With only indices there is
+    no header to look for.
+    """
+    if all(is_column_index(column) for column, _ in wanted.values()):
+        return {field: column for field, (column, _) in wanted.items()}
+
+    for row in reader:
+        if reader.line_num > HEADER_SEARCH_ROWS:
+            break
+        headers = [normalize_header(cell) for cell in row]
+        indices = {}
+        for field, (column, role) in wanted.items():
+            if is_column_index(column):
+                indices[field] = column
+                continue
+            candidates = [normalize_header(column)] if column else COLUMN_ALIASES[role]
+            # Aliases are in order of preference; a column is used for one field only
+            for candidate in candidates:
+                if candidate in headers and headers.index(candidate) not in indices.values():
+                    indices[field] = headers.index(candidate)
+                    break
+        if len(indices) == len(wanted):
+            return indices
+
+    missing = ', '.join(
+        f"'{column}'" if column else f'a {role} column' for column, role in wanted.values()
+    )
+    raise IngestError(f'Could not find the header row with {missing}')
+
+
+def parse_chunk(rows, line_numbers, field):
+    try:
+        return np.array(rows, dtype=np.float64)
+    except ValueError:
+        for value, line in zip(rows, line_numbers):
+            try:
+                float(value)
+            except ValueError:
+                raise IngestError(f"Line {line}: '{value}' in the {field} column is not a number")
+        raise
+
+
+def iter_column_chunks(reader, indices, chunk_rows=CHUNK_ROWS):
+    """
+    Yield {field: float64 array} for successive blocks of data rows.
+
+    Rows that are blank in any of the columns (spacers, trailing totals
+    without values) are skipped; any other non-numeric value is an error.
+    """
+    width = max(indices.values()) + 1
+    cells = {field: [] for field in indices}
+    line_numbers = []
+
+    def flush():
+        chunk = {field: parse_chunk(values, line_numbers, field) for field, values in cells.items()}
+        for values in cells.values():
+            values.clear()
+        line_numbers.clear()
+        return chunk
+
+    for row in reader:
+        if len(row) < width:
+            continue
+        values = {field: row[index].strip() for field, index in indices.items()}
+        if not all(values.values()):
+            continue
+        for field, value in values.items():
+            cells[field].append(value)
+        line_numbers.append(reader.line_num)
+        if len(line_numbers) >= chunk_rows:
+            yield flush()
+
+    if line_numbers:
+        yield flush()
+
+
+def read_columns(text_file, step, columns=None, chunk_rows=CHUNK_ROWS):
+    """
+    Stream a delimited text export and return {field: float64 array} for a step.
+
+    `columns` optionally maps submission fields to header names or column
+    indices; unmapped fields are found by their aliases. The file is read
+    row by row and parsed `chunk_rows` at a time, so only the resulting
+    arrays grow with the file size.
+    """
+    if step not in STEP_COLUMNS:
+        raise IngestError(f'Unknown validation step: {step}')
+    columns = columns or {}
+    unknown = set(columns) - {field for field, _ in STEP_COLUMNS[step]}
+    if unknown:
+        raise IngestError(f'Unknown column mapping for {step}: {", ".join(sorted(unknown))}')
+
+    sample = text_file.read(SNIFF_BYTES)
+    text_file.seek(0)
+    reader = csv.reader(text_file, detect_dialect(sample))
+
+    wanted = {field: (columns.get(field), role) for field, role in STEP_COLUMNS[step]}
+    indices = find_columns(reader, wanted)
+
+    chunks = {field: [] for field in indices}
+    for chunk in iter_column_chunks(reader, indices, chunk_rows):
+        for field, values in chunk.items():
+            chunks[field].append(values)
+
+    if not any(chunks.values()):
+        raise IngestError('No numeric rows found below the header')
+    return {field: np.concatenate(parts) for field, parts in chunks.items()}
+
+
+def read_document_columns(document, step, columns=None):
+    """Parse a SupportingDocument upload for a step, see read_columns"""
+    with document.file.open('rb') as raw:
+        text_file = io.TextIOWrapper(raw, encoding='utf-8-sig', errors='replace', newline='')
+        try:
+            return read_columns(text_file, step, columns)
+        finally:
+            text_file.detach()
+
+
+def describe_columns(values):
+    """Count, mean, min and max of each parsed column, for previews"""
+    described = {}
+    for field, array in values.items():
+        stats = RunningStats.of(array)
+        described[field] = {'count': stats.count, 'mean': stats.mean, 'min': stats.min, 'max': stats.max}
+    return described
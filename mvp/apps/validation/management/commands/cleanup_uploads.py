@@ -0,0 +1,18 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.validation.uploads import cleanup_stale_uploads
+
+
+class Command(BaseCommand):
+    help = 'Abort chunked uploads that stopped receiving data and delete their part files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age-hours', type=float, default=settings.UPLOAD_SESSION_MAX_AGE_HOURS,
+            help='Abort uploads idle for longer than this'
+        )
+
+    def handle(self, *args, **options):
+        count = cleanup_stale_uploads(timedelta(hours=options['max_age_hours']))
+        self.stdout.write(self.style.SUCCESS(f'Aborted {count} stale uploads'))
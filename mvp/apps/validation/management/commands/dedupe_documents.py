@@ -0,0 +1,37 @@
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from apps.validation.models import SupportingDocument
+from apps.validation.previews import delete_previews, initial_preview_status
+from apps.validation.storage import blob_digest
+
+
+class Command(BaseCommand):
+    help = 'Move documents uploaded before deduplication into content-addressed storage'
+
+    def handle(self, *args, **options):
+        storage = SupportingDocument._meta.get_field('file').storage
+        moved = missing = 0
+        for document in SupportingDocument.objects.filter(sha256='').iterator():
+            old_name = document.file.name
+            if blob_digest(old_name):
+                document.sha256 = blob_digest(old_name)
+                document.save(update_fields=['sha256'])
+                continue
+            if not storage.exists(old_name):
+                self.stderr.write(f'Missing file for document {document.id}: {old_name}')
+                missing += 1
+                continue
+
+            # Previews live next to the file, so the blob gets its own
+            document.preview_status = initial_preview_status(document.file_name)
+            with storage.open(old_name, 'rb') as f:
+                # Stored like a new upload: the row is written under the blob's lock
+                document.file = File(f, name=old_name)
+                document.save(update_fields=['file', 'sha256', 'preview_status'])
+
+            if not SupportingDocument.objects.filter(file=old_name).exists():
+                storage.delete(old_name)
+                delete_previews(storage, old_name)
+            moved += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Moved {moved} documents into blob storage ({missing} missing files)'))
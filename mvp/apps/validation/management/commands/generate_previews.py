@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from apps.validation.previews import process_pending_previews
+
+
+class Command(BaseCommand):
+    help = 'Render thumbnails and previews for uploaded images and PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=20,
+            help='Documents processed per queue poll'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=5.0,
+            help='Seconds to wait between queue polls when idle'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once no document is pending instead of polling forever'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                processed = process_pending_previews(options['batch_size'])
+                if processed:
+                    self.stdout.write(f'Processed previews for {processed} documents')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write('Preview worker stopped')
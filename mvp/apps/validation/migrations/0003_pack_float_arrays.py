@@ -0,0 +1,84 @@
+from django.db import migrations, models
+
+import apps.validation.fields
+
+
+BATCH_SIZE = 2000
+
+# model name -> JSON list fields converted to packed float64 arrays
+ARRAY_FIELDS = {
+    'linearitydata': ['concentrations', 'responses'],
+    'accuracydata': ['measured_values'],
+    'precisiondata': ['replicate_values'],
+    'lodloqdata': ['blank_responses'],
+}
+
+
+def copy_fields(Model, sources, targets, convert):
+    batch = []
+    for row in Model.objects.only('id', *sources).iterator(chunk_size=BATCH_SIZE):
+        for source, target in zip(sources, targets):
+            setattr(row, target, convert(getattr(row, source)))
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            Model.objects.bulk_update(batch, targets)
+            batch = []
+    if batch:
+        Model.objects.bulk_update(batch, targets)
+
+
+def json_to_packed(apps, schema_editor):
+    for model_name, fields in ARRAY_FIELDS.items():
+        Model = apps.get_model('validation', model_name)
+        copy_fields(Model, fields, [f'{field}_packed' for field in fields], lambda value: [float(v) for v in value or []])
+
+
+def packed_to_json(apps, schema_editor):
+    for model_name, fields in ARRAY_FIELDS.items():
+        Model = apps.get_model('validation', model_name)
+        copy_fields(Model, [f'{field}_packed' for field in fields], fields, lambda value: value.tolist())
+
+
+def array_field_operations():
+    # The JSON columns are made nullable before they are dropped so that the
+    # migration can be reversed: they are re-added empty, then filled in.
+    add, relax, remove, rename, alter = [], [], [], [], []
+    for model_name, fields in ARRAY_FIELDS.items():
+        for field in fields:
+            add.append(migrations.AddField(
+                model_name=model_name,
+                name=f'{field}_packed',
+                field=apps.validation.fields.FloatArrayField(null=True),
+            ))
+            relax.append(migrations.AlterField(
+                model_name=model_name,
+                name=field,
+                field=models.JSONField(null=True),
+            ))
+            remove.append(migrations.RemoveField(model_name=model_name, name=field))
+            rename.append(migrations.RenameField(model_name=model_name, old_name=f'{field}_packed', new_name=field))
+            alter.append(migrations.AlterField(
+                model_name=model_name,
+                name=field,
+                field=apps.validation.fields.FloatArrayField(),
+            ))
+    return add, relax, remove, rename, alter
+
+
+ADD, RELAX, REMOVE, RENAME, ALTER = array_field_operations()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validation', '0002_parameterreview_supportingdocument'),
+    ]
+
+    operations = [
+        *ADD,
+        *RELAX,
+        migrations.RunPython(json_to_packed, packed_to_json),
+        *REMOVE,
+        *RENAME,
+        *ALTER,
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:23
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_alter_project_options'),
+        ('validation', '0003_pack_float_arrays'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='supportingdocument',
+            name='file_size',
+            field=models.PositiveBigIntegerField(),
+        ),
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(max_length=255)),
+                ('file_type', models.CharField(choices=[('chromatogram', 'Chromatogram'), ('instrument_data', 'Instrument Data'), ('certificate', 'Certificate'), ('sop', 'SOP/Procedure'), ('raw_data', 'Raw Data'), ('other', 'Other')], default='other', max_length=20)),
+                ('description', models.TextField(blank=True)),
+                ('total_size', models.PositiveBigIntegerField()),
+                ('received', models.PositiveBigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('complete', 'Complete'), ('aborted', 'Aborted')], default='active', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('document', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='validation.supportingdocument')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='projects.project')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('validation_step', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='validation.validationstep')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'updated_at'], name='validation__status_0d165c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:27
+
+import apps.validation.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validation', '0004_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='supportingdocument',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='supportingdocument',
+            name='file',
+            field=models.FileField(storage=apps.validation.storage.ContentAddressedStorage(), upload_to='blobs/'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validation', '0006_document_previews'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='uploadsession',
+            name='status',
+            field=models.CharField(choices=[('active', 'Active'), ('finalizing', 'Finalizing'), ('complete', 'Complete'), ('aborted', 'Aborted')], default='active', max_length=20),
+        ),
+    ]
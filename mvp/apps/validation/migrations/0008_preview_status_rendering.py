@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('validation', '0007_upload_session_finalizing'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='supportingdocument',
+            name='preview_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('rendering', 'Rendering'), ('ready', 'Ready'), ('unsupported', 'Unsupported'), ('failed', 'Failed')], db_index=True, default='pending', max_length=20),
+        ),
+    ]
@@ -1,5 +1,9 @@
+import uuid
 from django.db import models
 from django.conf import settings
+from .fields import FloatArrayField
+from .previews import initial_preview_status
+from .storage import ContentAddressedStorage, blob_digest
 
 
 class ValidationStep(models.Model):
@@ -21,8 +25,8 @@ class ValidationStep(models.Model):
 
 class LinearityData(models.Model):
     validation_step = models.OneToOneField(ValidationStep, on_delete=models.CASCADE)
-    concentrations = models.JSONField()  # list of floats
-    responses = models.JSONField()  # list of floats
+    concentrations = FloatArrayField()
+    responses = FloatArrayField()
     slope = models.FloatField(null=True)
     intercept = models.FloatField(null=True)
     r_squared = models.FloatField(null=True)
@@ -40,7 +44,7 @@ class AccuracyData(models.Model):
     ]
     validation_step = models.OneToOneField(ValidationStep, on_delete=models.CASCADE)
     level = models.CharField(max_length=10, choices=LEVEL_CHOICES)
-    measured_values = models.JSONField()  # list of floats
+    measured_values = FloatArrayField()
     recovery = models.FloatField(null=True)
     mean_recovery = models.FloatField(null=True)
     rsd = models.FloatField(null=True)
@@ -49,7 +53,7 @@ class AccuracyData(models.Model):
 
 class PrecisionData(models.Model):
     validation_step = models.OneToOneField(ValidationStep, on_delete=models.CASCADE)
-    replicate_values = models.JSONField()  # list of floats
+    replicate_values = FloatArrayField()
     mean = models.FloatField(null=True)
     rsd = models.FloatField(null=True)
     passed = models.BooleanField(null=True)
@@ -57,7 +61,7 @@ class PrecisionData(models.Model):
 
 class LODLOQData(models.Model):
     validation_step = models.OneToOneField(ValidationStep, on_delete=models.CASCADE)
-    blank_responses = models.JSONField()  # list of floats
+    blank_responses = FloatArrayField()
     slope = models.FloatField()  # from linearity
     lod = models.FloatField(null=True)
     loq = models.FloatField(null=True)
@@ -73,16 +77,27 @@ class SupportingDocument(models.Model):
         ('raw_data', 'Raw Data'),
         ('other', 'Other'),
     ]
+    PREVIEW_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('rendering', 'Rendering'),
+        ('ready', 'Ready'),
+        ('unsupported', 'Unsupported'),
+        ('failed', 'Failed'),
+    ]
     
     project = models.ForeignKey('projects.Project', on_delete=models.CASCADE, related_name='documents')
     validation_step = models.ForeignKey(ValidationStep, on_delete=models.CASCADE, null=True, blank=True, related_name='documents')
-    file = models.FileField(upload_to='supporting_documents/%Y/%m/%d/')
+    # Deduplicated: identical uploads share one blob named by its SHA-256
+    file = models.FileField(upload_to='blobs/', storage=ContentAddressedStorage())
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True)
     file_type = models.CharField(max_length=20, choices=FILE_TYPE_CHOICES, default='other')
     file_name = models.CharField(max_length=255)
-    file_size = models.PositiveIntegerField()
+    file_size = models.PositiveBigIntegerField()
     description = models.TextField(blank=True)
     uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     uploaded_at = models.DateTimeField(auto_now_add=True)
+    # Thumbnails are rendered by the preview worker (manage.py generate_previews)
+    preview_status = models.CharField(max_length=20, choices=PREVIEW_STATUS_CHOICES, default='pending', db_index=True)
     
     class Meta:
         ordering = ['-uploaded_at']
@@ -90,6 +105,61 @@ class SupportingDocument(models.Model):
     def __str__(self):
         return f"{self.file_name} ({self.project.method_name})"
 
+    def save(self, *args, **kwargs):
+        if not self.file or self.file._committed:
+            self._save_row(*args, **kwargs)
+            return
+
+        # Store the file first (FileField would do it during save) so the
+        # content hash is known when the row is written
+        content = self.file.file
+        self.file.save(self.file.name, content, save=False)
+        storage = self.file.storage
+        with storage.lock(self.file.name):
+            if not storage.exists(self.file.name):
+                # The blob was reused, then released by its last other document
+                self.file.save(self.file.name, content, save=False)
+            # Saved in autocommit by every caller, so the row is visible to
+            # release_blob() as soon as the lock is released
+            self._save_row(*args, **kwargs)
+
+    def _save_row(self, *args, **kwargs):
+        if self.file and not self.sha256:
+            self.sha256 = blob_digest(self.file.name)
+        if self._state.adding:
+            self.preview_status = initial_preview_status(self.file_name)
+        super().save(*args, **kwargs)
+
+
+class UploadSession(models.Model):
+    """A chunked upload in progress; chunks are appended to a part file until it is finalized"""
+    STATUS_CHOICES = [
+        ('active', 'Active'),
+        ('finalizing', 'Finalizing'),
+        ('complete', 'Complete'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    project = models.ForeignKey('projects.Project', on_delete=models.CASCADE, related_name='upload_sessions')
+    validation_step = models.ForeignKey(ValidationStep, on_delete=models.SET_NULL, null=True, blank=True)
+    file_name = models.CharField(max_length=255)
+    file_type = models.CharField(max_length=20, choices=SupportingDocument.FILE_TYPE_CHOICES, default='other')
+    description = models.TextField(blank=True)
+    total_size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
+    document = models.OneToOneField(SupportingDocument, on_delete=models.SET_NULL, null=True, blank=True)
+    uploaded_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'updated_at'])]
+
+    def __str__(self):
+        return f"Upload of {self.file_name} ({self.received}/{self.total_size} bytes)"
+
 
 class ParameterReview(models.Model):
     DECISION_CHOICES = [
@@ -0,0 +1,163 @@
+import os
+import shutil
+import subprocess
+import tempfile
+from PIL import Image
+
+IMAGE_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.tiff']
+PDF_EXTENSIONS = ['.pdf']
+
+# Longest edge in pixels of each rendition; thumbnails for document lists,
+# previews for viewing a chromatogram without downloading the original
+PREVIEW_SIZES = {
+    'thumb': 200,
+    'preview': 1200,
+}
+PREVIEW_CONTENT_TYPE = 'image/jpeg'
+JPEG_QUALITY = 80
+PDF_RENDER_TIMEOUT = 60
+
+
+class PreviewUnsupported(Exception):
+    """No preview can be rendered for this kind of file"""
+
+
+def file_extension(file_name):
+    return os.path.splitext(file_name)[1].lower()
+
+
+def pdf_renderer():
+    """Path of poppler's pdftoppm, which renders PDF previews; None if it is not installed"""
+    return shutil.which('pdftoppm')
+
+
+def initial_preview_status(file_name):
+    """Preview status of a new document: images and PDFs are queued for the preview worker"""
+    if file_extension(file_name) in IMAGE_EXTENSIONS + PDF_EXTENSIONS:
+        return 'pending'
+    return 'unsupported'
+
+
+def preview_name(file_name, size):
+    """
+    Storage name of a rendition, next to the original file.
+
+    Blobs are shared by identical uploads, so their previews are too and are
+    rendered only once.
+    """
+    return f'{file_name}.{size}.jpg'
+
+
+def open_source_image(document, max_edge):
+    """Decode the first page or frame of a document as a Pillow image"""
+    path = document.file.path
+    ext = file_extension(document.file_name)
+
+    if ext in IMAGE_EXTENSIONS:
+        image = Image.open(path)
+        # Lets the JPEG decoder downscale while decoding (no-op for other formats)
+        image.draft('RGB', (max_edge, max_edge))
+        return image
+
+    if ext in PDF_EXTENSIONS:
+        renderer = pdf_renderer()
+        if not renderer:
+            raise PreviewUnsupported('pdftoppm is not installed')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            prefix = os.path.join(tmp_dir, 'page')
+            subprocess.run(
+                [renderer, '-f', '1', '-l', '1', '-singlefile', '-png', '-scale-to', str(max_edge), path, prefix],
+                check=True, capture_output=True, timeout=PDF_RENDER_TIMEOUT
+            )
+            image = Image.open(f'{prefix}.png')
+            image.load()
+            return image
+
+    raise PreviewUnsupported(f'No preview for {ext or "files without extension"}')
+
+
+def write_jpeg(image, path):
+    """Atomically write a JPEG so the preview view never serves a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            image.save(tmp_file, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def render_previews(document):
+    """
+    Write every rendition of a document that is not stored yet.
+
+    The source is decoded once at the largest size and each smaller
+    rendition is scaled down from the previous one.
+    """
+    storage = document.file.storage
+    missing = [
+        (size, edge) for size, edge in sorted(PREVIEW_SIZES.items(), key=lambda item: -item[1])
+        if not storage.exists(preview_name(document.file.name, size))
+    ]
+    if not missing:
+        return
+
+    image = open_source_image(document, missing[0][1])
+    try:
+        # Multi-page TIFFs and PNGs with transparency are flattened to RGB
+        rendition = image.convert('RGB')
+    finally:
+        image.close()
+    for size, edge in missing:
+        rendition.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        write_jpeg(rendition, storage.path(preview_name(document.file.name, size)))
+
+
+def generate_previews(document):
+    """Render a document's previews and record the outcome in preview_status"""
+    try:
+        render_previews(document)
+    except PreviewUnsupported:
+        document.preview_status = 'unsupported'
+    except (OSError, ValueError, Image.DecompressionBombError, subprocess.SubprocessError):
+        # Corrupt or truncated file, oversized image or a PDF that failed to render
+        document.preview_status = 'failed'
+    else:
+        document.preview_status = 'ready'
+    document.save(update_fields=['preview_status'])
+    return document.preview_status
+
+
+def process_pending_previews(limit=None):
+    """
+    Generate previews for pending documents, oldest first; returns the number processed.
+
+    Each document is claimed with a conditional update before it is
+    rendered, so workers polling the same queue never render it twice.
+    """
+    from .models import SupportingDocument
+
+    pending = SupportingDocument.objects.filter(preview_status='pending').order_by('uploaded_at', 'id')
+    if limit:
+        pending = pending[:limit]
+    processed = 0
+    for document in list(pending):
+        claimed = SupportingDocument.objects.filter(id=document.id, preview_status='pending').update(
+            preview_status='rendering'
+        )
+        if not claimed:
+            # Taken by another worker since the queue was read
+            continue
+        document.preview_status = 'rendering'
+        generate_previews(document)
+        processed += 1
+    return processed
+
+
+def delete_previews(storage, file_name):
+    """Remove the renditions of a stored file; called when the file itself is deleted"""
+    for size in PREVIEW_SIZES:
+        storage.delete(preview_name(file_name, size))
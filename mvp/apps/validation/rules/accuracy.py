@@ -1,5 +1,5 @@
-from apps.stats.calculations import calculate_recovery, calculate_rsd
-import statistics
+import numpy as np
+from apps.stats.calculations import RunningStats, calculate_recovery, batch_rsd, segment_lengths
 
 
 def evaluate_accuracy(level, measured_values):
@@ -14,48 +14,81 @@ def evaluate_accuracy(level, measured_values):
     """
     try:
         recoveries = [calculate_recovery(float(level)/100 * 100, m) for m in measured_values]  # assuming nominal 100
-        mean_recovery = statistics.mean(recoveries)
-        rsd = calculate_rsd(recoveries)
-
-        # ICH Q2 accuracy criteria
-        recovery_ok = 80 <= mean_recovery <= 120
-
-        # RSD criteria
-        n = len(measured_values)
-        if n >= 6:
-            rsd_limit = 2.0
-        elif n >= 3:
-            rsd_limit = 5.0
-        else:
-            rsd_limit = 10.0  # conservative
-
-        rsd_ok = rsd <= rsd_limit
-
-        passed = recovery_ok and rsd_ok
-
-        justification = []
-        if recovery_ok:
-            justification.append(f"Mean recovery ({mean_recovery:.2f}%) is within 80-120%")
-        else:
-            justification.append(f"Mean recovery ({mean_recovery:.2f}%) is outside 80-120%")
-
-        if rsd_ok:
-            justification.append(f"%RSD ({rsd:.2f}%) meets requirement (<= {rsd_limit:.1f}%)")
-        else:
-            justification.append(f"%RSD ({rsd:.2f}%) does not meet requirement (<= {rsd_limit:.1f}%)")
-
-        return {
-            'status': 'PASS' if passed else 'FAIL',
-            'metrics': {
-                'recoveries': recoveries,
-                'mean_recovery': mean_recovery,
-                'rsd': rsd,
-            },
-            'justification': '; '.join(justification)
-        }
+        stats = RunningStats.of(recoveries)
+        if stats.count == 0:
+            raise ValueError("Measured values required")
+        return accuracy_result(recoveries, stats.mean, stats.rsd, stats.count)
     except Exception as e:
         return {
             'status': 'FAIL',
             'metrics': {},
             'justification': f'Error in calculation: {str(e)}'
         }
+
+
+def accuracy_result(recoveries, mean_recovery, rsd, n):
+    """Apply the accuracy acceptance criteria to the recoveries of one level"""
+    # ICH Q2 accuracy criteria
+    recovery_ok = 80 <= mean_recovery <= 120
+
+    # RSD criteria
+    if n >= 6:
+        rsd_limit = 2.0
+    elif n >= 3:
+        rsd_limit = 5.0
+    else:
+        rsd_limit = 10.0  # conservative
+
+    rsd_ok = rsd <= rsd_limit
+
+    passed = recovery_ok and rsd_ok
+
+    justification = []
+    if recovery_ok:
+        justification.append(f"Mean recovery ({mean_recovery:.2f}%) is within 80-120%")
+    else:
+        justification.append(f"Mean recovery ({mean_recovery:.2f}%) is outside 80-120%")
+
+    if rsd_ok:
+        justification.append(f"%RSD ({rsd:.2f}%) meets requirement (<= {rsd_limit:.1f}%)")
+    else:
+        justification.append(f"%RSD ({rsd:.2f}%) does not meet requirement (<= {rsd_limit:.1f}%)")
+
+    return {
+        'status': 'PASS' if passed else 'FAIL',
+        'metrics': {
+            'recoveries': recoveries,
+            'mean_recovery': mean_recovery,
+            'rsd': rsd,
+        },
+        'justification': '; '.join(justification)
+    }
+
+
+def evaluate_accuracy_batch(levels, measured_values, offsets):
+    """
+    Evaluate many accuracy datasets at once.
+
+    `levels` holds one spike level per dataset and `measured_values` the
+    packed measurements with CSR-style `offsets`. Returns one result per
+    dataset, matching evaluate_accuracy; empty datasets and zero levels go
+    through the scalar path.
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    measured = np.asarray(measured_values, dtype=np.float64)
+    lengths = segment_lengths(offsets)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        recoveries = measured / np.repeat(levels, lengths) * 100
+    mean_recoveries, rsds = batch_rsd(recoveries, offsets)
+
+    results = []
+    for i, n in enumerate(lengths):
+        start, end = offsets[i], offsets[i + 1]
+        if n == 0 or levels[i] == 0:
+            results.append(evaluate_accuracy(levels[i], measured[start:end].tolist()))
+        else:
+            results.append(accuracy_result(
+                recoveries[start:end].tolist(), float(mean_recoveries[i]), float(rsds[i]), int(n)
+            ))
+    return results
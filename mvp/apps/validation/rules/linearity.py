@@ -1,4 +1,5 @@
-from apps.stats.calculations import linear_regression
+import numpy as np
+from apps.stats.calculations import linear_regression, batch_linear_regression, segment_lengths, segment_max
 
 
 def evaluate_linearity(concentrations, responses):
@@ -13,40 +14,71 @@ def evaluate_linearity(concentrations, responses):
     """
     try:
         slope, intercept, r_squared = linear_regression(concentrations, responses)
-
-        # ICH Q2: correlation coefficient >= 0.99
-        passed = r_squared >= 0.99
-
-        # Additional check: y-intercept should be within reasonable range
-        # For simplicity, accept if |intercept| < 10% of max response
-        max_response = max(responses)
-        intercept_ok = abs(intercept) < 0.1 * max_response
-
-        passed = passed and intercept_ok
-
-        justification = []
-        if r_squared >= 0.99:
-            justification.append(f"Correlation coefficient (r² = {r_squared:.4f}) meets requirement (>=0.99)")
-        else:
-            justification.append(f"Correlation coefficient (r² = {r_squared:.4f}) does not meet requirement (>=0.99)")
-
-        if intercept_ok:
-            justification.append(f"Y-intercept ({intercept:.4f}) is acceptable")
-        else:
-            justification.append(f"Y-intercept ({intercept:.4f}) is too high")
-
-        return {
-            'status': 'PASS' if passed else 'FAIL',
-            'metrics': {
-                'slope': slope,
-                'intercept': intercept,
-                'r_squared': r_squared,
-            },
-            'justification': '; '.join(justification)
-        }
+        return linearity_result(slope, intercept, r_squared, max(responses))
     except Exception as e:
         return {
             'status': 'FAIL',
             'metrics': {},
             'justification': f'Error in calculation: {str(e)}'
         }
+
+
+def linearity_result(slope, intercept, r_squared, max_response):
+    """Apply the linearity acceptance criteria to a fitted calibration line"""
+    # ICH Q2: correlation coefficient >= 0.99
+    passed = r_squared >= 0.99
+
+    # Additional check: y-intercept should be within reasonable range
+    # For simplicity, accept if |intercept| < 10% of max response
+    intercept_ok = abs(intercept) < 0.1 * max_response
+
+    passed = passed and intercept_ok
+
+    justification = []
+    if r_squared >= 0.99:
+        justification.append(f"Correlation coefficient (r² = {r_squared:.4f}) meets requirement (>=0.99)")
+    else:
+        justification.append(f"Correlation coefficient (r² = {r_squared:.4f}) does not meet requirement (>=0.99)")
+
+    if intercept_ok:
+        justification.append(f"Y-intercept ({intercept:.4f}) is acceptable")
+    else:
+        justification.append(f"Y-intercept ({intercept:.4f}) is too high")
+
+    return {
+        'status': 'PASS' if passed else 'FAIL',
+        'metrics': {
+            'slope': slope,
+            'intercept': intercept,
+            'r_squared': r_squared,
+        },
+        'justification': '; '.join(justification)
+    }
+
+
+def evaluate_linearity_batch(concentrations, responses, offsets):
+    """
+    Evaluate many linearity datasets at once.
+
+    Datasets are packed as flat arrays with CSR-style `offsets` (see
+    apps.stats.calculations.pack_ragged). Returns one result per dataset,
+    matching evaluate_linearity; datasets the vectorized fit cannot handle
+    (fewer than two points, constant concentrations) go through the scalar
+    path so they get the same error messages.
+    """
+    x = np.asarray(concentrations, dtype=np.float64)
+    y = np.asarray(responses, dtype=np.float64)
+    lengths = segment_lengths(offsets)
+    slopes, intercepts, r_squared = batch_linear_regression(x, y, offsets)
+    max_responses = segment_max(y, offsets)
+
+    results = []
+    for i, n in enumerate(lengths):
+        if n < 2 or not np.isfinite(slopes[i]):
+            start, end = offsets[i], offsets[i + 1]
+            results.append(evaluate_linearity(x[start:end].tolist(), y[start:end].tolist()))
+        else:
+            results.append(linearity_result(
+                float(slopes[i]), float(intercepts[i]), float(r_squared[i]), float(max_responses[i])
+            ))
+    return results
@@ -1,4 +1,5 @@
-from apps.stats.calculations import calculate_lod_lod
+import numpy as np
+from apps.stats.calculations import calculate_lod_lod, segment_lengths, segment_mean_std
 
 
 def evaluate_lod_loq(blank_responses, slope):
@@ -19,27 +20,59 @@ def evaluate_lod_loq(blank_responses, slope):
     """
     try:
         lod, loq = calculate_lod_lod(blank_responses, slope)
-
-        # Basic validation
-        passed = lod > 0 and loq > 0 and lod < loq
-
-        justification = []
-        if passed:
-            justification.append(f"LOD ({lod:.4f}) and LOQ ({loq:.4f}) calculated successfully")
-        else:
-            justification.append("LOD/LOQ calculation failed or invalid values")
-
-        return {
-            'status': 'PASS' if passed else 'FAIL',
-            'metrics': {
-                'lod': lod,
-                'loq': loq,
-            },
-            'justification': '; '.join(justification)
-        }
+        return lod_loq_result(lod, loq)
     except Exception as e:
         return {
             'status': 'FAIL',
             'metrics': {},
             'justification': f'Error in calculation: {str(e)}'
         }
+
+
+def lod_loq_result(lod, loq):
+    """Apply the LOD/LOQ acceptance criteria to calculated limits"""
+    # Basic validation
+    passed = lod > 0 and loq > 0 and lod < loq
+
+    justification = []
+    if passed:
+        justification.append(f"LOD ({lod:.4f}) and LOQ ({loq:.4f}) calculated successfully")
+    else:
+        justification.append("LOD/LOQ calculation failed or invalid values")
+
+    return {
+        'status': 'PASS' if passed else 'FAIL',
+        'metrics': {
+            'lod': lod,
+            'loq': loq,
+        },
+        'justification': '; '.join(justification)
+    }
+
+
+def evaluate_lod_loq_batch(blank_responses, offsets, slopes):
+    """
+    Evaluate many LOD/LOQ datasets at once.
+
+    `blank_responses` holds the packed blanks with CSR-style `offsets` and
+    `slopes` one calibration slope per dataset. Returns one result per
+    dataset, matching evaluate_lod_loq; datasets with fewer than two blanks
+    go through the scalar path.
+    """
+    blanks = np.asarray(blank_responses, dtype=np.float64)
+    slopes = np.asarray(slopes, dtype=np.float64)
+    lengths = segment_lengths(offsets)
+    _, sigmas = segment_mean_std(blanks, offsets)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lods = np.where(slopes != 0, 3.3 * sigmas / slopes, 0.0)
+        loqs = np.where(slopes != 0, 10 * sigmas / slopes, 0.0)
+
+    results = []
+    for i, n in enumerate(lengths):
+        if n < 2:
+            start, end = offsets[i], offsets[i + 1]
+            results.append(evaluate_lod_loq(blanks[start:end].tolist(), float(slopes[i])))
+        else:
+            results.append(lod_loq_result(float(lods[i]), float(loqs[i])))
+    return results
@@ -1,5 +1,5 @@
-from apps.stats.calculations import calculate_rsd
-import statistics
+import numpy as np
+from apps.stats.calculations import RunningStats, batch_rsd, segment_lengths
 
 
 def evaluate_precision(replicate_values):
@@ -12,37 +12,62 @@ def evaluate_precision(replicate_values):
     Returns: dict with status, metrics, justification
     """
     try:
-        mean_val = statistics.mean(replicate_values)
-        rsd = calculate_rsd(replicate_values)
-
-        # ICH Q2 precision criteria
-        n = len(replicate_values)
-        if n >= 6:
-            rsd_limit = 2.0
-        elif n >= 3:
-            rsd_limit = 5.0
-        else:
-            rsd_limit = 10.0  # conservative
-
-        passed = rsd <= rsd_limit
-
-        justification = []
-        if passed:
-            justification.append(f"%RSD ({rsd:.2f}%) meets requirement (<= {rsd_limit:.1f}%)")
-        else:
-            justification.append(f"%RSD ({rsd:.2f}%) does not meet requirement (<= {rsd_limit:.1f}%)")
-
-        return {
-            'status': 'PASS' if passed else 'FAIL',
-            'metrics': {
-                'mean': mean_val,
-                'rsd': rsd,
-            },
-            'justification': '; '.join(justification)
-        }
+        stats = RunningStats.of(replicate_values)
+        if stats.count == 0:
+            raise ValueError("Replicate values required")
+        return precision_result(stats.mean, stats.rsd, stats.count)
     except Exception as e:
         return {
             'status': 'FAIL',
             'metrics': {},
             'justification': f'Error in calculation: {str(e)}'
         }
+
+
+def precision_result(mean_val, rsd, n):
+    """Apply the precision acceptance criteria to one set of replicates"""
+    # ICH Q2 precision criteria
+    if n >= 6:
+        rsd_limit = 2.0
+    elif n >= 3:
+        rsd_limit = 5.0
+    else:
+        rsd_limit = 10.0  # conservative
+
+    passed = rsd <= rsd_limit
+
+    justification = []
+    if passed:
+        justification.append(f"%RSD ({rsd:.2f}%) meets requirement (<= {rsd_limit:.1f}%)")
+    else:
+        justification.append(f"%RSD ({rsd:.2f}%) does not meet requirement (<= {rsd_limit:.1f}%)")
+
+    return {
+        'status': 'PASS' if passed else 'FAIL',
+        'metrics': {
+            'mean': mean_val,
+            'rsd': rsd,
+        },
+        'justification': '; '.join(justification)
+    }
+
+
+def evaluate_precision_batch(replicate_values, offsets):
+    """
+    Evaluate many precision datasets at once.
+
+    `replicate_values` holds the packed replicates with CSR-style `offsets`.
+    Returns one result per dataset, matching evaluate_precision; empty
+    datasets go through the scalar path.
+    """
+    values = np.asarray(replicate_values, dtype=np.float64)
+    lengths = segment_lengths(offsets)
+    means, rsds = batch_rsd(values, offsets)
+
+    results = []
+    for i, n in enumerate(lengths):
+        if n == 0:
+            results.append(evaluate_precision([]))
+        else:
+            results.append(precision_result(float(means[i]), float(rsds[i]), int(n)))
+    return results
@@ -9,6 +9,9 @@ class ValidationStepSerializer(serializers.ModelSerializer):
 
 
 class LinearityDataSerializer(serializers.ModelSerializer):
+    concentrations = serializers.ListField(child=serializers.FloatField())
+    responses = serializers.ListField(child=serializers.FloatField())
+
     class Meta:
         model = LinearityData
         fields = ['id', 'concentrations', 'responses', 'slope', 'intercept', 'r_squared', 'passed']
@@ -20,6 +23,8 @@ class LinearitySubmitSerializer(serializers.Serializer):
 
 
 class AccuracyDataSerializer(serializers.ModelSerializer):
+    measured_values = serializers.ListField(child=serializers.FloatField())
+
     class Meta:
         model = AccuracyData
         fields = ['id', 'level', 'measured_values', 'recovery', 'mean_recovery', 'rsd', 'passed']
@@ -31,6 +36,8 @@ class AccuracySubmitSerializer(serializers.Serializer):
 
 
 class PrecisionDataSerializer(serializers.ModelSerializer):
+    replicate_values = serializers.ListField(child=serializers.FloatField())
+
     class Meta:
         model = PrecisionData
         fields = ['id', 'replicate_values', 'mean', 'rsd', 'passed']
@@ -41,6 +48,8 @@ class PrecisionSubmitSerializer(serializers.Serializer):
 
 
 class LODLOQDataSerializer(serializers.ModelSerializer):
+    blank_responses = serializers.ListField(child=serializers.FloatField())
+
     class Meta:
         model = LODLOQData
         fields = ['id', 'blank_responses', 'slope', 'lod', 'loq', 'passed']
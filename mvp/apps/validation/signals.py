@@ -0,0 +1,17 @@
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .models import SupportingDocument
+from .storage import release_blob
+
+
+@receiver(post_delete, sender=SupportingDocument)
+def release_document_file(sender, instance, **kwargs):
+    """
+    Drop the stored file once the last document using it is gone.
+
+    Runs for cascades too (project deletion, steps cleared on review
+    rejection). Deferred to commit so a rolled back delete keeps its file.
+    """
+    name = instance.file.name
+    transaction.on_commit(lambda: release_blob(name))
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from django.core.files import File, locks
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+from .previews import delete_previews
+
+BLOB_PREFIX = 'blobs'
+# Lock files serializing reference checks, one per leading byte of the digest
+LOCK_DIR = f'{BLOB_PREFIX}/.locks'
+BLOB_NAME_RE = re.compile(rf'^{BLOB_PREFIX}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/([0-9a-f]{{64}})$')
+
+
+def blob_name(digest):
+    """Storage path of the blob with a given SHA-256, fanned out over two directory levels"""
+    return f'{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}'
+
+
+def blob_digest(name):
+    """SHA-256 encoded in a blob name, or '' for files stored before deduplication"""
+    match = BLOB_NAME_RE.match(name or '')
+    return match.group(1) if match else ''
+
+
+def content_sha256(content):
+    """Hash a file-like object chunk by chunk; chunks() rewinds it before and the caller after"""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names every file by the SHA-256 of its content.
+
+    The name passed in (from upload_to) is ignored. Saving content that is
+    already stored returns the existing blob's name without writing
+    anything, so a certificate attached to fifty projects is on disk once.
+    Blobs are shared, so they must only be deleted through
+    release_blob(), which checks that no SupportingDocument still uses them.
+    That check and the writing of a new reference both hold lock(), so a
+    blob cannot be deleted between being reused and being referenced.
+    """
+
+    @contextmanager
+    def lock(self, name):
+        """Exclusive lock on a blob across processes; files stored before deduplication are not shared"""
+        digest = blob_digest(name)
+        if not digest:
+            yield
+            return
+        os.makedirs(self.path(LOCK_DIR), exist_ok=True)
+        with open(self.path(f'{LOCK_DIR}/{digest[:2]}.lock'), 'ab') as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            yield
+
+    def _save(self, name, content):
+        if not content.seekable():
+            # Content is read twice (hash, then write), so spool one-shot streams first
+            spooled = tempfile.TemporaryFile()
+            for chunk in content.chunks():
+                spooled.write(chunk)
+            content = File(spooled, name=content.name)
+
+        name = blob_name(content_sha256(content))
+        if self.exists(name):
+            return name
+
+        # Written under a temporary name and published in one step, so
+        # exists() never sees a half-written blob
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in content.chunks():
+                    f.write(chunk)
+            if self.file_permissions_mode is not None:
+                os.chmod(temp_path, self.file_permissions_mode)
+            try:
+                os.link(temp_path, path)
+            except FileExistsError:
+                # Another request stored the same content since exists()
+                pass
+        finally:
+            os.remove(temp_path)
+        return name
+
+
+def release_blob(name):
+    """
+    Delete a stored document file and its previews once no SupportingDocument references it.
+
+    Called after a document row is deleted (see signals.py). Files stored
+    before deduplication are owned by exactly one row and deleted as well.
+    """
+    from .models import SupportingDocument
+
+    if not name:
+        return False
+    digest = blob_digest(name)
+    # sha256 is indexed, the file path is not
+    references = SupportingDocument.objects.filter(sha256=digest) if digest else SupportingDocument.objects.filter(file=name)
+    storage = SupportingDocument._meta.get_field('file').storage
+    with storage.lock(name):
+        if references.exists():
+            return False
+        storage.delete(name)
+        delete_previews(storage, name)
+    return True
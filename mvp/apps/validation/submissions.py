@@ -0,0 +1,178 @@
+from apps.audit.utils import AuditLogger
+from .models import ValidationStep, LinearityData, AccuracyData, PrecisionData, LODLOQData
+from .rules.linearity import evaluate_linearity
+from .rules.accuracy import evaluate_accuracy
+from .rules.precision import evaluate_precision
+from .rules.lod_loq import evaluate_lod_loq
+from .workflow import advance_workflow
+
+STEP_LABELS = dict(ValidationStep.STEP_CHOICES)
+
+
+class SubmissionError(Exception):
+    """A step cannot accept the submission; the message is returned to the client"""
+
+
+def ensure_not_submitted(project, step):
+    """Each validation step can only be submitted once per project"""
+    if ValidationStep.objects.filter(project=project, step=step).exists():
+        raise SubmissionError(f'{STEP_LABELS[step]} data already submitted')
+
+
+def result_response(result):
+    return {
+        'status': result['status'],
+        'metrics': result['metrics'],
+        'justification': result['justification']
+    }
+
+
+def create_step(project, step, result):
+    return ValidationStep.objects.create(
+        project=project,
+        step=step,
+        completed=True,
+        passed=result['status'] == 'PASS'
+    )
+
+
+def submit_linearity(user, project, concentrations, responses, details=None):
+    """Evaluate and store linearity data, advance the workflow and log it"""
+    result = evaluate_linearity(concentrations, responses)
+    step = create_step(project, 'linearity', result)
+
+    LinearityData.objects.create(
+        validation_step=step,
+        concentrations=concentrations,
+        responses=responses,
+        slope=result['metrics'].get('slope'),
+        intercept=result['metrics'].get('intercept'),
+        r_squared=result['metrics'].get('r_squared'),
+        passed=step.passed
+    )
+
+    old_status = project.status
+    advance_workflow(project, 'linearity', step.passed)
+
+    AuditLogger.log_validation_action(
+        user,
+        'submit',
+        project,
+        'linearity',
+        {
+            'result': result['status'],
+            'r_squared': result['metrics'].get('r_squared'),
+            'previous_project_status': old_status,
+            'new_project_status': project.status,
+            **(details or {})
+        }
+    )
+    return result_response(result)
+
+
+def submit_accuracy(user, project, level, measured_values, details=None):
+    """Evaluate and store accuracy data, advance the workflow and log it"""
+    result = evaluate_accuracy(level, measured_values)
+    step = create_step(project, 'accuracy', result)
+
+    AccuracyData.objects.create(
+        validation_step=step,
+        level=level,
+        measured_values=measured_values,
+        mean_recovery=result['metrics'].get('mean_recovery'),
+        rsd=result['metrics'].get('rsd'),
+        passed=step.passed
+    )
+
+    old_status = project.status
+    advance_workflow(project, 'accuracy', step.passed)
+
+    AuditLogger.log_validation_action(
+        user,
+        'submit',
+        project,
+        'accuracy',
+        {
+            'result': result['status'],
+            'level': level,
+            'mean_recovery': result['metrics'].get('mean_recovery'),
+            'previous_project_status': old_status,
+            'new_project_status': project.status,
+            **(details or {})
+        }
+    )
+    return result_response(result)
+
+
+def submit_precision(user, project, replicate_values, details=None):
+    """Evaluate and store precision data, advance the workflow and log it"""
+    result = evaluate_precision(replicate_values)
+    step = create_step(project, 'precision', result)
+
+    PrecisionData.objects.create(
+        validation_step=step,
+        replicate_values=replicate_values,
+        mean=result['metrics'].get('mean'),
+        rsd=result['metrics'].get('rsd'),
+        passed=step.passed
+    )
+
+    old_status = project.status
+    advance_workflow(project, 'precision', step.passed)
+
+    AuditLogger.log_validation_action(
+        user,
+        'submit',
+        project,
+        'precision',
+        {
+            'result': result['status'],
+            'rsd': result['metrics'].get('rsd'),
+            'mean': result['metrics'].get('mean'),
+            'previous_project_status': old_status,
+            'new_project_status': project.status,
+            **(details or {})
+        }
+    )
+    return result_response(result)
+
+
+def submit_lod_loq(user, project, blank_responses, details=None):
+    """Evaluate LOD/LOQ against the linearity slope, store it, advance the workflow and log it"""
+    linearity_step = ValidationStep.objects.filter(project=project, step='linearity').first()
+    if not linearity_step or not linearity_step.passed:
+        raise SubmissionError('Linearity must be completed and passed first')
+
+    slope = LinearityData.objects.get(validation_step=linearity_step).slope
+
+    result = evaluate_lod_loq(blank_responses, slope)
+    step = create_step(project, 'lod_loq', result)
+
+    LODLOQData.objects.create(
+        validation_step=step,
+        blank_responses=blank_responses,
+        slope=slope,
+        lod=result['metrics'].get('lod'),
+        loq=result['metrics'].get('loq'),
+        passed=step.passed
+    )
+
+    old_status = project.status
+    advance_workflow(project, 'lod_loq', step.passed)
+
+    AuditLogger.log_validation_action(
+        user,
+        'submit',
+        project,
+        'lod_loq',
+        {
+            'result': result['status'],
+            'lod': result['metrics'].get('lod'),
+            'loq': result['metrics'].get('loq'),
+            'slope': slope,
+            'previous_project_status': old_status,
+            'new_project_status': project.status,
+            **(details or {})
+        }
+    )
+    return result_response(result)
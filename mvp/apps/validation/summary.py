@@ -0,0 +1,89 @@
+import numpy as np
+from django.db.models import Prefetch, prefetch_related_objects
+from .models import ValidationStep, ParameterReview
+
+
+# Reverse one-to-one accessor and the fields exposed for each validation step
+SUMMARY_DATA_FIELDS = {
+    'linearity': ('linearitydata', ['concentrations', 'responses', 'slope', 'intercept', 'r_squared']),
+    'accuracy': ('accuracydata', ['level', 'measured_values', 'mean_recovery', 'rsd']),
+    'precision': ('precisiondata', ['replicate_values', 'mean', 'rsd']),
+    'lod_loq': ('lodloqdata', ['blank_responses', 'slope', 'lod', 'loq']),
+}
+
+
+def steps_with_data_prefetch():
+    """Prefetch of a project's validation steps with their data rows joined in"""
+    accessors = [accessor for accessor, _ in SUMMARY_DATA_FIELDS.values()]
+    return Prefetch('validationstep_set', queryset=ValidationStep.objects.select_related(*accessors))
+
+
+def reviews_prefetch():
+    return Prefetch('parameter_reviews', queryset=ParameterReview.objects.select_related('reviewed_by'))
+
+
+def get_steps_with_data(project):
+    """
+    All validation steps of a project with their data rows joined in.
+
+    Uses the project's prefetched steps when a caller already loaded them
+    with steps_with_data_prefetch(), otherwise runs that prefetch now.
+    """
+    prefetch_related_objects([project], steps_with_data_prefetch())
+    return project.validationstep_set.all()
+
+
+def get_step_data(step):
+    """Return the joined data row for a step, or None if it was never saved"""
+    accessor, _ = SUMMARY_DATA_FIELDS[step.step]
+    return getattr(step, accessor, None)
+
+
+def summary_value(value):
+    """Packed array fields come back as NumPy arrays; the summary is plain JSON"""
+    return value.tolist() if isinstance(value, np.ndarray) else value
+
+
+def build_validation_summary(project):
+    """
+    Build the validation summary for a project.
+
+    Uses one query for the steps (with the four data tables joined) and one
+    for the parameter reviews (with reviewers joined), independent of how
+    many reviews the project has.
+    """
+    summary = {
+        'project_id': project.id,
+        'project_status': project.status,
+        'validation_steps': {}
+    }
+
+    steps = {step.step: step for step in get_steps_with_data(project)}
+    for step_name, (_, fields) in SUMMARY_DATA_FIELDS.items():
+        step = steps.get(step_name)
+        if not step:
+            continue
+
+        data = get_step_data(step)
+        summary['validation_steps'][step_name] = {
+            'completed': step.completed,
+            'passed': step.passed,
+            'data': {field: summary_value(getattr(data, field)) for field in fields} if data else None
+        }
+
+    prefetch_related_objects([project], reviews_prefetch())
+    parameter_reviews = project.parameter_reviews.all()
+    reviews = [
+        {
+            'parameter_name': review.parameter_name,
+            'decision': review.decision,
+            'comments': review.comments,
+            'reviewed_by': review.reviewed_by.username if review.reviewed_by else None,
+            'reviewed_at': review.reviewed_at
+        }
+        for review in parameter_reviews
+    ]
+    if reviews:
+        summary['parameter_reviews'] = reviews
+
+    return summary
@@ -1,9 +1,45 @@
-from django.test import TestCase, Client
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
+from asgiref.sync import async_to_sync
+from django.core.files import locks
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.utils import timezone
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from apps.projects.models import Project
-from apps.validation.models import ValidationStep, LinearityData
-from apps.validation.rules.linearity import evaluate_linearity
+from apps.validation.models import (
+    ValidationStep, LinearityData, AccuracyData, PrecisionData, LODLOQData, ParameterReview, SupportingDocument,
+    UploadSession
+)
+from apps.validation.rules.linearity import evaluate_linearity, evaluate_linearity_batch
+from apps.validation.rules.accuracy import evaluate_accuracy, evaluate_accuracy_batch
+from apps.validation.rules.precision import evaluate_precision, evaluate_precision_batch
+from apps.validation.rules.lod_loq import evaluate_lod_loq, evaluate_lod_loq_batch
+from apps.stats.calculations import pack_ragged
+from apps.validation.summary import build_validation_summary
+from apps.validation.workflow import get_workflow_state, request_workflow_state
+from apps.validation.uploads import (
+    UploadError, cleanup_stale_uploads, finalize_upload, part_path, start_upload, write_chunk
+)
+from apps.validation.storage import ContentAddressedStorage, blob_name, release_blob
+from apps.validation.downloads import parse_range, RangeNotSatisfiable
+from apps.validation import previews
+from apps.validation.previews import preview_name, process_pending_previews
+from apps.audit.models import AuditLog
+from apps.validation.ingest import IngestError, read_columns
+from apps.validation.fields import FloatArrayField, pack_float_array, unpack_float_array
+import numpy as np
 import json
+from PIL import Image
 
 User = get_user_model()
 
@@ -113,3 +149,882 @@ class LinearitySubmissionTest(TestCase):
         print("=================================\n")
         
         self.assertEqual(response2.status_code, 400)
+
+
+class ValidationSummaryQueryTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(
+            username='testreviewer',
+            password='testpass123',
+            role='reviewer'
+        )
+        self.client.force_login(self.user)
+
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method',
+            product_name='Test Product',
+            technique='hplc',
+            status='review',
+            created_by=self.user
+        )
+
+        step = ValidationStep.objects.create(project=self.project, step='linearity', completed=True, passed=True)
+        LinearityData.objects.create(
+            validation_step=step, concentrations=[1, 2, 3, 4, 5], responses=[10, 20, 30, 40, 50],
+            slope=10.0, intercept=0.0, r_squared=1.0, passed=True
+        )
+        step = ValidationStep.objects.create(project=self.project, step='accuracy', completed=True, passed=True)
+        AccuracyData.objects.create(
+            validation_step=step, level='100', measured_values=[99.0, 100.0, 101.0],
+            mean_recovery=100.0, rsd=1.0, passed=True
+        )
+        step = ValidationStep.objects.create(project=self.project, step='precision', completed=True, passed=True)
+        PrecisionData.objects.create(
+            validation_step=step, replicate_values=[10.0, 10.1, 9.9], mean=10.0, rsd=1.0, passed=True
+        )
+        # Step without a data row must still be reported
+        ValidationStep.objects.create(project=self.project, step='lod_loq', completed=False)
+
+    def add_reviews(self, count):
+        start = ParameterReview.objects.count()
+        for i in range(start, start + count):
+            reviewer = User.objects.create_user(username=f'reviewer{i}', password='x', role='reviewer')
+            ParameterReview.objects.create(
+                project=self.project, parameter_name='linearity', decision='approve',
+                comments='ok', reviewed_by=reviewer
+            )
+
+    def summary_query_count(self):
+        url = f'/api/validation/projects/{self.project.id}/summary/'
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_summary_content(self):
+        self.add_reviews(2)
+        summary = build_validation_summary(self.project)
+
+        steps = summary['validation_steps']
+        self.assertEqual(list(steps), ['linearity', 'accuracy', 'precision', 'lod_loq'])
+        self.assertEqual(steps['linearity']['data']['slope'], 10.0)
+        self.assertEqual(steps['accuracy']['data']['measured_values'], [99.0, 100.0, 101.0])
+        self.assertIsNone(steps['lod_loq']['data'])
+        self.assertEqual(len(summary['parameter_reviews']), 2)
+
+    def test_summary_without_reviews(self):
+        summary = build_validation_summary(self.project)
+        self.assertNotIn('parameter_reviews', summary)
+
+    def test_builder_uses_two_queries(self):
+        self.add_reviews(5)
+        with self.assertNumQueries(2):
+            build_validation_summary(self.project)
+
+    async def test_summary_under_asgi(self):
+        # Any query left to build_validation_summary would fail in async context
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(f'/api/validation/projects/{self.project.id}/summary/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['validation_steps']['linearity']['data']['slope'], 10.0)
+
+        response = await self.async_client.get(f'/api/validation/projects/{self.project.id + 1}/summary/')
+        self.assertEqual(response.status_code, 404)
+
+    def test_query_count_independent_of_reviews(self):
+        self.add_reviews(1)
+        few_queries, _ = self.summary_query_count()
+
+        self.add_reviews(10)
+        many_queries, data = self.summary_query_count()
+
+        self.assertEqual(len(data['parameter_reviews']), 11)
+        self.assertEqual(few_queries, many_queries)
+
+
+class BatchRuleEvaluationTest(TestCase):
+    """The batch evaluators must agree with the per-dataset rules"""
+
+    def assertResultsMatch(self, batch_results, scalar_results):
+        self.assertEqual(len(batch_results), len(scalar_results))
+        for batch, scalar in zip(batch_results, scalar_results):
+            self.assertEqual(batch['status'], scalar['status'])
+            self.assertEqual(batch['justification'], scalar['justification'])
+            self.assertEqual(batch['metrics'].keys(), scalar['metrics'].keys())
+            for key, value in scalar['metrics'].items():
+                if isinstance(value, list):
+                    for a, b in zip(batch['metrics'][key], value):
+                        self.assertAlmostEqual(a, b, places=6)
+                else:
+                    self.assertAlmostEqual(batch['metrics'][key], value, places=6)
+
+    def test_linearity_batch(self):
+        datasets = [
+            ([50, 75, 100, 125, 150], [5000, 7500, 10000, 12500, 15000]),
+            ([1, 2, 3, 4, 5], [12.1, 19.8, 31.5, 39.0, 52.2]),
+            ([1, 2, 3], [500, 20, 900]),
+            ([1], [10]),
+            ([2, 2, 2], [10, 11, 12]),
+        ]
+        x, offsets = pack_ragged([c for c, _ in datasets])
+        y, _ = pack_ragged([r for _, r in datasets])
+        self.assertResultsMatch(
+            evaluate_linearity_batch(x, y, offsets),
+            [evaluate_linearity(c, r) for c, r in datasets]
+        )
+
+    def test_accuracy_batch(self):
+        levels = [80, 100, 120, 100, 0]
+        datasets = [[79.5, 80.2, 80.1], [99.1, 100.4, 100.2, 99.8, 100.0, 100.3], [150, 151], [], [1, 2]]
+        measured, offsets = pack_ragged(datasets)
+        self.assertResultsMatch(
+            evaluate_accuracy_batch(levels, measured, offsets),
+            [evaluate_accuracy(level, values) for level, values in zip(levels, datasets)]
+        )
+
+    def test_precision_batch(self):
+        datasets = [[10.0, 10.1, 9.9], [10.0] * 6, [5.0, 9.0], [7.0], [], [0.0, 0.0]]
+        values, offsets = pack_ragged(datasets)
+        self.assertResultsMatch(
+            evaluate_precision_batch(values, offsets),
+            [evaluate_precision(values) for values in datasets]
+        )
+
+    def test_lod_loq_batch(self):
+        datasets = [[0.1, 0.2, 0.15, 0.12], [0.5, 0.5], [0.3], [0.1, 0.4]]
+        slopes = [10.0, 10.0, 5.0, 0.0]
+        blanks, offsets = pack_ragged(datasets)
+        self.assertResultsMatch(
+            evaluate_lod_loq_batch(blanks, offsets, slopes),
+            [evaluate_lod_loq(values, slope) for values, slope in zip(datasets, slopes)]
+        )
+
+
+class FloatArrayFieldTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client.force_login(self.user)
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc',
+            status='precision', created_by=self.user
+        )
+        step = ValidationStep.objects.create(project=self.project, step='precision', completed=True, passed=True)
+        PrecisionData.objects.create(
+            validation_step=step, replicate_values=[10.0, 10.1, 9.9], mean=10.0, rsd=1.0, passed=True
+        )
+
+    def test_loaded_as_zero_copy_array(self):
+        values = PrecisionData.objects.get().replicate_values
+        self.assertIsInstance(values, np.ndarray)
+        self.assertEqual(values.dtype, np.dtype('<f8'))
+        self.assertEqual(values.tolist(), [10.0, 10.1, 9.9])
+        self.assertFalse(values.flags.owndata)
+        self.assertFalse(values.flags.writeable)
+
+    def test_packed_layout(self):
+        data = pack_float_array([1.5, -2.0])
+        self.assertEqual(len(data), 8 + 16)
+        self.assertEqual(data[8:], np.array([1.5, -2.0], dtype='<f8').tobytes())
+        with self.assertRaises(ValueError):
+            unpack_float_array(b'[1.5, -2.0]')
+
+    def test_compressed_round_trip(self):
+        field = FloatArrayField(compress=True)
+        values = np.linspace(0, 1, 10000)
+        packed = field.get_prep_value(values)
+        self.assertLess(len(packed), values.nbytes)
+        np.testing.assert_array_equal(field.from_db_value(packed, None, connection), values)
+        self.assertEqual(field.deconstruct()[3], {'compress': True})
+
+    def test_api_returns_json_lists(self):
+        response = self.client.get(f'/api/validation/projects/{self.project.id}/precision/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['replicate_values'], [10.0, 10.1, 9.9])
+
+
+class DocumentIngestTest(TestCase):
+    EXPORT = (
+        'Instrument: HPLC-01\r\n'
+        'Sequence: LIN-2026\r\n'
+        '\r\n'
+        'Sample;Conc (mg/mL);Peak Area;Retention Time\r\n'
+        'STD1;50;5000;4.1\r\n'
+        'STD2;75;7500;4.1\r\n'
+        'STD3;100;10000;4.2\r\n'
+        'STD4;125;12500;4.1\r\n'
+        'STD5;150;15000;4.1\r\n'
+        'Total;;50000;\r\n'
+    )
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client.force_login(self.user)
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc',
+            status='linearity', created_by=self.user
+        )
+
+    def upload(self, content, name='export.csv', file_type='instrument_data'):
+        return SupportingDocument.objects.create(
+            project=self.project, file=SimpleUploadedFile(name, content.encode()), file_type=file_type,
+            file_name=name, file_size=len(content), uploaded_by=self.user
+        )
+
+    def ingest(self, document, **data):
+        url = f'/api/validation/projects/{self.project.id}/documents/{document.id}/ingest/'
+        return self.client.post(url, data, content_type='application/json')
+
+    def test_ingest_linearity(self):
+        document = self.upload(self.EXPORT)
+        response = self.ingest(document, step='linearity', columns={'concentrations': 'Conc (mg/mL)'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'PASS')
+        self.assertEqual(response.json()['rows'], 5)
+        data = LinearityData.objects.get()
+        self.assertEqual(data.responses.tolist(), [5000, 7500, 10000, 12500, 15000])
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, 'accuracy')
+
+        # The step is now submitted, so ingesting again is rejected
+        self.assertEqual(self.ingest(document, step='linearity').status_code, 400)
+
+    def test_preview_does_not_submit(self):
+        document = self.upload('Replicate\tArea\n1\t10.0\n2\t10.1\n3\t9.9\n', name='precision.txt')
+        response = self.ingest(document, step='precision', preview=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['columns']['replicate_values']['count'], 3)
+        self.assertFalse(ValidationStep.objects.exists())
+
+    def test_rejects_other_documents(self):
+        document = self.upload(self.EXPORT, file_type='certificate')
+        self.assertEqual(self.ingest(document, step='linearity').status_code, 400)
+
+    def test_rejects_boolean_column_index(self):
+        document = self.upload(self.EXPORT)
+        response = self.ingest(document, step='linearity', columns={'concentrations': True})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('columns', response.json()['error'])
+
+    def test_reports_bad_values(self):
+        document = self.upload('Area\n10.0\nn/a\n')
+        response = self.ingest(document, step='precision')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Line 3: 'n/a'", response.json()['error'])
+
+    def test_chunked_reading(self):
+        lines = ['conc,response'] + [f'{i},{2 * i + 1}' for i in range(25000)]
+        values = read_columns(io.StringIO('\n'.join(lines)), 'linearity', chunk_rows=1000)
+        self.assertEqual(len(values['concentrations']), 25000)
+        self.assertEqual(values['responses'][-1], 2 * 24999 + 1)
+
+    def test_headerless_columns_by_index(self):
+        values = read_columns(io.StringIO('0.11 0.12\n0.13 0.10\n'), 'lod_loq', {'blank_responses': 1})
+        self.assertEqual(values['blank_responses'].tolist(), [0.12, 0.10])
+
+    def test_missing_header(self):
+        with self.assertRaises(IngestError):
+            read_columns(io.StringIO('a,b\n1,2\n'), 'linearity')
+
+
+class ChunkedUploadTest(TestCase):
+    def setUp(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=os.path.join(root, 'media'), UPLOAD_TEMP_ROOT=os.path.join(root, 'tmp')
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client.force_login(self.user)
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc', created_by=self.user
+        )
+        self.content = os.urandom(300 * 1024)
+        self.base = f'/api/validation/projects/{self.project.id}/uploads/'
+
+    def start(self, size=None):
+        response = self.client.post(self.base, {
+            'file_name': 'chromatograms.pdf', 'file_size': size or len(self.content), 'file_type': 'chromatogram'
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        return f'{self.base}{response.json()["upload_id"]}/'
+
+    def put(self, url, offset, data):
+        return self.client.put(url, data, content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(offset))
+
+    def complete(self, url, sha256=None):
+        sha256 = sha256 or hashlib.sha256(self.content).hexdigest()
+        return self.client.post(f'{url}complete/', {'sha256': sha256}, content_type='application/json')
+
+    def test_upload_in_chunks(self):
+        url = self.start()
+        chunk = 100 * 1024
+        for offset in range(0, len(self.content), chunk):
+            response = self.put(url, offset, self.content[offset:offset + chunk])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['offset'], min(offset + chunk, len(self.content)))
+
+        response = self.complete(url, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(response.status_code, 201)
+        document = SupportingDocument.objects.get(id=response.json()['id'])
+        self.assertEqual(document.file_size, len(self.content))
+        with document.file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertFalse(os.path.exists(part_path(UploadSession.objects.get())))
+
+    def test_resume_after_offset_mismatch(self):
+        url = self.start()
+        self.put(url, 0, self.content[:1000])
+
+        # A retried chunk at a stale offset is refused with the offset to resume from
+        response = self.put(url, 0, self.content[:1000])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 1000)
+        self.assertEqual(self.client.get(url).json()['offset'], 1000)
+
+        self.put(url, 1000, self.content[1000:])
+        self.assertEqual(self.complete(url).status_code, 201)
+
+    def test_dropped_connection_keeps_received_bytes(self):
+        session = start_upload(self.project, self.user, 'data.csv', 100)
+        with self.assertRaises(UploadError):
+            write_chunk(session, io.BytesIO(b'x' * 40), 0, 60)
+        self.assertEqual(session.received, 40)
+        self.assertEqual(os.path.getsize(part_path(session)), 40)
+
+        write_chunk(session, io.BytesIO(b'y' * 60), 40, 60)
+        self.assertEqual(session.received, 100)
+
+    def test_stale_uploads_cleaned_up(self):
+        session = start_upload(self.project, self.user, 'data.csv', 100)
+        UploadSession.objects.update(updated_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(cleanup_stale_uploads(), 1)
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'aborted')
+        self.assertFalse(os.path.exists(part_path(session)))
+
+    def test_concurrent_chunk_refused_while_one_is_written(self):
+        url = self.start()
+        session = UploadSession.objects.get()
+        with open(part_path(session), 'r+b') as part:
+            # Another request is writing a chunk
+            locks.lock(part, locks.LOCK_EX)
+            response = self.put(url, 0, self.content[:1000])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 0)
+        self.assertEqual(os.path.getsize(part_path(session)), 0)
+
+        self.assertEqual(self.put(url, 0, self.content).status_code, 200)
+        self.assertEqual(self.complete(url).status_code, 201)
+
+    def test_checksum_required(self):
+        url = self.start()
+        self.put(url, 0, self.content)
+        response = self.client.post(f'{url}complete/', {}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('sha256', response.json()['error'])
+        self.assertFalse(SupportingDocument.objects.exists())
+        self.assertEqual(UploadSession.objects.get().status, 'active')
+
+    def test_checksum_mismatch_rejected(self):
+        url = self.start()
+        self.put(url, 0, self.content)
+        response = self.complete(url, hashlib.sha256(b'other').hexdigest())
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(SupportingDocument.objects.exists())
+
+    def test_concurrent_completes_create_one_document(self):
+        session = start_upload(self.project, self.user, 'data.csv', len(self.content))
+        write_chunk(session, io.BytesIO(self.content), 0, len(self.content))
+        # Both requests loaded the session while it was still active
+        racing = UploadSession.objects.get(id=session.id)
+        finalize_upload(session, hashlib.sha256(self.content).hexdigest())
+
+        with self.assertRaisesMessage(UploadError, 'Upload is complete'):
+            finalize_upload(racing, hashlib.sha256(self.content).hexdigest())
+        self.assertEqual(SupportingDocument.objects.count(), 1)
+
+    def test_blob_released_during_finalize_is_stored_again(self):
+        url = self.start()
+        self.put(url, 0, self.content)
+        first = SupportingDocument.objects.get(id=self.complete(url).json()['id'])
+        session = start_upload(self.project, self.user, 'copy.pdf', len(self.content))
+        write_chunk(session, io.BytesIO(self.content), 0, len(self.content))
+        reuse = ContentAddressedStorage._save
+
+        def reuse_then_release(storage_self, name, content):
+            name = reuse(storage_self, name, content)
+            if first.id is not None:
+                # The other reference goes away between storing the file and writing the row
+                first.delete()
+                release_blob(name)
+            return name
+
+        with mock.patch.object(ContentAddressedStorage, '_save', reuse_then_release):
+            document, _ = finalize_upload(session, hashlib.sha256(self.content).hexdigest())
+
+        with document.file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_checksum_mismatch_keeps_upload_open(self):
+        session = start_upload(self.project, self.user, 'data.csv', len(self.content))
+        write_chunk(session, io.BytesIO(self.content), 0, len(self.content))
+        with self.assertRaises(UploadError):
+            finalize_upload(session, hashlib.sha256(b'other').hexdigest())
+        session.refresh_from_db()
+        self.assertEqual(session.status, 'active')
+
+    def test_incomplete_upload_cannot_finish(self):
+        url = self.start()
+        self.put(url, 0, self.content[:10])
+        self.assertEqual(self.complete(url).status_code, 400)
+
+    def test_chunk_past_declared_size_rejected(self):
+        url = self.start(size=10)
+        self.assertEqual(self.put(url, 0, b'x' * 11).status_code, 400)
+
+    @override_settings(DIRECT_UPLOAD_MAX_SIZE=1024)
+    def test_large_direct_upload_redirected_to_chunked(self):
+        response = self.client.post(f'/api/validation/projects/{self.project.id}/documents/', {
+            'file': SimpleUploadedFile('big.pdf', self.content), 'file_type': 'other'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('chunked upload', response.json()['error'])
+
+    def test_abort_and_other_users(self):
+        url = self.start()
+        other = User.objects.create_user(username='otheranalyst', password='testpass123', role='analyst')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.delete(url).json()['status'], 'aborted')
+        self.assertEqual(self.put(url, 0, b'data').status_code, 400)
+
+
+class ContentAddressedStorageTest(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client.force_login(self.user)
+        self.projects = [
+            Project.objects.create(method_name=f'Method {i}', product_name='Product', technique='hplc',
+                                   created_by=self.user)
+            for i in range(2)
+        ]
+        self.content = b'%PDF-1.4 certificate of analysis'
+
+    def upload(self, project, content=None, name='certificate.pdf'):
+        response = self.client.post(f'/api/validation/projects/{project.id}/documents/', {
+            'file': SimpleUploadedFile(name, content or self.content), 'file_type': 'certificate'
+        })
+        self.assertEqual(response.status_code, 201)
+        return SupportingDocument.objects.get(id=response.json()['id'])
+
+    def blob_path(self, content=None):
+        digest = hashlib.sha256(content or self.content).hexdigest()
+        return os.path.join(self.media_root, blob_name(digest))
+
+    def test_identical_uploads_share_a_blob(self):
+        first = self.upload(self.projects[0])
+        second = self.upload(self.projects[1], name='coa-copy.pdf')
+
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.sha256, hashlib.sha256(self.content).hexdigest())
+        self.assertTrue(os.path.exists(self.blob_path()))
+        blob_files = [name for _, _, names in os.walk(self.media_root) for name in names if not name.endswith('.lock')]
+        self.assertEqual(len(blob_files), 1)
+
+    def test_blob_removed_with_last_reference(self):
+        first = self.upload(self.projects[0])
+        second = self.upload(self.projects[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(f'/api/validation/projects/{self.projects[0].id}/documents/{first.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(os.path.exists(self.blob_path()))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/validation/projects/{self.projects[1].id}/documents/{second.id}/')
+        self.assertFalse(os.path.exists(self.blob_path()))
+
+    def test_blob_released_while_reused_is_stored_again(self):
+        first = self.upload(self.projects[0])
+        storage = SupportingDocument._meta.get_field('file').storage
+        reuse = ContentAddressedStorage._save
+
+        def reuse_then_release(storage_self, name, content):
+            name = reuse(storage_self, name, content)
+            if first.id is not None:
+                # The last other document is deleted before the new row is written
+                first.delete()
+                release_blob(name)
+            return name
+
+        with mock.patch.object(ContentAddressedStorage, '_save', reuse_then_release):
+            second = self.upload(self.projects[1])
+
+        self.assertTrue(storage.exists(second.file.name))
+        with second.file.open('rb') as f:
+            self.assertEqual(f.read(), self.content)
+
+    def test_blob_published_in_one_step(self):
+        storage = SupportingDocument._meta.get_field('file').storage
+        link = os.link
+
+        def publish_first(source, target):
+            # Another request finishes storing the same content in the meantime
+            with open(source, 'rb') as f, open(target, 'xb') as other:
+                other.write(f.read())
+            link(source, target)
+
+        with mock.patch('apps.validation.storage.os.link', side_effect=publish_first) as linked:
+            name = storage.save('certificate.pdf', ContentFile(self.content))
+        self.assertTrue(linked.call_args.args[0].startswith(os.path.dirname(self.blob_path())))
+        self.assertEqual(name, blob_name(hashlib.sha256(self.content).hexdigest()))
+        with open(self.blob_path(), 'rb') as f:
+            self.assertEqual(f.read(), self.content)
+        self.assertEqual(os.listdir(os.path.dirname(self.blob_path())), [os.path.basename(name)])
+
+    def test_release_keeps_blob_referenced_under_lock(self):
+        document = self.upload(self.projects[0])
+        self.assertFalse(release_blob(document.file.name))
+        self.assertTrue(os.path.exists(self.blob_path()))
+
+    def test_cascade_delete_releases_blob(self):
+        self.upload(self.projects[0], content=b'only here')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.projects[0].delete()
+        self.assertFalse(os.path.exists(self.blob_path(b'only here')))
+
+    def test_dedupe_command_moves_legacy_files(self):
+        legacy_path = os.path.join(self.media_root, 'supporting_documents', 'legacy.pdf')
+        os.makedirs(os.path.dirname(legacy_path))
+        with open(legacy_path, 'wb') as f:
+            f.write(self.content)
+        legacy = SupportingDocument.objects.create(
+            project=self.projects[0], file='supporting_documents/legacy.pdf', file_type='sop',
+            file_name='legacy.pdf', file_size=len(self.content), uploaded_by=self.user
+        )
+        current = self.upload(self.projects[1])
+
+        call_command('dedupe_documents', stdout=io.StringIO())
+
+        legacy.refresh_from_db()
+        self.assertEqual(legacy.file.name, current.file.name)
+        self.assertEqual(legacy.sha256, current.sha256)
+        self.assertFalse(os.path.exists(legacy_path))
+
+
+class DocumentDownloadTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client.force_login(self.user)
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc', created_by=self.user
+        )
+        self.content = bytes(range(256)) * 40
+        self.document = SupportingDocument.objects.create(
+            project=self.project, file=ContentFile(self.content, name='chromatogram.png'),
+            file_type='chromatogram', file_name='chromatogram.png', file_size=len(self.content),
+            uploaded_by=self.user
+        )
+        self.url = f'/api/validation/projects/{self.project.id}/documents/{self.document.id}/download/'
+
+    def download(self, data=None, **headers):
+        # Audit entries are written when the request's transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.get(self.url, data, **headers)
+
+    def downloads_logged(self):
+        return AuditLog.objects.filter(details__action='downloaded_document').count()
+
+    def test_full_download_headers(self):
+        response = self.download()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['ETag'], f'"{hashlib.sha256(self.content).hexdigest()}"')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment; filename="chromatogram.png"', response['Content-Disposition'])
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(self.downloads_logged(), 1)
+
+    def test_if_none_match_returns_304(self):
+        etag = self.download()['ETag']
+        response = self.download(None, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(self.downloads_logged(), 1)
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.download()['Last-Modified']
+        response = self.download(None, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Last-Modified'], last_modified)
+        self.assertEqual(self.downloads_logged(), 1)
+
+    def test_range_request(self):
+        response = self.download(None, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+        suffix = self.download(None, HTTP_RANGE='bytes=-10')
+        self.assertEqual(b''.join(suffix.streaming_content), self.content[-10:])
+        self.assertEqual(self.downloads_logged(), 2)
+
+    def test_unsatisfiable_range(self):
+        response = self.download(None, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(self.content)}')
+
+    def test_async_streaming_under_asgi(self):
+        async def fetch(**headers):
+            response = await self.async_client.get(self.url, headers=headers)
+            self.assertTrue(response.is_async)
+            return response, b''.join([chunk async for chunk in response.streaming_content])
+
+        self.async_client.force_login(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            response, content = async_to_sync(fetch)()
+            partial, partial_content = async_to_sync(fetch)(Range='bytes=100-199')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response['Content-Length']), len(self.content))
+        self.assertEqual(content, self.content)
+        self.assertEqual(partial.status_code, 206)
+        self.assertEqual(partial_content, self.content[100:200])
+        self.assertEqual(self.downloads_logged(), 2)
+
+    def test_stale_if_range_sends_whole_file(self):
+        response = self.download(None, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"outdated"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-', 10), (0, 9))
+        self.assertEqual(parse_range('bytes=5-100', 10), (5, 9))
+        self.assertEqual(parse_range('bytes=-20', 10), (0, 9))
+        self.assertIsNone(parse_range('bytes=0-1,4-5', 10))
+        self.assertIsNone(parse_range('items=0-1', 10))
+        self.assertIsNone(parse_range('bytes=5-2', 10))
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=10-', 10)
+
+    @override_settings(DOCUMENT_SENDFILE='x-accel-redirect', DOCUMENT_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_accel_redirect_handoff(self):
+        response = self.download({'inline': '1'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.document.file.name}')
+        self.assertEqual(response.content, b'')
+        self.assertTrue(response['Content-Disposition'].startswith('inline'))
+        self.assertEqual(self.downloads_logged(), 1)
+
+    @override_settings(DOCUMENT_SENDFILE='x-sendfile')
+    def test_sendfile_handoff(self):
+        response = self.download()
+        self.assertEqual(response['X-Sendfile'], self.document.file.path)
+
+
+class DocumentPreviewTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.client.force_login(self.user)
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc', created_by=self.user
+        )
+
+    def create_document(self, content, file_name):
+        return SupportingDocument.objects.create(
+            project=self.project, file=ContentFile(content, name=file_name), file_type='chromatogram',
+            file_name=file_name, file_size=len(content), uploaded_by=self.user
+        )
+
+    def image_bytes(self, size=(3000, 1500), fmt='PNG'):
+        buffer = io.BytesIO()
+        # PNGs with an alpha channel must be flattened for the JPEG renditions
+        Image.new('RGBA' if fmt == 'PNG' else 'RGB', size, (0, 120, 200)).save(buffer, fmt)
+        return buffer.getvalue()
+
+    def preview_url(self, document, size='thumb'):
+        return f'/api/validation/projects/{self.project.id}/documents/{document.id}/preview/?size={size}'
+
+    def test_initial_status(self):
+        self.assertEqual(self.create_document(self.image_bytes(), 'trace.png').preview_status, 'pending')
+        self.assertEqual(self.create_document(b'a,b\n1,2\n', 'data.csv').preview_status, 'unsupported')
+
+    def test_previews_rendered_next_to_blob(self):
+        document = self.create_document(self.image_bytes(), 'trace.png')
+        self.assertEqual(self.client.get(self.preview_url(document)).status_code, 404)
+
+        self.assertEqual(process_pending_previews(), 1)
+        document.refresh_from_db()
+        self.assertEqual(document.preview_status, 'ready')
+
+        for size, edge in previews.PREVIEW_SIZES.items():
+            path = document.file.storage.path(preview_name(document.file.name, size))
+            self.assertEqual(os.path.dirname(path), os.path.dirname(document.file.path))
+            with Image.open(path) as image:
+                self.assertEqual(image.format, 'JPEG')
+                self.assertEqual(max(image.size), edge)
+
+        response = self.client.get(self.preview_url(document))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'\xff\xd8'))
+
+        payload = self.client.get(f'/api/validation/projects/{self.project.id}/documents/').json()[0]
+        self.assertEqual(payload['thumbnail_url'], self.preview_url(document))
+
+    def test_duplicate_upload_reuses_previews(self):
+        content = self.image_bytes()
+        self.create_document(content, 'trace.png')
+        process_pending_previews()
+        duplicate = self.create_document(content, 'copy.png')
+        with mock.patch.object(previews, 'open_source_image') as open_source_image:
+            process_pending_previews()
+        open_source_image.assert_not_called()
+        duplicate.refresh_from_db()
+        self.assertEqual(duplicate.preview_status, 'ready')
+
+    def test_document_claimed_by_another_worker_is_skipped(self):
+        document = self.create_document(self.image_bytes(), 'trace.png')
+        claimed_elsewhere = [document.id]
+        claim = SupportingDocument.objects.filter
+
+        def filter_after_other_worker(*args, **kwargs):
+            if kwargs.get('id') in claimed_elsewhere:
+                # The other worker's claim lands between reading the queue and ours
+                claimed_elsewhere.clear()
+                claim(id=document.id).update(preview_status='rendering')
+            return claim(*args, **kwargs)
+
+        with mock.patch.object(SupportingDocument.objects, 'filter', side_effect=filter_after_other_worker), \
+                mock.patch.object(previews, 'render_previews') as render_previews:
+            self.assertEqual(process_pending_previews(), 0)
+        render_previews.assert_not_called()
+        document.refresh_from_db()
+        self.assertEqual(document.preview_status, 'rendering')
+
+    def test_corrupt_image_and_missing_pdf_renderer(self):
+        corrupt = self.create_document(b'not really a png', 'broken.png')
+        pdf = self.create_document(b'%PDF-1.4 minimal', 'certificate.pdf')
+        with mock.patch.object(previews, 'pdf_renderer', return_value=None):
+            process_pending_previews()
+        corrupt.refresh_from_db()
+        pdf.refresh_from_db()
+        self.assertEqual(corrupt.preview_status, 'failed')
+        self.assertEqual(pdf.preview_status, 'unsupported')
+
+    def test_invalid_size(self):
+        document = self.create_document(self.image_bytes(), 'trace.png')
+        self.assertEqual(self.client.get(self.preview_url(document, 'huge')).status_code, 400)
+
+    def test_previews_deleted_with_blob(self):
+        document = self.create_document(self.image_bytes((50, 50), 'JPEG'), 'trace.jpg')
+        process_pending_previews()
+        storage = document.file.storage
+        thumb = preview_name(document.file.name, 'thumb')
+        self.assertTrue(storage.exists(thumb))
+        with self.captureOnCommitCallbacks(execute=True):
+            document.delete()
+        self.assertFalse(storage.exists(thumb))
+
+
+class WorkflowStateTest(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = User.objects.create_user(username='testanalyst', password='testpass123', role='analyst')
+        self.reviewer = User.objects.create_user(username='testreviewer', password='testpass123', role='reviewer')
+        self.client.force_login(self.user)
+        self.project = Project.objects.create(
+            method_name='Test HPLC Method', product_name='Test Product', technique='hplc',
+            status='accuracy', created_by=self.user
+        )
+        ValidationStep.objects.create(project=self.project, step='linearity', completed=True, passed=True)
+
+    def step_queries(self, queries):
+        return [q for q in queries if 'validation_validationstep' in q['sql']]
+
+    def test_both_endpoints_share_one_engine(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/projects/{self.project.id}/workflow/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.step_queries(queries)), 1)
+
+        state = response.json()
+        self.assertEqual(state['current_step'], 'accuracy')
+        self.assertEqual(state['completed_steps'], ['linearity'])
+        self.assertEqual(state['allowed_next_actions'], ['submit_validation_data'])
+        self.assertEqual(state['locked_steps'], ['draft', 'linearity', 'review', 'approved'])
+        self.assertFalse(state['blocked'])
+
+        other = self.client.get(f'/api/validation/projects/{self.project.id}/workflow/')
+        self.assertEqual(other.json(), state)
+
+    def test_failed_step_blocks_submission(self):
+        ValidationStep.objects.create(project=self.project, step='accuracy', completed=True, passed=False)
+        state = get_workflow_state(self.project, 'analyst')
+        self.assertTrue(state['blocked'])
+        self.assertEqual(state['failed_steps'], ['accuracy'])
+        self.assertEqual(state['allowed_next_actions'], [])
+
+    def test_actions_depend_on_role(self):
+        self.project.status = 'review'
+        self.project.save()
+        self.assertEqual(get_workflow_state(self.project, 'analyst')['allowed_next_actions'], [])
+        self.assertEqual(get_workflow_state(self.project, 'reviewer')['allowed_next_actions'], ['review_project'])
+
+    def test_state_memoized_per_request(self):
+        request = RequestFactory().get('/')
+        request.user = self.reviewer
+        project = Project.objects.get(id=self.project.id)
+        with CaptureQueriesContext(connection) as queries:
+            first = request_workflow_state(request, project)
+            second = request_workflow_state(request, project)
+        self.assertIs(first, second)
+        self.assertEqual(len(self.step_queries(queries)), 1)
+
+        # A submission advances the project and the next state reflects the new step
+        submit_accuracy = self.client.post(
+            f'/api/validation/projects/{self.project.id}/accuracy/',
+            {'level': 100, 'measured_values': [99.5, 100.2, 100.1]},
+            content_type='application/json'
+        )
+        self.assertEqual(submit_accuracy.status_code, 200)
+        project.refresh_from_db()
+        self.assertIn('accuracy', request_workflow_state(request, project)['completed_steps'])
@@ -0,0 +1,220 @@
+import hashlib
+import os
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File, locks
+from django.http import UnreadablePostError
+from django.utils import timezone
+from .models import SupportingDocument, UploadSession
+
+ALLOWED_EXTENSIONS = ['.pdf', '.csv', '.jpg', '.jpeg', '.png', '.tiff', '.txt', '.xlsx', '.docx']
+
+# Size of the reads from the request body and from the part file
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """A chunk or finalize request cannot be applied; the message is returned to the client"""
+
+
+class OffsetMismatch(UploadError):
+    """The client is out of sync with the bytes already stored; it should resume from `offset`"""
+
+    def __init__(self, offset):
+        super().__init__(f'Expected offset {offset}')
+        self.offset = offset
+
+
+class ChunkInProgress(UploadError):
+    """Another request is writing a chunk of the same upload"""
+
+    def __init__(self, offset):
+        super().__init__('Another chunk of this upload is being written')
+        self.offset = offset
+
+
+def extension_allowed(file_name):
+    return os.path.splitext(file_name)[1].lower() in ALLOWED_EXTENSIONS
+
+
+def part_path(session):
+    """Temporary file the chunks of an upload are written to"""
+    return os.path.join(settings.UPLOAD_TEMP_ROOT, f'{session.id}.part')
+
+
+def serialize_session(session):
+    return {
+        'upload_id': str(session.id),
+        'file_name': session.file_name,
+        'total_size': session.total_size,
+        'offset': session.received,
+        'status': session.status,
+        'chunk_size': settings.UPLOAD_CHUNK_SIZE,
+        'document_id': session.document_id,
+    }
+
+
+def start_upload(project, user, file_name, total_size, file_type='other', description='', validation_step=None):
+    """Create an upload session and its empty part file"""
+    session = UploadSession.objects.create(
+        project=project,
+        uploaded_by=user,
+        file_name=file_name,
+        total_size=total_size,
+        file_type=file_type,
+        description=description,
+        validation_step=validation_step
+    )
+    os.makedirs(settings.UPLOAD_TEMP_ROOT, exist_ok=True)
+    open(part_path(session), 'wb').close()
+    return session
+
+
+def write_chunk(session, stream, offset, length):
+    """
+    Copy `length` bytes from `stream` into the part file at `offset`.
+
+    Chunks must be sent in order: `offset` has to equal the bytes already
+    received. The part file is locked while a chunk is written and the
+    offset is checked again once the lock is held, so two requests for the
+    same offset cannot both write it. The body is copied in small buffers,
+    so a chunk never sits in memory as a whole. If the connection drops
+    mid-chunk, whatever arrived is kept and the client resumes from the new
+    offset.
+    """
+    check_chunk(session, offset, length)
+
+    written = 0
+    interrupted = False
+    try:
+        part = open(part_path(session), 'r+b')
+    except FileNotFoundError:
+        # Aborted or finalized since the session was read
+        session.refresh_from_db()
+        raise UploadError(f'Upload is {session.status}')
+    with part:
+        if not locks.lock(part, locks.LOCK_EX | locks.LOCK_NB):
+            raise ChunkInProgress(session.received)
+        # The request holding the lock before may have moved the offset
+        session.refresh_from_db()
+        check_chunk(session, offset, length)
+
+        part.seek(offset)
+        # Drop bytes left over from an earlier, interrupted attempt
+        part.truncate()
+        while written < length:
+            try:
+                data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+            except (UnreadablePostError, OSError):
+                interrupted = True
+                break
+            if not data:
+                interrupted = True
+                break
+            part.write(data)
+            written += len(data)
+        part.flush()
+
+        # Still under the lock; conditional in case the upload was aborted meanwhile
+        updated = UploadSession.objects.filter(id=session.id, received=offset, status='active').update(
+            received=offset + written,
+            updated_at=timezone.now()
+        )
+    session.refresh_from_db()
+    if not updated:
+        raise UploadError(f'Upload is {session.status}')
+    if interrupted:
+        raise UploadError(f'Chunk incomplete: received {written} of {length} bytes')
+    return session
+
+
+def check_chunk(session, offset, length):
+    if session.status != 'active':
+        raise UploadError(f'Upload is {session.status}')
+    if offset != session.received:
+        raise OffsetMismatch(session.received)
+    if offset + length > session.total_size:
+        raise UploadError('Chunk extends past the declared file size')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def finalize_upload(session, sha256):
+    """
+    Check the part file and turn it into a SupportingDocument.
+
+    Returns (document, digest). `sha256` is the client's SHA-256 of its
+    file and must match what was stored; otherwise the upload stays open so
+    the client can abort and retry. The session is claimed with a
+    conditional update first, so of two concurrent requests completing the
+    same upload only one creates a document.
+    """
+    if session.status != 'active':
+        raise UploadError(f'Upload is {session.status}')
+    if session.received != session.total_size:
+        raise UploadError(f'Upload incomplete: received {session.received} of {session.total_size} bytes')
+    if not sha256:
+        raise UploadError('sha256 is required')
+
+    claimed = UploadSession.objects.filter(id=session.id, status='active').update(
+        status='finalizing',
+        updated_at=timezone.now()
+    )
+    if not claimed:
+        session.refresh_from_db()
+        raise UploadError(f'Upload is {session.status}')
+
+    path = part_path(session)
+    try:
+        digest = file_sha256(path)
+        if sha256.lower() != digest:
+            raise UploadError('SHA-256 mismatch')
+
+        document = SupportingDocument(
+            project=session.project,
+            validation_step=session.validation_step,
+            file_type=session.file_type,
+            file_name=session.file_name,
+            file_size=session.total_size,
+            description=session.description,
+            uploaded_by=session.uploaded_by
+        )
+        with open(path, 'rb') as part:
+            # Stored by document.save(), which re-checks the blob under its lock
+            document.file = File(part, name=session.file_name)
+            document.save()
+    except Exception:
+        # Hand the upload back so the client can retry or abort
+        UploadSession.objects.filter(id=session.id, status='finalizing').update(status='active')
+        raise
+
+    session.status = 'complete'
+    session.document = document
+    session.save(update_fields=['status', 'document', 'updated_at'])
+    os.remove(path)
+    return document, digest
+
+
+def abort_upload(session):
+    """Discard an unfinished upload"""
+    session.status = 'aborted'
+    session.save(update_fields=['status', 'updated_at'])
+    if os.path.exists(part_path(session)):
+        os.remove(part_path(session))
+
+
+def cleanup_stale_uploads(max_age=None):
+    """Abort active uploads that have not received a chunk for `max_age`"""
+    if max_age is None:
+        max_age = timedelta(hours=settings.UPLOAD_SESSION_MAX_AGE_HOURS)
+    cutoff = timezone.now() - max_age
+    stale = list(UploadSession.objects.filter(status='active', updated_at__lt=cutoff))
+    for session in stale:
+        abort_upload(session)
+    return len(stale)
@@ -8,7 +8,13 @@ urlpatterns = [
     path('projects/<int:project_id>/lod-loq/', views.lod_loq_view, name='lod-loq'),
     path('projects/<int:project_id>/documents/', views.supporting_documents_view, name='documents'),
     path('projects/<int:project_id>/documents/<int:document_id>/download/', views.download_document, name='download_document'),
+    path('projects/<int:project_id>/documents/<int:document_id>/preview/', views.document_preview, name='document_preview'),
+    path('projects/<int:project_id>/uploads/', views.upload_sessions_view, name='upload_sessions'),
+    path('projects/<int:project_id>/uploads/<uuid:upload_id>/', views.upload_session_view, name='upload_session'),
+    path('projects/<int:project_id>/uploads/<uuid:upload_id>/complete/', views.complete_upload, name='complete_upload'),
+    path('projects/<int:project_id>/documents/<int:document_id>/ingest/', views.ingest_document, name='ingest_document'),
     path('projects/<int:project_id>/documents/<int:document_id>/', views.delete_document, name='delete_document'),
+    path('projects/<int:project_id>/workflow/', views.workflow_view, name='workflow'),
     path('projects/<int:project_id>/summary/', views.validation_summary_view, name='validation_summary'),
     path('projects/<int:project_id>/review/', views.submit_review_view, name='submit_review'),
 ]
@@ -1,26 +1,44 @@
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.db.models import aprefetch_related_objects
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from django.http import FileResponse
 from django.utils import timezone
 from apps.projects.models import Project
 from apps.users.permissions import IsAnalystOrHigher
 from apps.audit.utils import AuditLogger
 from apps.users.permissions import IsReviewerOrHigher
-from .models import ValidationStep, LinearityData, AccuracyData, PrecisionData, LODLOQData, SupportingDocument, ParameterReview
+from mvp.async_api import api_response, async_api_view, is_asgi_request
+from .models import (
+    ValidationStep, LinearityData, AccuracyData, PrecisionData, LODLOQData, SupportingDocument, ParameterReview,
+    UploadSession
+)
 from .serializers import (
     LinearityDataSerializer, LinearitySubmitSerializer,
     AccuracyDataSerializer, AccuracySubmitSerializer,
     PrecisionDataSerializer, PrecisionSubmitSerializer,
     LODLOQDataSerializer, LODLOQSubmitSerializer
 )
-from .rules.linearity import evaluate_linearity
-from .rules.accuracy import evaluate_accuracy
-from .rules.precision import evaluate_precision
-from .rules.lod_loq import evaluate_lod_loq
-from .workflow import advance_workflow
+from .submissions import (
+    SubmissionError, ensure_not_submitted,
+    submit_linearity, submit_accuracy, submit_precision, submit_lod_loq
+)
+from .summary import build_validation_summary, reviews_prefetch, steps_with_data_prefetch
+from .workflow import STEPS_PREFETCH, request_workflow_state
+from .uploads import (
+    ALLOWED_EXTENSIONS, ChunkInProgress, OffsetMismatch, UploadError, extension_allowed, serialize_session,
+    start_upload, write_chunk, finalize_upload, abort_upload
+)
+from .documents import document_payload, document_list_payload
+from .downloads import document_response
+from .previews import PREVIEW_CONTENT_TYPE, PREVIEW_SIZES, preview_name
+from .ingest import (
+    IngestError, STEP_COLUMNS, is_column_index, is_ingestible, read_document_columns, describe_columns
+)
 
 
 @api_view(['GET', 'POST'])
@@ -29,63 +47,22 @@ def linearity_view(request, project_id):
     project = get_object_or_404(Project, id=project_id)
 
     if request.method == 'POST':
-        # Check if already submitted
-        if ValidationStep.objects.filter(project=project, step='linearity').exists():
-            return Response({'error': 'Linearity data already submitted'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ensure_not_submitted(project, 'linearity')
+        except SubmissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = LinearitySubmitSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Evaluate
-        result = evaluate_linearity(
-            serializer.validated_data['concentrations'],
-            serializer.validated_data['responses']
-        )
-
-        # Create validation step
-        step = ValidationStep.objects.create(
-            project=project,
-            step='linearity',
-            completed=True,
-            passed=result['status'] == 'PASS'
-        )
-
-        # Create data record
-        data = LinearityData.objects.create(
-            validation_step=step,
-            concentrations=serializer.validated_data['concentrations'],
-            responses=serializer.validated_data['responses'],
-            slope=result['metrics'].get('slope'),
-            intercept=result['metrics'].get('intercept'),
-            r_squared=result['metrics'].get('r_squared'),
-            passed=step.passed
-        )
-
-        # Advance workflow
-        old_status = project.status
-        advance_workflow(project, 'linearity', step.passed)
-        
-        # Log the validation action
-        AuditLogger.log_validation_action(
+        response_data = submit_linearity(
             request.user,
-            'submit',
             project,
-            'linearity',
-            {
-                'result': result['status'],
-                'r_squared': result['metrics'].get('r_squared'),
-                'previous_project_status': old_status,
-                'new_project_status': project.status
-            }
+            serializer.validated_data['concentrations'],
+            serializer.validated_data['responses']
         )
 
-        response_data = {
-            'status': result['status'],
-            'metrics': result['metrics'],
-            'justification': result['justification']
-        }
-
         return Response(response_data)
 
     else:  # GET
@@ -104,60 +81,22 @@ def accuracy_view(request, project_id):
     project = get_object_or_404(Project, id=project_id)
 
     if request.method == 'POST':
-        if ValidationStep.objects.filter(project=project, step='accuracy').exists():
-            return Response({'error': 'Accuracy data already submitted'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ensure_not_submitted(project, 'accuracy')
+        except SubmissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = AccuracySubmitSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Evaluate
-        result = evaluate_accuracy(
-            serializer.validated_data['level'],
-            serializer.validated_data['measured_values']
-        )
-
-        # Create records
-        step = ValidationStep.objects.create(
-            project=project,
-            step='accuracy',
-            completed=True,
-            passed=result['status'] == 'PASS'
-        )
-
-        data = AccuracyData.objects.create(
-            validation_step=step,
-            level=serializer.validated_data['level'],
-            measured_values=serializer.validated_data['measured_values'],
-            mean_recovery=result['metrics'].get('mean_recovery'),
-            rsd=result['metrics'].get('rsd'),
-            passed=step.passed
-        )
-
-        old_status = project.status
-        advance_workflow(project, 'accuracy', step.passed)
-        
-        # Log the validation action
-        AuditLogger.log_validation_action(
+        response_data = submit_accuracy(
             request.user,
-            'submit',
             project,
-            'accuracy',
-            {
-                'result': result['status'],
-                'level': serializer.validated_data['level'],
-                'mean_recovery': result['metrics'].get('mean_recovery'),
-                'previous_project_status': old_status,
-                'new_project_status': project.status
-            }
+            serializer.validated_data['level'],
+            serializer.validated_data['measured_values']
         )
 
-        response_data = {
-            'status': result['status'],
-            'metrics': result['metrics'],
-            'justification': result['justification']
-        }
-
         return Response(response_data)
 
     else:  # GET
@@ -176,55 +115,16 @@ def precision_view(request, project_id):
     project = get_object_or_404(Project, id=project_id)
 
     if request.method == 'POST':
-        if ValidationStep.objects.filter(project=project, step='precision').exists():
-            return Response({'error': 'Precision data already submitted'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ensure_not_submitted(project, 'precision')
+        except SubmissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = PrecisionSubmitSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Evaluate
-        result = evaluate_precision(serializer.validated_data['replicate_values'])
-
-        # Create records
-        step = ValidationStep.objects.create(
-            project=project,
-            step='precision',
-            completed=True,
-            passed=result['status'] == 'PASS'
-        )
-
-        data = PrecisionData.objects.create(
-            validation_step=step,
-            replicate_values=serializer.validated_data['replicate_values'],
-            mean=result['metrics'].get('mean'),
-            rsd=result['metrics'].get('rsd'),
-            passed=step.passed
-        )
-
-        old_status = project.status
-        advance_workflow(project, 'precision', step.passed)
-        
-        # Log the validation action
-        AuditLogger.log_validation_action(
-            request.user,
-            'submit',
-            project,
-            'precision',
-            {
-                'result': result['status'],
-                'rsd': result['metrics'].get('rsd'),
-                'mean': result['metrics'].get('mean'),
-                'previous_project_status': old_status,
-                'new_project_status': project.status
-            }
-        )
-
-        response_data = {
-            'status': result['status'],
-            'metrics': result['metrics'],
-            'justification': result['justification']
-        }
+        response_data = submit_precision(request.user, project, serializer.validated_data['replicate_values'])
 
         return Response(response_data)
 
@@ -244,68 +144,19 @@ def lod_loq_view(request, project_id):
     project = get_object_or_404(Project, id=project_id)
 
     if request.method == 'POST':
-        if ValidationStep.objects.filter(project=project, step='lod_loq').exists():
-            return Response({'error': 'LOD/LOQ data already submitted'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ensure_not_submitted(project, 'lod_loq')
+        except SubmissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = LODLOQSubmitSerializer(data=request.data)
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        # Get slope from linearity
-        linearity_step = ValidationStep.objects.filter(project=project, step='linearity').first()
-        if not linearity_step or not linearity_step.passed:
-            return Response({'error': 'Linearity must be completed and passed first'}, status=status.HTTP_400_BAD_REQUEST)
-
-        linearity_data = LinearityData.objects.get(validation_step=linearity_step)
-        slope = linearity_data.slope
-
-        # Evaluate
-        result = evaluate_lod_loq(
-            serializer.validated_data['blank_responses'],
-            slope
-        )
-
-        # Create records
-        step = ValidationStep.objects.create(
-            project=project,
-            step='lod_loq',
-            completed=True,
-            passed=result['status'] == 'PASS'
-        )
-
-        data = LODLOQData.objects.create(
-            validation_step=step,
-            blank_responses=serializer.validated_data['blank_responses'],
-            slope=slope,
-            lod=result['metrics'].get('lod'),
-            loq=result['metrics'].get('loq'),
-            passed=step.passed
-        )
-
-        old_status = project.status
-        advance_workflow(project, 'lod_loq', step.passed)
-        
-        # Log the validation action
-        AuditLogger.log_validation_action(
-            request.user,
-            'submit',
-            project,
-            'lod_loq',
-            {
-                'result': result['status'],
-                'lod': result['metrics'].get('lod'),
-                'loq': result['metrics'].get('loq'),
-                'slope': slope,
-                'previous_project_status': old_status,
-                'new_project_status': project.status
-            }
-        )
-
-        response_data = {
-            'status': result['status'],
-            'metrics': result['metrics'],
-            'justification': result['justification']
-        }
+        try:
+            response_data = submit_lod_loq(request.user, project, serializer.validated_data['blank_responses'])
+        except SubmissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         return Response(response_data)
 
@@ -334,15 +185,15 @@ def supporting_documents_view(request, project_id):
         validation_step_id = request.data.get('validation_step_id')
         
         # Validate file type
-        allowed_extensions = ['.pdf', '.csv', '.jpg', '.jpeg', '.png', '.tiff', '.txt', '.xlsx', '.docx']
-        file_ext = '.' + file.name.split('.')[-1].lower()
-        if file_ext not in allowed_extensions:
-            return Response({'error': f'File type not allowed. Allowed: {", ".join(allowed_extensions)}'}, 
+        if not extension_allowed(file.name):
+            return Response({'error': f'File type not allowed. Allowed: {", ".join(ALLOWED_EXTENSIONS)}'}, 
                           status=status.HTTP_400_BAD_REQUEST)
         
-        # Validate file size (5MB max)
-        if file.size > 5 * 1024 * 1024:
-            return Response({'error': 'File size exceeds 5MB limit'}, status=status.HTTP_400_BAD_REQUEST)
+        # Larger files have to go through the chunked upload API
+        if file.size > settings.DIRECT_UPLOAD_MAX_SIZE:
+            limit_mb = settings.DIRECT_UPLOAD_MAX_SIZE // (1024 * 1024)
+            return Response({'error': f'File size exceeds {limit_mb}MB limit, use a chunked upload'},
+                            status=status.HTTP_400_BAD_REQUEST)
         
         # Get validation step if provided
         validation_step = None
@@ -368,16 +219,7 @@ def supporting_documents_view(request, project_id):
             {'action': 'uploaded_document', 'file_name': file.name, 'file_type': file_type}
         )
         
-        return Response({
-            'id': document.id,
-            'file_name': document.file_name,
-            'file_type': document.file_type,
-            'file_size': document.file_size,
-            'description': document.description,
-            'uploaded_at': document.uploaded_at,
-            'uploaded_by': document.uploaded_by.username,
-            'file_url': f'/api/validation/projects/{project_id}/documents/{document.id}/download/'
-        }, status=status.HTTP_201_CREATED)
+        return Response(document_payload(document), status=status.HTTP_201_CREATED)
     
     else:  # GET
         documents = SupportingDocument.objects.filter(project=project)
@@ -387,39 +229,243 @@ def supporting_documents_view(request, project_id):
         if step_id:
             documents = documents.filter(validation_step_id=step_id)
         
-        data = []
-        for doc in documents:
-            data.append({
-                'id': doc.id,
-                'file_name': doc.file_name,
-                'file_type': doc.file_type,
-                'file_size': doc.file_size,
-                'description': doc.description,
-                'uploaded_at': doc.uploaded_at,
-                'uploaded_by': doc.uploaded_by.username,
-                'validation_step': doc.validation_step.step if doc.validation_step else None,
-                'file_url': f'/api/validation/projects/{project_id}/documents/{doc.id}/download/'
-            })
-        
-        return Response(data)
+        documents = documents.select_related('uploaded_by', 'validation_step')
+        return Response([document_list_payload(doc) for doc in documents])
 
 
-@api_view(['GET'])
+@async_api_view([IsAuthenticated, IsAnalystOrHigher])
+async def download_document(request, project_id, document_id):
+    """
+    Download a supporting document.
+
+    Async so that under ASGI a long transfer holds no worker thread: the
+    file is streamed by the event loop with reads done in worker threads.
+    """
+    project = await aget_object_or_404(Project, id=project_id)
+    document = await aget_object_or_404(SupportingDocument, id=document_id, project=project)
+
+    as_attachment = request.query_params.get('inline') not in ['1', 'true']
+    response = document_response(
+        request, document, as_attachment=as_attachment, asynchronous=is_asgi_request(request)
+    )
+
+    # Log every delivery, including ones handed off to the web server;
+    # 304s and unsatisfiable ranges send no content
+    if response.status_code in (200, 206):
+        details = {'action': 'downloaded_document', 'file_name': document.file_name}
+        if response.status_code == 206:
+            details['range'] = response['Content-Range']
+        await sync_to_async(AuditLogger.log_project_action)(request.user, 'submit', project, details)
+
+    return response
+
+
+@api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAnalystOrHigher])
-def download_document(request, project_id, document_id):
+def upload_sessions_view(request, project_id):
+    """Start a chunked upload of a supporting document"""
     project = get_object_or_404(Project, id=project_id)
-    document = get_object_or_404(SupportingDocument, id=document_id, project=project)
-    
-    # Log the download
+
+    file_name = request.data.get('file_name', '')
+    if not file_name:
+        return Response({'error': 'file_name is required'}, status=status.HTTP_400_BAD_REQUEST)
+    if not extension_allowed(file_name):
+        return Response({'error': f'File type not allowed. Allowed: {", ".join(ALLOWED_EXTENSIONS)}'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        file_size = int(request.data.get('file_size'))
+    except (TypeError, ValueError):
+        return Response({'error': 'file_size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    if not 0 < file_size <= settings.MAX_UPLOAD_SIZE:
+        return Response({'error': f'file_size must be between 1 and {settings.MAX_UPLOAD_SIZE} bytes'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    file_type = request.data.get('file_type', 'other')
+    if file_type not in dict(SupportingDocument.FILE_TYPE_CHOICES):
+        return Response({'error': 'Invalid file_type'}, status=status.HTTP_400_BAD_REQUEST)
+
+    validation_step = None
+    validation_step_id = request.data.get('validation_step_id')
+    if validation_step_id:
+        validation_step = ValidationStep.objects.filter(id=validation_step_id, project=project).first()
+
+    session = start_upload(
+        project,
+        request.user,
+        file_name,
+        file_size,
+        file_type=file_type,
+        description=request.data.get('description', ''),
+        validation_step=validation_step
+    )
+    return Response(serialize_session(session), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'PUT', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAnalystOrHigher])
+def upload_session_view(request, project_id, upload_id):
+    """
+    GET reports the stored offset to resume from, PUT appends a chunk, DELETE aborts.
+
+    A chunk is the raw request body; its position is given by the
+    Upload-Offset header (or ?offset=) and must equal the stored offset.
+    """
+    project = get_object_or_404(Project, id=project_id)
+    session = get_object_or_404(UploadSession, id=upload_id, project=project, uploaded_by=request.user)
+
+    if request.method == 'GET':
+        return Response(serialize_session(session))
+
+    if request.method == 'DELETE':
+        if session.status == 'active':
+            abort_upload(session)
+        return Response(serialize_session(session))
+
+    try:
+        offset = int(request.headers.get('Upload-Offset', request.query_params.get('offset', '')))
+        length = int(request.headers.get('Content-Length') or 0)
+    except ValueError:
+        return Response({'error': 'Upload-Offset header or offset parameter is required'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if length <= 0:
+        return Response({'error': 'Empty chunk'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        session = write_chunk(session, request.stream, offset, length)
+    except (OffsetMismatch, ChunkInProgress) as e:
+        return Response({'error': str(e), 'offset': e.offset}, status=status.HTTP_409_CONFLICT)
+    except UploadError as e:
+        return Response({'error': str(e), 'offset': session.received}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(serialize_session(session))
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAnalystOrHigher])
+def complete_upload(request, project_id, upload_id):
+    """Verify the SHA-256 of a fully received upload and create the document"""
+    project = get_object_or_404(Project, id=project_id)
+    session = get_object_or_404(UploadSession, id=upload_id, project=project, uploaded_by=request.user)
+
+    sha256 = request.data.get('sha256')
+    if not sha256 or not isinstance(sha256, str):
+        return Response({'error': 'sha256 of the whole file is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        document, digest = finalize_upload(session, sha256)
+    except UploadError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
     AuditLogger.log_project_action(
         request.user,
         'submit',
         project,
-        {'action': 'downloaded_document', 'file_name': document.file_name}
+        {
+            'action': 'uploaded_document',
+            'file_name': document.file_name,
+            'file_type': document.file_type,
+            'sha256': digest,
+            'chunked': True
+        }
     )
-    
-    response = FileResponse(document.file.open(), as_attachment=True)
-    response['Content-Disposition'] = f'attachment; filename="{document.file_name}"'
+
+    return Response({**document_payload(document), 'sha256': digest}, status=status.HTTP_201_CREATED)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsAnalystOrHigher])
+def ingest_document(request, project_id, document_id):
+    """Parse an uploaded instrument export and submit its values to a validation step"""
+    project = get_object_or_404(Project, id=project_id)
+    document = get_object_or_404(SupportingDocument, id=document_id, project=project)
+
+    if not is_ingestible(document):
+        return Response(
+            {'error': 'Only CSV/TXT raw data or instrument data documents can be ingested'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    step = request.data.get('step')
+    if step not in STEP_COLUMNS:
+        return Response(
+            {'error': f'step must be one of: {", ".join(STEP_COLUMNS)}'}, status=status.HTTP_400_BAD_REQUEST
+        )
+
+    columns = request.data.get('columns') or {}
+    if not isinstance(columns, dict) or not all(
+        isinstance(column, str) or (is_column_index(column) and column >= 0) for column in columns.values()
+    ):
+        return Response(
+            {'error': 'columns must map fields to header names or column indices'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    level = request.data.get('level')
+    if step == 'accuracy' and level not in dict(AccuracyData.LEVEL_CHOICES):
+        return Response({'error': 'level must be one of: 80, 100, 120'}, status=status.HTTP_400_BAD_REQUEST)
+
+    preview = str(request.data.get('preview', '')).lower() in ['1', 'true']
+    if not preview:
+        try:
+            ensure_not_submitted(project, step)
+        except SubmissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        values = read_document_columns(document, step, columns)
+    except IngestError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if preview:
+        return Response({'step': step, 'columns': describe_columns(values)})
+
+    details = {'source_document': document.file_name, 'document_id': document.id}
+    try:
+        if step == 'linearity':
+            response_data = submit_linearity(
+                request.user, project, values['concentrations'], values['responses'], details
+            )
+        elif step == 'accuracy':
+            response_data = submit_accuracy(request.user, project, level, values['measured_values'], details)
+        elif step == 'precision':
+            response_data = submit_precision(request.user, project, values['replicate_values'], details)
+        else:
+            response_data = submit_lod_loq(request.user, project, values['blank_responses'], details)
+    except SubmissionError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response_data['rows'] = len(next(iter(values.values())))
+    return Response(response_data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAnalystOrHigher])
+def document_preview(request, project_id, document_id):
+    """
+    Serve a rendered thumbnail or preview of a document.
+
+    A document's content never changes, so the JPEG can be cached by the
+    browser indefinitely. Unlike downloads these are not audited: the
+    project page requests every thumbnail on each visit.
+    """
+    project = get_object_or_404(Project, id=project_id)
+    document = get_object_or_404(SupportingDocument, id=document_id, project=project)
+
+    size = request.query_params.get('size', 'thumb')
+    if size not in PREVIEW_SIZES:
+        return Response({'error': f'size must be one of: {", ".join(PREVIEW_SIZES)}'}, status=status.HTTP_400_BAD_REQUEST)
+    if document.preview_status != 'ready':
+        return Response({'error': 'Preview not available', 'preview_status': document.preview_status},
+                        status=status.HTTP_404_NOT_FOUND)
+
+    storage = document.file.storage
+    name = preview_name(document.file.name, size)
+    if not storage.exists(name):
+        return Response({'error': 'Preview not available'}, status=status.HTTP_404_NOT_FOUND)
+
+    response = FileResponse(storage.open(name, 'rb'), content_type=PREVIEW_CONTENT_TYPE)
+    response['Cache-Control'] = f'private, max-age={settings.PREVIEW_CACHE_MAX_AGE}, immutable'
     return response
 
 
@@ -434,8 +480,9 @@ def delete_document(request, project_id, document_id):
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
     
     file_name = document.file_name
-    document.file.delete()  # Delete the actual file
-    document.delete()  # Delete the database record
+    # The stored file is shared by identical uploads; it is removed once no
+    # document references it any more (see signals.release_document_file)
+    document.delete()
     
     # Log the deletion
     AuditLogger.log_project_action(
@@ -450,118 +497,19 @@ def delete_document(request, project_id, document_id):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAnalystOrHigher])
-def validation_summary_view(request, project_id):
+def workflow_view(request, project_id):
+    """Workflow state of a project, as served by the projects app's workflow endpoint"""
+    project = get_object_or_404(Project.objects.prefetch_related(STEPS_PREFETCH), id=project_id)
+    return Response(request_workflow_state(request, project))
+
+
+@async_api_view([IsAuthenticated, IsAnalystOrHigher])
+async def validation_summary_view(request, project_id):
     """Get comprehensive validation summary for a project including all validation steps."""
-    project = get_object_or_404(Project, id=project_id)
-    
-    summary = {
-        'project_id': project.id,
-        'project_status': project.status,
-        'validation_steps': {}
-    }
-    
-    # Get linearity data
-    linearity_step = ValidationStep.objects.filter(project=project, step='linearity').first()
-    if linearity_step:
-        try:
-            data = LinearityData.objects.get(validation_step=linearity_step)
-            summary['validation_steps']['linearity'] = {
-                'completed': linearity_step.completed,
-                'passed': linearity_step.passed,
-                'data': {
-                    'concentrations': data.concentrations,
-                    'responses': data.responses,
-                    'slope': data.slope,
-                    'intercept': data.intercept,
-                    'r_squared': data.r_squared
-                }
-            }
-        except LinearityData.DoesNotExist:
-            summary['validation_steps']['linearity'] = {
-                'completed': linearity_step.completed,
-                'passed': linearity_step.passed,
-                'data': None
-            }
-    
-    # Get accuracy data
-    accuracy_step = ValidationStep.objects.filter(project=project, step='accuracy').first()
-    if accuracy_step:
-        try:
-            data = AccuracyData.objects.get(validation_step=accuracy_step)
-            summary['validation_steps']['accuracy'] = {
-                'completed': accuracy_step.completed,
-                'passed': accuracy_step.passed,
-                'data': {
-                    'level': data.level,
-                    'measured_values': data.measured_values,
-                    'mean_recovery': data.mean_recovery,
-                    'rsd': data.rsd
-                }
-            }
-        except AccuracyData.DoesNotExist:
-            summary['validation_steps']['accuracy'] = {
-                'completed': accuracy_step.completed,
-                'passed': accuracy_step.passed,
-                'data': None
-            }
-    
-    # Get precision data
-    precision_step = ValidationStep.objects.filter(project=project, step='precision').first()
-    if precision_step:
-        try:
-            data = PrecisionData.objects.get(validation_step=precision_step)
-            summary['validation_steps']['precision'] = {
-                'completed': precision_step.completed,
-                'passed': precision_step.passed,
-                'data': {
-                    'replicate_values': data.replicate_values,
-                    'mean': data.mean,
-                    'rsd': data.rsd
-                }
-            }
-        except PrecisionData.DoesNotExist:
-            summary['validation_steps']['precision'] = {
-                'completed': precision_step.completed,
-                'passed': precision_step.passed,
-                'data': None
-            }
-    
-    # Get LOD/LOQ data
-    lodloq_step = ValidationStep.objects.filter(project=project, step='lod_loq').first()
-    if lodloq_step:
-        try:
-            data = LODLOQData.objects.get(validation_step=lodloq_step)
-            summary['validation_steps']['lod_loq'] = {
-                'completed': lodloq_step.completed,
-                'passed': lodloq_step.passed,
-                'data': {
-                    'blank_responses': data.blank_responses,
-                    'slope': data.slope,
-                    'lod': data.lod,
-                    'loq': data.loq
-                }
-            }
-        except LODLOQData.DoesNotExist:
-            summary['validation_steps']['lod_loq'] = {
-                'completed': lodloq_step.completed,
-                'passed': lodloq_step.passed,
-                'data': None
-            }
-    
-    # Get parameter reviews if any exist
-    parameter_reviews = ParameterReview.objects.filter(project=project)
-    if parameter_reviews.exists():
-        summary['parameter_reviews'] = []
-        for review in parameter_reviews:
-            summary['parameter_reviews'].append({
-                'parameter_name': review.parameter_name,
-                'decision': review.decision,
-                'comments': review.comments,
-                'reviewed_by': review.reviewed_by.username if review.reviewed_by else None,
-                'reviewed_at': review.reviewed_at
-            })
-    
-    return Response(summary)
+    project = await aget_object_or_404(Project, id=project_id)
+    # Loaded here with the async ORM, so building the summary runs no query
+    await aprefetch_related_objects([project], steps_with_data_prefetch(), reviews_prefetch())
+    return api_response(build_validation_summary(project))
 
 
 @api_view(['POST'])
@@ -1,65 +1,102 @@
-from .models import ValidationStep
+from django.db.models import prefetch_related_objects
 
+# Project statuses in order; the validation steps are submitted one after another
+WORKFLOW_STEPS = ['draft', 'linearity', 'accuracy', 'precision', 'lod_loq', 'review', 'approved']
+VALIDATION_STEPS = ['linearity', 'accuracy', 'precision', 'lod_loq']
+
+STEPS_PREFETCH = 'validationstep_set'
+
+
+def get_project_steps(project):
+    """
+    The project's ValidationStep rows keyed by step name.
+
+    Loaded with a single prefetch that is kept on the project instance, so
+    a project fetched with prefetch_related('validationstep_set') costs no
+    query here and repeated calls never query twice.
+    """
+    prefetch_related_objects([project], STEPS_PREFETCH)
+    return {step.step: step for step in project.validationstep_set.all()}
 
-def get_workflow_state(project):
-    """Get current workflow state for a project"""
-    steps = ValidationStep.objects.filter(project=project).order_by('created_at')
-    current_step = project.status.lower()
-    completed_steps = [step.step for step in steps if step.completed]
-    locked_steps = []
 
-    # Define workflow order
-    workflow_order = ['linearity', 'accuracy', 'precision', 'lod_loq']
+def get_workflow_state(project, role=None):
+    """
+    Workflow state of a project: progress, allowed actions and locked steps.
 
-    # Find current step index
-    try:
-        current_index = workflow_order.index(current_step)
-    except ValueError:
-        current_index = 0
+    `role` is the requesting user's role; reviewing, approving and report
+    actions are only offered to the roles allowed to perform them.
+    """
+    steps = get_project_steps(project)
+    current_step = project.status
+    current_index = WORKFLOW_STEPS.index(current_step)
 
-    # Locked steps are those after current if current not passed
-    if current_step in workflow_order:
-        step_obj = steps.filter(step=current_step).first()
-        if step_obj and not step_obj.passed:
-            locked_steps = workflow_order[current_index + 1:]
+    completed_steps = [name for name in VALIDATION_STEPS if name in steps and steps[name].completed]
+    failed_steps = [name for name in completed_steps if steps[name].passed is False]
+    # A failed step keeps the project at that step with nothing left to submit
+    blocked = current_step in failed_steps
 
     allowed_actions = []
+    locked_steps = []
     if current_step == 'draft':
         allowed_actions = ['start_validation']
-    elif current_step in workflow_order:
-        if not steps.filter(step=current_step).exists():
-            allowed_actions = [f'submit_{current_step}']
-        else:
-            step_obj = steps.get(step=current_step)
-            if step_obj.completed:
-                if step_obj.passed:
-                    next_step = workflow_order[current_index + 1] if current_index + 1 < len(workflow_order) else None
-                    if next_step:
-                        allowed_actions = [f'submit_{next_step}']
-                    else:
-                        allowed_actions = ['review']
-                else:
-                    allowed_actions = []  # blocked
-            else:
-                allowed_actions = [f'update_{current_step}']  # but according to API, no updates
+        locked_steps = VALIDATION_STEPS + ['review', 'approved']
+    elif current_step in VALIDATION_STEPS:
+        if not blocked:
+            allowed_actions = ['submit_validation_data']
+        # Lock steps before current and everything after review
+        locked_steps = WORKFLOW_STEPS[:current_index] + ['review', 'approved']
+    elif current_step == 'review':
+        if role in ['reviewer', 'qa']:
+            allowed_actions = ['review_project']
+        locked_steps = WORKFLOW_STEPS[:current_index] + ['approved']
+    elif current_step == 'approved':
+        if role == 'qa':
+            allowed_actions = ['generate_report', 'view_audit_log']
+        locked_steps = WORKFLOW_STEPS[:current_index]
 
     return {
         'current_step': current_step,
+        'current_step_index': current_index,
+        'total_steps': len(WORKFLOW_STEPS),
         'completed_steps': completed_steps,
+        'failed_steps': failed_steps,
+        'blocked': blocked,
         'allowed_next_actions': allowed_actions,
         'locked_steps': locked_steps,
+        'workflow_steps': WORKFLOW_STEPS,
+        'validation_steps': VALIDATION_STEPS,
+        'can_edit': current_step not in ['review', 'approved'],
+        'is_locked': current_step == 'approved',
+        'reviewer_assigned': project.reviewer_id is not None,
+        'qa_approver_assigned': project.qa_approver_id is not None,
     }
 
 
+def request_workflow_state(request, project):
+    """
+    get_workflow_state() memoized for the duration of a request.
+
+    Views and helpers of the same request that need the state share one
+    computation. The key includes the status, so a project advanced during
+    the request is evaluated again.
+    """
+    states = request.__dict__.setdefault('_workflow_states', {})
+    key = (project.id, project.status)
+    if key not in states:
+        states[key] = get_workflow_state(project, getattr(request.user, 'role', None))
+    return states[key]
+
+
 def advance_workflow(project, step, passed):
     """Advance workflow after completing a step"""
-    workflow_order = ['linearity', 'accuracy', 'precision', 'lod_loq']
-    if step in workflow_order:
-        index = workflow_order.index(step)
-        if passed and index + 1 < len(workflow_order):
-            project.status = workflow_order[index + 1]
+    if step in VALIDATION_STEPS:
+        index = VALIDATION_STEPS.index(step)
+        if passed and index + 1 < len(VALIDATION_STEPS):
+            project.status = VALIDATION_STEPS[index + 1]
         elif passed:
             project.status = 'review'
         else:
             project.status = step  # stay, but blocked
         project.save()
+    # A step was just stored: drop prefetched rows so the next state sees it
+    getattr(project, '_prefetched_objects_cache', {}).pop(STEPS_PREFETCH, None)
@@ -3,6 +3,12 @@ ASGI config for mvp project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with an ASGI server (e.g. ``uvicorn mvp.asgi:application``) to
+enable the live event stream at /api/audit/events/; the WSGI application
+answers that endpoint with 501. Events are read from the audit log table,
+so any number of ASGI workers can serve the streams, next to the API or
+alongside a WSGI deployment of it.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
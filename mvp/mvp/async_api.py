@@ -0,0 +1,120 @@
+"""
+Support for the async API views served under ASGI.
+
+DRF views are synchronous, so the hot read endpoints are plain async Django
+views. These helpers give them what @api_view/@permission_classes give the
+sync views: the session user, permission checks, DRF error bodies and the
+same JSON rendering, so clients cannot tell the two apart.
+"""
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+
+def api_response(data, status=status.HTTP_200_OK):
+    """JSON response rendered exactly like a DRF Response"""
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def error_response(exc):
+    """Body and status DRF's exception handler would give an APIException"""
+    if isinstance(exc.detail, (list, dict)):
+        return api_response(exc.detail, status=exc.status_code)
+    return api_response({'detail': exc.detail}, status=exc.status_code)
+
+
+def is_asgi_request(request):
+    """Whether the response will be sent by the ASGI server (so async iterators stream natively)"""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+async def aiter_sync(iterable):
+    """
+    Async iterator over a sync iterable, for streaming responses sent by the ASGI server.
+
+    The ASGI handler reads a sync streaming body into memory before sending
+    it. This hands the items over one at a time instead. Each step runs in
+    the request's sync thread, so iterables that query the database keep
+    using the same connection.
+    """
+    iterator = iter(iterable)
+    step = sync_to_async(next)
+    done = object()
+    try:
+        while True:
+            item = await step(iterator, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        # Also reached when the client disconnects; closes open files and cursors
+        close = getattr(iterator, 'close', None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_content(request, iterable):
+    """Body of a StreamingHttpResponse: the iterable itself under WSGI, streamed asynchronously under ASGI"""
+    return aiter_sync(iterable) if is_asgi_request(request) else iterable
+
+
+def async_api_view(permission_classes, fallback=None):
+    """
+    Decorator for async read-only API views.
+
+    The view receives a DRF Request with the session user set. GET and HEAD
+    run the coroutine; any other method goes to `fallback`, a sync view run
+    in a worker thread (so one URL can keep its DRF write path), or gets 405.
+    """
+    def decorator(view):
+        @csrf_exempt  # as with DRF views; the fallback checks CSRF itself
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                if fallback is not None:
+                    return await sync_to_async(fallback)(request, *args, **kwargs)
+                return error_response(exceptions.MethodNotAllowed(request.method))
+
+            user = await request.auser()
+            api_request = Request(request)
+            api_request.user = user
+            try:
+                for permission_class in permission_classes:
+                    permission = permission_class()
+                    if not permission.has_permission(api_request, None):
+                        if not user.is_authenticated:
+                            # Session auth sends no WWW-Authenticate, so DRF answers 403
+                            exc = exceptions.NotAuthenticated()
+                            exc.status_code = status.HTTP_403_FORBIDDEN
+                            raise exc
+                        raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+                return await view(api_request, *args, **kwargs)
+            except Http404:
+                return error_response(exceptions.NotFound())
+            except exceptions.APIException as exc:
+                return error_response(exc)
+        return wrapper
+    return decorator
+
+
+async def list_response(view_class, request, **kwargs):
+    """
+    ListAPIView.list() for async views.
+
+    Runs the view's own get_queryset(), serializer and pagination. DRF's
+    paginator is synchronous, so it runs in a worker thread rather than
+    being reimplemented on the async ORM. The serializer must not need
+    extra queries (select_related what it shows).
+    """
+    view = view_class(request=request, args=(), kwargs=kwargs, format_kwarg=None)
+    queryset = view.filter_queryset(view.get_queryset())
+    page = await sync_to_async(view.paginate_queryset)(queryset)
+    if page is None:
+        return api_response(view.get_serializer([item async for item in queryset], many=True).data)
+    serializer = view.get_serializer(page, many=True)
+    return api_response(view.get_paginated_response(serializer.data).data)
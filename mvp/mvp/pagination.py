@@ -0,0 +1,18 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination used by all list endpoints.
+
+    Pages are fetched with a WHERE on the ordering key instead of an OFFSET,
+    so every page costs the same no matter how deep the client goes. Views
+    pick their key with a `pagination_ordering` tuple; ending it with the
+    primary key keeps the order stable when timestamps collide.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-id',)
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'pagination_ordering', self.ordering)
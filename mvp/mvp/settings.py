@@ -55,6 +55,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Batch audit log writes per request (remove for immediate writes)
+    'apps.audit.middleware.AuditBufferMiddleware',
 ]
 
 ROOT_URLCONF = 'mvp.urls'
@@ -80,10 +82,45 @@ WSGI_APPLICATION = 'mvp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Set to True to tune SQLite for several workers writing audit entries
+# concurrently (SQLITE_TUNED_SETTINGS below; compare the two profiles
+# with `manage.py benchmark_sqlite`). Off, Django's defaults are used.
+SQLITE_TUNED = False
+
+SQLITE_PRAGMAS = [
+    # Readers no longer block the writer, nor the writer the readers
+    'journal_mode=WAL',
+    # With WAL, fsync only at checkpoints: a power cut may lose the last
+    # commits but cannot corrupt the database
+    'synchronous=NORMAL',
+    'mmap_size=268435456',  # 256 MB of the file read through the page cache
+    'cache_size=-65536',  # 64 MB page cache per connection
+]
+
+# Needs Django 5.1+ for the transaction_mode and init_command options
+SQLITE_TUNED_SETTINGS = {
+    # Reuse connections between requests instead of reconnecting and
+    # re-running the pragmas every time (threaded WSGI workers; under
+    # ASGI each request runs in a fresh thread, so nothing is reused)
+    'CONN_MAX_AGE': 600,
+    'CONN_HEALTH_CHECKS': True,
+    'OPTIONS': {
+        # Busy timeout: wait up to 20 s for the write lock rather than
+        # failing with "database is locked"
+        'timeout': 20,
+        # Take the write lock at BEGIN. A transaction that reads first
+        # and writes later cannot wait for the lock on its first write
+        # and fails at once, whatever the timeout.
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': ';'.join(f'PRAGMA {pragma}' for pragma in SQLITE_PRAGMAS),
+    },
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        **(SQLITE_TUNED_SETTINGS if SQLITE_TUNED else {}),
     }
 }
 
@@ -132,6 +169,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'mvp.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
 }
 
 # Static files (CSS, JavaScript, Images)
@@ -145,6 +184,51 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Rendered PDF reports, keyed by a hash of the data they were built from.
+# Kept outside MEDIA_ROOT so reports are only reachable through the API.
+REPORT_CACHE_ROOT = BASE_DIR / 'report_cache'
+
 # File upload settings
 FILE_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 5242880  # 5MB
+
+# Largest file accepted by the single-request multipart upload; bigger files
+# go through the chunked upload API, which streams chunks to disk.
+DIRECT_UPLOAD_MAX_SIZE = 5 * 1024 * 1024  # 5MB
+MAX_UPLOAD_SIZE = 2 * 1024 * 1024 * 1024  # 2GB
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # suggested to clients
+UPLOAD_TEMP_ROOT = BASE_DIR / 'upload_tmp'
+# Unfinished chunked uploads older than this are removed by cleanup_uploads
+UPLOAD_SESSION_MAX_AGE_HOURS = 24
+
+# Hand document downloads off to the front web server after the permission
+# check and audit entry: None (Django streams the file), 'x-sendfile'
+# (Apache mod_xsendfile, lighttpd) or 'x-accel-redirect' (nginx).
+DOCUMENT_SENDFILE = None
+# nginx `internal` location aliased to MEDIA_ROOT, used with x-accel-redirect
+DOCUMENT_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+
+# Browser cache lifetime of document thumbnails/previews; a document's content never changes
+PREVIEW_CACHE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Shared by all server processes, so invalidating an entry in one worker
+# reaches the others (the default in-memory cache is per process). Create
+# the table with manage.py createcachetable after migrate.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_entries',
+    }
+}
+
+# Per-user stats are cached and dropped when the user's audit entries or
+# projects change; the timeout bounds staleness from writes without signals
+USER_STATS_CACHE_TIMEOUT = 300
+
+# Live event stream (/api/audit/events/, served under ASGI). Events are read
+# from the audit log, so writes handled by any process reach every stream.
+EVENT_STREAM_POLL_SECONDS = 1  # delay between audit log polls when idle
+EVENT_STREAM_HEARTBEAT_SECONDS = 15
+EVENT_STREAM_RETRY_MS = 5000  # browser reconnect delay
+EVENT_STREAM_REPLAY_SIZE = 500  # recent events kept for Last-Event-ID catch-up
+EVENT_STREAM_MAX_PENDING = 100  # undelivered events before a slow client is dropped
@@ -2,6 +2,96 @@
  * API Service - Handles all communication with Django REST API
  */
 
+// Files above this size are sent with the chunked upload API
+const DIRECT_UPLOAD_LIMIT = 5 * 1024 * 1024;
+const MAX_CHUNK_RETRIES = 5;
+// crypto.subtle can only hash a file held in memory, so larger files are
+// hashed slice by slice with Sha256 below
+const CHECKSUM_MAX_SIZE = 256 * 1024 * 1024;
+
+/**
+ * Incremental SHA-256 (FIPS 180-4) for files too large to hash in one piece.
+ */
+class Sha256 {
+    static K = new Uint32Array([
+        0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+        0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+        0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+        0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+        0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+        0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+        0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+        0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2
+    ]);
+
+    constructor() {
+        this.state = new Uint32Array([
+            0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19
+        ]);
+        this.block = new Uint8Array(64);
+        this.blockLength = 0;
+        this.length = 0;
+        this.words = new Uint32Array(64);
+    }
+
+    update(bytes) {
+        this.length += bytes.length;
+        let i = 0;
+        if (this.blockLength) {
+            const take = Math.min(64 - this.blockLength, bytes.length);
+            this.block.set(bytes.subarray(0, take), this.blockLength);
+            this.blockLength += take;
+            i = take;
+            if (this.blockLength < 64) {
+                return;
+            }
+            this.compress(this.block, 0);
+            this.blockLength = 0;
+        }
+        for (; i + 64 <= bytes.length; i += 64) {
+            this.compress(bytes, i);
+        }
+        this.block.set(bytes.subarray(i), 0);
+        this.blockLength = bytes.length - i;
+    }
+
+    hexdigest() {
+        const bits = this.length * 8;
+        const padding = new Uint8Array((this.blockLength < 56 ? 64 : 128) - this.blockLength);
+        padding[0] = 0x80;
+        const view = new DataView(padding.buffer);
+        view.setUint32(padding.length - 8, Math.floor(bits / 0x100000000));
+        view.setUint32(padding.length - 4, bits >>> 0);
+        this.update(padding);
+        return Array.from(this.state, word => word.toString(16).padStart(8, '0')).join('');
+    }
+
+    compress(bytes, offset) {
+        const w = this.words;
+        for (let t = 0; t < 16; t++) {
+            const j = offset + t * 4;
+            w[t] = (bytes[j] << 24) | (bytes[j + 1] << 16) | (bytes[j + 2] << 8) | bytes[j + 3];
+        }
+        for (let t = 16; t < 64; t++) {
+            const a = w[t - 15], b = w[t - 2];
+            const s0 = ((a >>> 7) | (a << 25)) ^ ((a >>> 18) | (a << 14)) ^ (a >>> 3);
+            const s1 = ((b >>> 17) | (b << 15)) ^ ((b >>> 19) | (b << 13)) ^ (b >>> 10);
+            w[t] = w[t - 16] + s0 + w[t - 7] + s1;
+        }
+        let [a, b, c, d, e, f, g, h] = this.state;
+        for (let t = 0; t < 64; t++) {
+            const S1 = ((e >>> 6) | (e << 26)) ^ ((e >>> 11) | (e << 21)) ^ ((e >>> 25) | (e << 7));
+            const t1 = (h + S1 + ((e & f) ^ (~e & g)) + Sha256.K[t] + w[t]) | 0;
+            const S0 = ((a >>> 2) | (a << 30)) ^ ((a >>> 13) | (a << 19)) ^ ((a >>> 22) | (a << 10));
+            const t2 = (S0 + ((a & b) ^ (a & c) ^ (b & c))) | 0;
+            h = g; g = f; f = e; e = (d + t1) | 0;
+            d = c; c = b; b = a; a = (t1 + t2) | 0;
+        }
+        const s = this.state;
+        s[0] += a; s[1] += b; s[2] += c; s[3] += d; s[4] += e; s[5] += f; s[6] += g; s[7] += h;
+    }
+}
+
 class APIService {
     constructor() {
         this.token = this.getStoredToken();
@@ -85,6 +175,32 @@ class APIService {
         return { status: response.status, data };
     }
 
+    // List endpoints are cursor paginated: { next, previous, results }.
+    // Turn an absolute `next`/`previous` link back into an API endpoint.
+    toEndpoint(url) {
+        const parsed = new URL(url, window.location.origin);
+        return parsed.pathname.replace(/^\/api/, '') + parsed.search;
+    }
+
+    async getPage(pageUrl) {
+        return this.makeRequest(this.toEndpoint(pageUrl));
+    }
+
+    // Follow cursor links and return every result as one array
+    async getAllPages(endpoint) {
+        let results = [];
+        let next = endpoint;
+        while (next) {
+            const response = await this.makeRequest(next);
+            if (response.status !== 200) {
+                return response;
+            }
+            results = results.concat(response.data.results);
+            next = response.data.next ? this.toEndpoint(response.data.next) : null;
+        }
+        return { status: 200, data: results };
+    }
+
     // Auth endpoints
     async login(username, password) {
         return this.makeRequest('/auth/login/', {
@@ -105,7 +221,7 @@ class APIService {
 
     // User endpoints
     async getUsers() {
-        return this.makeRequest('/users/');
+        return this.getAllPages('/users/');
     }
 
     async createUser(userData) {
@@ -129,14 +245,29 @@ class APIService {
     }
 
     // Project endpoints
-    async getProjects() {
-        return this.makeRequest('/projects/');
+    async getProjects(filters = {}) {
+        const query = new URLSearchParams(filters).toString();
+        return this.getAllPages(`/projects/${query ? `?${query}` : ''}`);
+    }
+
+    async getRecentProjects(limit = 5) {
+        const response = await this.makeRequest(`/projects/?page_size=${limit}`);
+        return response.status === 200 ? { status: 200, data: response.data.results } : response;
+    }
+
+    async getProjectStats() {
+        return this.makeRequest('/projects/stats/');
     }
 
     async getProject(projectId) {
         return this.makeRequest(`/projects/${projectId}/`);
     }
 
+    // Project, current user, workflow, parameter data, summary and documents in one response
+    async getProjectBootstrap(projectId) {
+        return this.makeRequest(`/projects/${projectId}/bootstrap/`);
+    }
+
     async createProject(projectData) {
         return this.makeRequest('/projects/', {
             method: 'POST',
@@ -232,13 +363,66 @@ class APIService {
         return `/api/reports/${projectId}/`;
     }
 
+    downloadDossier(projectId) {
+        return `/api/reports/${projectId}/dossier/`;
+    }
+
+    exportReports(filters = {}) {
+        const query = new URLSearchParams(filters).toString();
+        return `/api/reports/export/${query ? `?${query}` : ''}`;
+    }
+
+    async getReportJob(jobId) {
+        return this.makeRequest(`/reports/jobs/${jobId}/`);
+    }
+
+    async queueReports(projectIds) {
+        return this.makeRequest('/reports/jobs/', {
+            method: 'POST',
+            body: JSON.stringify({ project_ids: projectIds })
+        });
+    }
+
     // Audit endpoints (QA only)
-    async getAuditLogs() {
-        return this.makeRequest('/audit/');
+    // Returns one page; filters: user_id, action, object_type, object_id, date_from, date_to, page_size
+    async getAuditLogs(filters = {}) {
+        const query = new URLSearchParams(filters).toString();
+        return this.makeRequest(`/audit/${query ? `?${query}` : ''}`);
+    }
+
+    async getProjectAuditLogs(projectId, filters = {}) {
+        const query = new URLSearchParams(filters).toString();
+        return this.makeRequest(`/audit/${projectId}/${query ? `?${query}` : ''}`);
+    }
+
+    // Download URL for the streamed CSV/JSONL export; filters as for getAuditLogs plus file_format, project_id
+    exportAuditLogs(filters = {}) {
+        const query = new URLSearchParams(filters).toString();
+        return `/api/audit/export/${query ? `?${query}` : ''}`;
     }
 
-    async getProjectAuditLogs(projectId) {
-        return this.makeRequest(`/audit/${projectId}/`);
+    /**
+     * Live 'project' and 'audit' events instead of polling. handlers maps
+     * event names to callbacks receiving the parsed data. The browser
+     * reconnects by itself; returns the EventSource (call close() to stop),
+     * or null when the server is not running under ASGI.
+     */
+    subscribeToEvents(filters = {}, handlers = {}) {
+        if (!window.EventSource) {
+            return null;
+        }
+        const query = new URLSearchParams(filters).toString();
+        const source = new EventSource(`/api/audit/events/${query ? `?${query}` : ''}`);
+        Object.entries(handlers).forEach(([name, handler]) => {
+            source.addEventListener(name, (event) => handler(JSON.parse(event.data)));
+        });
+        source.onerror = () => {
+            // 501 under WSGI (and other HTTP errors) close the source for good
+            if (source.readyState === EventSource.CLOSED) {
+                source.close();
+            }
+        };
+        return source;
     }
 
     // Workflow endpoint
@@ -252,7 +436,11 @@ class APIService {
         return this.makeRequest(`/validation/projects/${projectId}/documents/${query}`);
     }
 
-    async uploadDocument(projectId, file, fileType = 'other', description = '', validationStepId = null) {
+    async uploadDocument(projectId, file, fileType = 'other', description = '', validationStepId = null, onProgress = null) {
+        if (file.size > DIRECT_UPLOAD_LIMIT) {
+            return this.uploadDocumentChunked(projectId, file, fileType, description, validationStepId, onProgress);
+        }
+
         const formData = new FormData();
         formData.append('file', file);
         formData.append('file_type', fileType);
@@ -268,12 +456,92 @@ class APIService {
         });
     }
 
+    // Resumable upload for large files: chunks are PUT at the offset the server
+    // has stored, so a dropped connection resumes instead of starting over.
+    async uploadDocumentChunked(projectId, file, fileType = 'other', description = '', validationStepId = null, onProgress = null) {
+        const base = `/validation/projects/${projectId}/uploads/`;
+        const started = await this.makeRequest(base, {
+            method: 'POST',
+            body: JSON.stringify({
+                file_name: file.name,
+                file_size: file.size,
+                file_type: fileType,
+                description: description,
+                validation_step_id: validationStepId
+            })
+        });
+        if (started.status !== 201) {
+            return started;
+        }
+
+        const url = `${base}${started.data.upload_id}/`;
+        const chunkSize = started.data.chunk_size;
+        let offset = 0;
+        let failures = 0;
+        while (offset < file.size) {
+            let response = null;
+            try {
+                response = await this.makeRequest(url, {
+                    method: 'PUT',
+                    body: file.slice(offset, offset + chunkSize),
+                    headers: { 'Content-Type': 'application/octet-stream', 'Upload-Offset': String(offset) }
+                });
+            } catch (error) {
+                console.error('Chunk upload failed:', error);
+            }
+
+            if (response && response.status === 200) {
+                failures = 0;
+            } else if (++failures > MAX_CHUNK_RETRIES) {
+                return response || { status: 0, data: { error: 'Upload failed, please try again' } };
+            } else {
+                // Ask the server how much it kept before retrying
+                await new Promise(resolve => setTimeout(resolve, 1000 * failures));
+                try {
+                    response = await this.makeRequest(url);
+                } catch (error) {
+                    continue;
+                }
+            }
+            offset = response.data.offset;
+            if (onProgress) {
+                onProgress(offset, file.size);
+            }
+        }
+
+        // The server only creates the document if the SHA-256 of the whole file matches
+        return this.makeRequest(`${url}complete/`, {
+            method: 'POST',
+            body: JSON.stringify({ sha256: await this.fileSha256(file, chunkSize) })
+        });
+    }
+
+    async fileSha256(file, sliceSize) {
+        if (window.crypto && crypto.subtle && file.size <= CHECKSUM_MAX_SIZE) {
+            const digest = await crypto.subtle.digest('SHA-256', await file.arrayBuffer());
+            return Array.from(new Uint8Array(digest)).map(b => b.toString(16).padStart(2, '0')).join('');
+        }
+        const hash = new Sha256();
+        for (let offset = 0; offset < file.size; offset += sliceSize) {
+            hash.update(new Uint8Array(await file.slice(offset, offset + sliceSize).arrayBuffer()));
+        }
+        return hash.hexdigest();
+    }
+
     async deleteDocument(projectId, documentId) {
         return this.makeRequest(`/validation/projects/${projectId}/documents/${documentId}/`, {
             method: 'DELETE'
         });
     }
 
+    // options: { step, columns, level, preview }
+    async ingestDocument(projectId, documentId, options) {
+        return this.makeRequest(`/validation/projects/${projectId}/documents/${documentId}/ingest/`, {
+            method: 'POST',
+            body: JSON.stringify(options)
+        });
+    }
+
     downloadDocument(projectId, documentId) {
         return `/api/validation/projects/${projectId}/documents/${documentId}/download/`;
     }
@@ -313,6 +581,10 @@ class APIService {
         return this.makeRequest(`/users/${userId}/stats/`);
     }
 
+    async getAllUserStats() {
+        return this.makeRequest('/users/stats/');
+    }
+
     async updateUserProfileById(userId, userData) {
         return this.makeRequest(`/users/${userId}/profile/`, {
             method: 'PUT',